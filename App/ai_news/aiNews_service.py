@@ -17,10 +17,38 @@ Q1_CATEGORY_KEYWORDS = {
 }
 
 
-def build_user_keywords(db: Session, user_id: int) -> List[str]:
+def _clean(keywords) -> List[str]:
+    # 중복 제거 + 공백 제거
+    cleaned = []
+    for kw in keywords or []:
+        kw = (kw or "").strip()
+        if kw and kw not in cleaned:
+            cleaned.append(kw)
+    return cleaned
+
+
+def keyword_sets_from_onboarding(q1_categories, q2_keywords, q3_keywords) -> Tuple[List[str], List[str]]:
     """
-    온보딩 테이블에서 사용자의 카테고리/키워드 기반으로
-    최종 검색용 키워드 리스트를 만들어주는 함수.
+    온보딩 답변 -> (포함 키워드, 제외 키워드)
+    - 포함: Q1 카테고리 확장 키워드 + Q2 자유 키워드
+    - 제외: Q3 키워드 (검색어에 섞지 않고 결과에서 빼는 용도)
+    """
+    keywords: List[str] = []
+
+    # Q1: 카테고리 id 리스트 (예: [2, 5, 7])
+    for cid in q1_categories or []:
+        if cid in Q1_CATEGORY_KEYWORDS:
+            keywords.extend(Q1_CATEGORY_KEYWORDS[cid])
+
+    # Q2: 자유 키워드 리스트 (예: ["반도체", "2차전지"])
+    keywords.extend(q2_keywords or [])
+
+    return _clean(keywords), _clean(q3_keywords)
+
+
+def build_user_keyword_sets(db: Session, user_id: int) -> Tuple[List[str], List[str]]:
+    """
+    온보딩 테이블에서 사용자의 (포함 키워드, 제외 키워드) 를 만들어주는 함수.
     """
     onboarding: UserOnBoarding = (
         db.query(UserOnBoarding)
@@ -28,27 +56,17 @@ def build_user_keywords(db: Session, user_id: int) -> List[str]:
         .first()
     )
     if onboarding is None:
-        return []
+        return [], []
 
-    keywords: List[str] = []
-
-    # Q1: 카테고리 id 리스트 (예: [2, 5, 7])
-    if onboarding.q1_categories:
-        for cid in onboarding.q1_categories:
-            if cid in Q1_CATEGORY_KEYWORDS:
-                keywords.extend(Q1_CATEGORY_KEYWORDS[cid])
+    return keyword_sets_from_onboarding(
+        onboarding.q1_categories, onboarding.q2_keywords, onboarding.q3_keywords
+    )
 
-    # Q2, Q3: 자유 키워드 리스트 (예: ["반도체", "2차전지"])
-    if onboarding.q2_keywords:
-        keywords.extend(onboarding.q2_keywords)
-    if onboarding.q3_keywords:
-        keywords.extend(onboarding.q3_keywords)
 
-    # 중복 제거 + 공백 제거
-    cleaned = []
-    for kw in keywords:
-        kw = (kw or "").strip()
-        if kw and kw not in cleaned:
-            cleaned.append(kw)
-
-    return cleaned
+def build_user_keywords(db: Session, user_id: int) -> List[str]:
+    """
+    온보딩 테이블에서 사용자의 카테고리/키워드 기반으로
+    최종 검색용 키워드 리스트를 만들어주는 함수. (Q3 제외 키워드는 포함하지 않음)
+    """
+    include, _ = build_user_keyword_sets(db, user_id)
+    return include
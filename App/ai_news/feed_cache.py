@@ -0,0 +1,143 @@
+# App/ai_news/feed_cache.py
+"""
+사용자별 맞춤 뉴스 피드 캐시 (materialized feed).
+
+첫 페이지 요청 때 정렬된 전체 피드(FEED_MAX_ITEMS개)를 한 번 계산해서
+(user_id, 버전 태그) 로 저장하고, 다음 페이지부터는 커서에 들어 있는 버전 태그로
+캐시를 한 번 조회해서 잘라 주기만 한다.
+
+버전 태그 = 포함/제외 키워드 + days + ranking + 색인 세대(generation) 의 해시
+- 온보딩(Q1/Q2/Q3) 이 바뀌면 키워드가 바뀌므로 자동으로 새 버전
+- 새 수집 배치가 색인에 들어오면 generation 이 바뀌므로 새 버전
+- PreferenceService.save_q*_answer 에서 invalidate_user 로 해당 사용자 항목을 바로 지움
+
+커서는 {버전, 오프셋, days, ranking} 을 base64 로 감싼 불투명 문자열이다.
+커서의 버전이 캐시에서 사라졌으면(만료/무효화) None 을 돌려주고, 라우터가 410 으로 응답한다.
+"""
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+FEED_MAX_ITEMS = int(os.getenv("FEED_MAX_ITEMS", "200"))
+FEED_CACHE_MAXSIZE = int(os.getenv("FEED_CACHE_MAXSIZE", "2048"))
+FEED_CACHE_TTL = float(os.getenv("FEED_CACHE_TTL", "1800"))
+
+
+def feed_version(
+    include_keywords: Sequence[str],
+    exclude_keywords: Sequence[str],
+    days: int,
+    ranking: str,
+    generation: int,
+) -> str:
+    raw = json.dumps(
+        [sorted(include_keywords), sorted(exclude_keywords), days, ranking, generation],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class FeedCursor(NamedTuple):
+    version: str
+    offset: int
+    days: int
+    ranking: str
+
+
+def encode_cursor(cursor: FeedCursor) -> str:
+    raw = json.dumps(
+        {"v": cursor.version, "o": cursor.offset, "d": cursor.days, "r": cursor.ranking},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[FeedCursor]:
+    """
+    잘못된 커서면 None
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        decoded = FeedCursor(str(data["v"]), int(data["o"]), int(data["d"]), str(data["r"]))
+    except Exception:
+        return None
+    if decoded.offset < 0:
+        return None
+    return decoded
+
+
+class FeedCache:
+    """
+    (user_id, version) -> 정렬된 피드 목록. TTL + LRU, 스레드 안전
+    (온보딩 저장은 동기 라우트(스레드풀)에서, 조회는 이벤트 루프에서 일어나므로 락 사용)
+    """
+
+    def __init__(self, maxsize: int = FEED_CACHE_MAXSIZE, ttl: float = FEED_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Tuple[int, str], Tuple[List[Any], float]]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _drop(self, key: Tuple[int, str]) -> None:
+        self._data.pop(key, None)
+        versions = self._by_user.get(key[0])
+        if versions is not None:
+            versions.discard(key[1])
+            if not versions:
+                del self._by_user[key[0]]
+
+    def get(self, user_id: int, version: str) -> Optional[List[Any]]:
+        key = (user_id, version)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            items, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                self._drop(key)
+                return None
+            self._data.move_to_end(key)
+            return items
+
+    def put(self, user_id: int, version: str, items: List[Any]) -> None:
+        key = (user_id, version)
+        with self._lock:
+            self._data[key] = (items, time.monotonic())
+            self._data.move_to_end(key)
+            self._by_user.setdefault(user_id, set()).add(version)
+            while len(self._data) > self.maxsize:
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for version in list(self._by_user.get(user_id, ())):
+                self._drop((user_id, version))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._by_user.clear()
+
+
+def page(items: List[Any], cursor: FeedCursor, limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    캐시된 피드에서 cursor 위치부터 한 페이지 + 다음 커서 (마지막 페이지면 None)
+    """
+    chunk = items[cursor.offset:cursor.offset + limit]
+    end = cursor.offset + len(chunk)
+    next_cursor = encode_cursor(cursor._replace(offset=end)) if end < len(items) else None
+    return chunk, next_cursor
+
+
+feed_cache = FeedCache()
@@ -0,0 +1,400 @@
+# App/ai_news/keyword_index.py
+"""
+수집된 기사(articles)에 대한 인메모리 역색인.
+
+요청마다 (기사 수 x 키워드 수) 만큼 `kw in title` 을 돌리는 대신
+- 기사 추가 시점에 한 번만: 소문자화, 발행일 파싱, 문자 2-gram 포스팅 등록,
+  등록된 키워드 사전(vocabulary)을 Aho-Corasick 으로 한 번에 매칭
+- 사용자 점수 계산은 키워드별 포스팅 리스트를 합치는(merge) 작업만 수행
+
+키워드 사전에 없는 키워드가 들어오면 2-gram 포스팅 교집합으로 후보를 좁힌 뒤
+실제 포함 여부만 확인해서 사전에 추가한다 (이후 요청부터는 포스팅 조회만).
+
+키워드 -> 기사 id 집합은 압축 비트맵(RoaringBitmap)으로도 들고 있어서
+"Q1 확장/Q2 중 하나라도 포함, Q3 는 하나도 없음" 같은 조건이
+합집합/차집합 몇 번으로 끝난다 (select).
+"""
+import heapq
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from App.core.bitmap import RoaringBitmap
+from App.core.database import SessionLocal
+from App.repository.articleRepo import ArticleRepository, parse_pub_date_utc, url_hash_of, window_start_utc
+
+NGRAM = 2
+INDEX_DAYS = 7              # 인덱스에 유지하는 기간 (/api/news/personalized 최대 days)
+SYNC_INTERVAL_SEC = 30      # 저장소 증분 동기화 최소 간격
+
+
+# ---------------------------
+# Aho-Corasick 다중 패턴 매처
+# ---------------------------
+
+class AhoCorasick:
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+
+        for p in patterns:
+            if p:
+                self._insert(p)
+        self._build()
+
+    def _insert(self, pattern: str) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if pattern not in self._out[node]:
+            self._out[node].append(pattern)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def count(self, text: str) -> Dict[str, int]:
+        """
+        text 안에서 각 패턴이 등장한 횟수 (겹치는 등장 포함)
+        """
+        counts: Dict[str, int] = {}
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for p in out[node]:
+                counts[p] = counts.get(p, 0) + 1
+        return counts
+
+
+# ---------------------------
+# 역색인
+# ---------------------------
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    색인 키워드 정규화: 소문자 + 앞뒤 공백 제거 + 연속 공백 하나로
+    """
+    return " ".join((keyword or "").lower().split())
+
+
+class IndexedArticle:
+    __slots__ = ("row", "text", "length", "published_dt", "published_ts", "queries")
+
+    def __init__(self, row: Dict, text: str, published_dt: datetime):
+        self.row = row
+        self.text = text
+        self.length = max(1, len(text.split()))  # 문서 길이(어절 수), BM25 길이 정규화용
+        self.published_dt = published_dt          # UTC naive
+        self.published_ts = published_dt.replace(tzinfo=timezone.utc).timestamp()
+        self.queries: Set[str] = set()            # 이 기사를 수집한 검색 키워드들
+
+
+class CorpusStats:
+    """
+    BM25 등에 쓰는 코퍼스 통계. 기사 추가/삭제 때마다 증분으로 갱신된다.
+    키워드별 문서 빈도(df)는 keyword_postings 의 길이로 바로 얻는다.
+    """
+
+    def __init__(self, index: "ArticleIndex"):
+        self._index = index
+        self.total_length = 0
+
+    @property
+    def doc_count(self) -> int:
+        return len(self._index.docs)
+
+    @property
+    def avg_length(self) -> float:
+        return self.total_length / self.doc_count if self.doc_count else 1.0
+
+    def df(self, keyword: str) -> int:
+        return len(self._index.postings(keyword))
+
+
+class ArticleIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.docs: Dict[int, IndexedArticle] = {}
+        self.by_hash: Dict[str, int] = {}
+        self._next_id = 0
+
+        self.gram_postings: Dict[str, Set[int]] = {}
+        # 키워드(정규화) -> {doc_id: 등장 횟수}
+        self.keyword_postings: Dict[str, Dict[int, int]] = {}
+        # 키워드(정규화) -> 제목/요약에 키워드가 들어간 doc_ids (집합 연산용)
+        self.keyword_bitmaps: Dict[str, RoaringBitmap] = {}
+        # 수집에 쓰인 검색 키워드(정규화) -> doc_ids
+        self.query_postings: Dict[str, RoaringBitmap] = {}
+
+        self._matcher: Optional[AhoCorasick] = None
+        self._matcher_dirty = True
+
+        self.stats = CorpusStats(self)
+        self.generation = 0       # 내용이 바뀔 때마다 증가 (피드 캐시 버전 등에 사용)
+        self._synced_until: Optional[datetime] = None
+        self._last_sync = 0.0
+
+    # ---------- 쓰기 ----------
+    def _matcher_for_vocab(self) -> AhoCorasick:
+        if self._matcher is None or self._matcher_dirty:
+            self._matcher = AhoCorasick(self.keyword_postings.keys())
+            self._matcher_dirty = False
+        return self._matcher
+
+    def add(self, row: Dict, query: Optional[str] = None) -> Optional[int]:
+        """
+        기사 하나 추가 (이미 있으면 검색 키워드만 연결). 반환: doc_id
+        """
+        h = row.get("url_hash") or url_hash_of(row)
+        if not h:
+            return None
+
+        with self._lock:
+            doc_id = self.by_hash.get(h)
+            if doc_id is None:
+                published = row.get("published_dt") or parse_pub_date_utc(row.get("published_at"))
+                if published is None:
+                    published = datetime.utcnow()
+                title = (row.get("title") or "").lower()
+                desc = (row.get("summary") or row.get("description") or "").lower()
+                text = f"{title}\n{desc}"
+
+                doc_id = self._next_id
+                self._next_id += 1
+                # 캐시와 공유되는 원본 dict 는 건드리지 않고 복사본에 키/발행일을 붙여 보관
+                row = dict(row, url_hash=h, published_dt=published)
+                art = IndexedArticle(row, text, published)
+                self.docs[doc_id] = art
+                self.by_hash[h] = doc_id
+                self.stats.total_length += art.length
+
+                for g in _grams(text):
+                    self.gram_postings.setdefault(g, set()).add(doc_id)
+                for kw, tf in self._matcher_for_vocab().count(text).items():
+                    self.keyword_postings[kw][doc_id] = tf
+                    self.keyword_bitmaps[kw].add(doc_id)
+                self.generation += 1
+
+            query = normalize_keyword(query) if query else None
+            if query:
+                self.docs[doc_id].queries.add(query)
+                self.query_postings.setdefault(query, RoaringBitmap()).add(doc_id)
+            return doc_id
+
+    def add_rows(self, query: str, rows: Iterable[Dict]) -> None:
+        for row in rows:
+            self.add(row, query=query)
+
+    def remove_older_than(self, cutoff: datetime) -> int:
+        with self._lock:
+            old = [d for d, a in self.docs.items() if a.published_dt < cutoff]
+            for doc_id in old:
+                art = self.docs.pop(doc_id)
+                self.by_hash.pop(art.row["url_hash"], None)
+                self.stats.total_length -= art.length
+                for g in _grams(art.text):
+                    ids = self.gram_postings.get(g)
+                    if ids is not None:
+                        ids.discard(doc_id)
+                        if not ids:
+                            del self.gram_postings[g]
+                for q in art.queries:
+                    ids = self.query_postings.get(q)
+                    if ids is not None:
+                        ids.discard(doc_id)
+                        if not ids:
+                            del self.query_postings[q]
+            if old:
+                removed = RoaringBitmap(old)
+                for kw, postings in self.keyword_postings.items():
+                    for doc_id in old:
+                        postings.pop(doc_id, None)
+                    self.keyword_bitmaps[kw] = self.keyword_bitmaps[kw] - removed
+                self.generation += 1
+            return len(old)
+
+    def sync_from_store(self, force: bool = False) -> None:
+        """
+        articles 저장소에서 지난 동기화 이후 수집된 기사만 가져와 추가.
+        SYNC_INTERVAL_SEC 안에 다시 호출되면 건너뜀.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_sync < SYNC_INTERVAL_SEC:
+            return
+        with self._lock:
+            if not force and now - self._last_sync < SYNC_INTERVAL_SEC:
+                return
+            self._last_sync = now
+            db = SessionLocal()
+            try:
+                pairs, last = ArticleRepository(db).get_keyword_pairs_since(
+                    self._synced_until, days=INDEX_DAYS
+                )
+            finally:
+                db.close()
+            for row, _, kw in pairs:
+                self.add(row, query=kw)
+            self._synced_until = last
+            self.remove_older_than(window_start_utc(INDEX_DAYS))
+
+    # ---------- 읽기 ----------
+    def postings(self, keyword: str) -> Dict[int, int]:
+        """
+        키워드를 제목/요약에 포함한 기사 -> 등장 횟수
+        """
+        kw = normalize_keyword(keyword)
+        with self._lock:
+            cached = self.keyword_postings.get(kw)
+            if cached is not None:
+                return cached
+
+            # 사전에 없는 키워드: 2-gram 포스팅 교집합으로 후보를 좁히고 실제 포함 여부 확인
+            if len(kw) < NGRAM:
+                candidates = set(self.docs)
+            else:
+                lists = sorted(
+                    (self.gram_postings.get(g, set()) for g in _grams(kw)),
+                    key=len,
+                )
+                candidates = set(lists[0]).intersection(*lists[1:]) if lists else set()
+
+            found: Dict[int, int] = {}
+            for doc_id in candidates:
+                tf = self.docs[doc_id].text.count(kw)
+                if tf:
+                    found[doc_id] = tf
+
+            self.keyword_postings[kw] = found
+            self.keyword_bitmaps[kw] = RoaringBitmap(sorted(found))
+            self._matcher_dirty = True
+            return found
+
+    def keyword_bitmap(self, keyword: str) -> RoaringBitmap:
+        """
+        키워드를 제목/요약에 포함한 doc_ids (비트맵)
+        """
+        kw = normalize_keyword(keyword)
+        with self._lock:
+            if kw not in self.keyword_bitmaps:
+                self.postings(kw)
+            return self.keyword_bitmaps[kw]
+
+    def has_query(self, keyword: str) -> bool:
+        with self._lock:
+            return bool(self.query_postings.get(normalize_keyword(keyword)))
+
+    def select(
+        self,
+        include_keywords: Iterable[str],
+        exclude_keywords: Iterable[str] = (),
+    ) -> RoaringBitmap:
+        """
+        포함 키워드 중 하나라도 (수집 쿼리 또는 제목/요약) 걸리고,
+        제외 키워드는 제목/요약에 하나도 없는 기사 doc_ids
+        """
+        include = [k for k in dict.fromkeys(map(normalize_keyword, include_keywords)) if k]
+        exclude = [k for k in dict.fromkeys(map(normalize_keyword, exclude_keywords)) if k]
+        with self._lock:
+            selected = RoaringBitmap.union(
+                [self.keyword_bitmap(kw) for kw in include]
+                + [self.query_postings[kw] for kw in include if kw in self.query_postings]
+            )
+            if exclude and selected:
+                selected = selected - RoaringBitmap.union(self.keyword_bitmap(kw) for kw in exclude)
+            return selected
+
+    def select_rows(
+        self,
+        include_keywords: Iterable[str],
+        exclude_keywords: Iterable[str] = (),
+        days: int = 3,
+    ) -> List[Dict]:
+        """
+        select 결과 중 최근 days일 기사 row (최신순)
+        """
+        start = window_start_utc(days)
+        with self._lock:
+            arts = [
+                self.docs[d]
+                for d in self.select(include_keywords, exclude_keywords)
+                if d in self.docs and self.docs[d].published_dt >= start
+            ]
+            arts.sort(key=lambda a: a.published_ts, reverse=True)
+            return [a.row for a in arts]
+
+    def rank(
+        self,
+        user_keywords: List[str],
+        days: int,
+        limit: int,
+        scorer=None,
+        exclude_keywords: Iterable[str] = (),
+    ) -> List[Tuple[float, Dict]]:
+        """
+        포스팅 리스트 합치기로 후보 기사와 키워드별 등장 횟수를 모은 뒤 점수 계산, 상위 limit개 반환.
+        후보: 사용자 키워드로 수집됐거나, 제목/요약에 사용자 키워드가 들어간 기사 중
+        제목/요약에 제외 키워드가 없는 기사 (select)
+        scorer 가 없으면 키워드 매칭 수 * 2 + 최신 점수.
+        scorer 는 recommendService.ArticleScorer 구현체 (prepare -> 기사별 점수 함수).
+        반환 row 에는 url_hash, published_dt(UTC) 가 들어 있다.
+        """
+        start = window_start_utc(days)
+        now = datetime.utcnow()
+        with self._lock:
+            keywords = [k for k in dict.fromkeys(map(normalize_keyword, user_keywords)) if k]
+            score_fn = None
+            if scorer is not None:
+                now_ts = now.replace(tzinfo=timezone.utc).timestamp()
+                score_fn = scorer.prepare(self.stats, keywords, days, now_ts)
+
+            term_freqs: Dict[int, Dict[str, int]] = {}
+            for kw in keywords:
+                for doc_id, tf in self.postings(kw).items():
+                    term_freqs.setdefault(doc_id, {})[kw] = tf
+            candidates = self.select(keywords, exclude_keywords)
+
+            scored = []
+            for doc_id in candidates:
+                art = self.docs.get(doc_id)
+                if art is None or art.published_dt < start:
+                    continue
+                tfs = term_freqs.get(doc_id, {})
+                if score_fn is None:
+                    age_days = (now - art.published_dt).days
+                    recency_score = max(0, days - age_days)
+                    score = len(tfs) * 2 + recency_score
+                else:
+                    score = score_fn(art, tfs)
+                scored.append((score, art.published_ts, doc_id))
+
+            top = heapq.nlargest(limit, scored)
+            return [(s, self.docs[d].row) for s, _, d in top]
+
+
+article_index = ArticleIndex()
@@ -0,0 +1,217 @@
+# App/ai_news/ranking_engine.py
+"""
+여러 사용자의 맞춤 뉴스 순위를 한 번에 계산하는 NumPy 배치 랭킹 엔진.
+
+수집 사이클마다 인덱스(ArticleIndex) 스냅샷으로 한 번만
+- 기사 x 키워드 매칭 행렬 (CSR: indptr / indices)
+- 기사 x 검색 키워드(수집 쿼리) 행렬 (CSR)
+- 발행 시각 벡터
+를 만들어 두고, 사용자 N명을 묶어서
+    점수 = 매칭 키워드 수 * 2 + 최신 점수   (ArticleIndex.rank 기본 점수와 동일)
+를 계산한 뒤 사용자별 상위 k개만 뽑는다.
+사용자 x 기사 전체 행렬은 만들지 않고, 키워드 포스팅을 펼친 (사용자, 기사) 쌍만 점수를 매기므로
+메모리/연산은 실제로 매칭된 쌍 수에 비례한다.
+
+요청 경로(1명)는 keyword_index.rank 를 그대로 쓰고, 이 모듈은 수집 사이클마다
+피드를 미리 계산하는 배치 작업(recommendService.precompute_feeds)용이다.
+"""
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from App.repository.articleRepo import window_start_utc
+from .keyword_index import ArticleIndex, article_index, normalize_keyword
+
+# 한 번에 계산할 사용자 수 ((사용자, 기사) 쌍 배열 메모리 상한 조절용)
+USER_BATCH = 1024
+
+
+def _csr(postings: List[Sequence[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    lengths = np.fromiter((len(p) for p in postings), dtype=np.int64, count=len(postings))
+    indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter(
+        (i for p in postings for i in p), dtype=np.int32, count=int(indptr[-1])
+    )
+    return indptr, indices
+
+
+def _expand(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    users: np.ndarray,
+    cols: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (사용자, 키워드 열) 쌍 목록을 (사용자, 기사) 쌍 목록으로 펼침 (루프 없이)
+    """
+    starts = indptr[cols]
+    lengths = indptr[cols + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    user_rep = np.repeat(users, lengths)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    articles = indices[np.repeat(starts, lengths) + offsets]
+    return user_rep, articles.astype(np.int64)
+
+
+def _unique_counts(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    정렬 기반 중복 제거 + 개수 (np.unique 보다 큰 int64 배열에서 빠름)
+    """
+    keys = np.sort(keys)
+    if not len(keys):
+        return keys, np.empty(0, dtype=np.int64)
+    first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[first], np.diff(np.r_[first, len(keys)])
+
+
+class RankingSnapshot:
+    def __init__(self, index: ArticleIndex, keywords: Sequence[str]):
+        with index._lock:
+            self.generation = index.generation
+            doc_ids = list(index.docs)
+            pos = {d: i for i, d in enumerate(doc_ids)}
+
+            self.rows: List[Dict] = [index.docs[d].row for d in doc_ids]
+            self.published_ts = np.array(
+                [index.docs[d].published_ts for d in doc_ids], dtype=np.float64
+            )
+
+            self.vocab: Dict[str, int] = {}
+            text_postings: List[List[int]] = []
+            query_postings: List[List[int]] = []
+            for kw in dict.fromkeys(map(normalize_keyword, keywords)):
+                if not kw:
+                    continue
+                self.vocab[kw] = len(text_postings)
+                text_postings.append([pos[d] for d in index.postings(kw) if d in pos])
+                query_postings.append(
+                    [pos[d] for d in index.query_postings.get(kw, ()) if d in pos]
+                )
+
+        self.n_articles = len(self.rows)
+        self.text_indptr, self.text_indices = _csr(text_postings)
+        self.query_indptr, self.query_indices = _csr(query_postings)
+
+        # 동점일 때 최신 기사 우선: 발행 순위를 (0, 1) 사이 값으로 더해서 정렬 키에 반영
+        order = np.argsort(self.published_ts, kind="stable")
+        tie = np.empty(self.n_articles, dtype=np.float64)
+        tie[order] = np.arange(self.n_articles) / (self.n_articles + 1)
+        self._tie_break = tie
+
+    def covers(self, keywords: Sequence[str]) -> bool:
+        return all(kw in self.vocab for kw in map(normalize_keyword, keywords) if kw)
+
+    def _pairs(self, batch: Sequence[Sequence[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        사용자별 키워드 -> (사용자, 키워드 열) 쌍. ArticleIndex.rank 와 같이 정규화 후 중복 제거
+        """
+        pair_users, pair_cols = [], []
+        for u, kws in enumerate(batch):
+            for kw in dict.fromkeys(map(normalize_keyword, kws)):
+                col = self.vocab.get(kw)
+                if col is not None:
+                    pair_users.append(u)
+                    pair_cols.append(col)
+        return np.asarray(pair_users, dtype=np.int64), np.asarray(pair_cols, dtype=np.int64)
+
+    def rank_users(
+        self,
+        users_keywords: Sequence[Sequence[str]],
+        days: int,
+        k: int,
+        users_excludes: Optional[Sequence[Sequence[str]]] = None,
+    ) -> List[List[Tuple[float, Dict]]]:
+        """
+        사용자별 (포함 키워드, 제외 키워드) -> 사용자별 상위 k개 [(점수, 기사 row)]
+        후보/제외 판정은 ArticleIndex.select 와 같다.
+        """
+        results: List[List[Tuple[float, Dict]]] = []
+        if self.n_articles == 0 or k <= 0:
+            return [[] for _ in users_keywords]
+        excludes = users_excludes or [()] * len(users_keywords)
+
+        now = datetime.now(timezone.utc).timestamp()
+        age_days = np.floor((now - self.published_ts) / 86400.0)
+        recency = np.maximum(0.0, days - age_days)
+        start_ts = window_start_utc(days).replace(tzinfo=timezone.utc).timestamp()
+        in_window = self.published_ts >= start_ts
+        n_articles = self.n_articles
+
+        for b in range(0, len(users_keywords), USER_BATCH):
+            batch = users_keywords[b:b + USER_BATCH]
+            n = len(batch)
+            pu, pc = self._pairs(batch)
+            eu, ec = self._pairs(excludes[b:b + USER_BATCH])
+
+            # (사용자, 기사) 쌍을 u * n_articles + a 하나의 키로 묶어서 집계
+            tu, ta = _expand(self.text_indptr, self.text_indices, pu, pc)
+            text_keys, match_counts = _unique_counts(tu * n_articles + ta)
+            qu, qa = _expand(self.query_indptr, self.query_indices, pu, pc)
+            keys, _ = _unique_counts(np.concatenate([text_keys, qu * n_articles + qa]))
+
+            # 제외 키워드가 제목/요약에 있는 (사용자, 기사) 쌍 제거
+            xu, xa = _expand(self.text_indptr, self.text_indices, eu, ec)
+            if len(xu):
+                excluded = np.sort(xu * n_articles + xa)
+                pos = np.minimum(np.searchsorted(excluded, keys), len(excluded) - 1)
+                keys = keys[excluded[pos] != keys]
+            users, articles = np.divmod(keys, n_articles)
+            keep = in_window[articles]
+            keys, users, articles = keys[keep], users[keep], articles[keep]
+
+            # 매칭 키워드 수 (검색 키워드로만 걸린 기사는 0)
+            pos = np.searchsorted(text_keys, keys)
+            hit = pos < len(text_keys)
+            hit[hit] = text_keys[pos[hit]] == keys[hit]
+            matches = np.zeros(len(keys))
+            matches[hit] = match_counts[pos[hit]]
+            scores = matches * 2.0 + recency[articles]
+
+            # 사용자 오름차순, 같은 사용자 안에서는 점수(동점이면 최신) 내림차순 -> 사용자별 앞 k개
+            order = np.lexsort((-(scores + self._tie_break[articles]), users))
+            users, articles, scores = users[order], articles[order], scores[order]
+            starts = np.searchsorted(users, np.arange(n + 1))
+            for u in range(n):
+                lo = starts[u]
+                hi = min(starts[u + 1], lo + k)
+                results.append([
+                    (float(scores[i]), self.rows[articles[i]]) for i in range(lo, hi)
+                ])
+
+        return results
+
+
+_snapshot: Optional[RankingSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot(keywords: Sequence[str], index: ArticleIndex = article_index) -> RankingSnapshot:
+    """
+    인덱스가 바뀌었거나(새 수집 배치) 필요한 키워드가 스냅샷에 없을 때만 다시 만든다.
+    """
+    global _snapshot
+    with _snapshot_lock:
+        snap = _snapshot
+        if snap is None or snap.generation != index.generation or not snap.covers(keywords):
+            vocab = list(snap.vocab) if snap is not None else []
+            snap = RankingSnapshot(index, vocab + list(keywords))
+            _snapshot = snap
+        return snap
+
+
+def rank_users_batch(
+    users_keywords: Sequence[Sequence[str]],
+    days: int = 3,
+    k: int = 20,
+    users_excludes: Optional[Sequence[Sequence[str]]] = None,
+) -> List[List[Tuple[float, Dict]]]:
+    all_keywords = [kw for kws in users_keywords for kw in kws]
+    all_keywords += [kw for kws in users_excludes or () for kw in kws]
+    return get_snapshot(all_keywords).rank_users(
+        users_keywords, days=days, k=k, users_excludes=users_excludes
+    )
@@ -1,126 +1,309 @@
 # App/news/recommendation.py
+import abc
+import asyncio
+import math
 from datetime import datetime, timezone
-from typing import List, Dict, Any
-from dateutil import parser as date_parser  # pip install python-dateutil
-
-from App.api.naverNewsAPI import fetch_naver_news_recent
-from .schemas import NewsArticle
-
-
-def score_article(article: Dict[str, Any], user_keywords: List[str], days: int) -> float:
-    """
-    - 최신일수(0~days)와
-    - 제목/설명에 포함된 키워드 수
-    로 간단한 점수를 계산
-    """
-    title = (article.get("title") or "").lower()
-    # 네이버 결과에는 "summary"가 있으므로, description이 없으면 summary를 사용
-    description = (
-        article.get("description")
-        or article.get("summary")
-        or ""
-    ).lower()
-
-    # 키워드 매칭 수
-    kw_score = 0
-    for kw in user_keywords:
-        k = kw.lower()
-        if k in title or k in description:
-            kw_score += 1
-
-    # 발행일 기준 최신 점수
-    # 네이버 래퍼가 "published_at"에 pubDate 문자열을 넣어줌
-    published_str = (
-        article.get("publishedAt")
-        or article.get("published_at")
-        or article.get("published_at".lower())
-    )
-    try:
-        published_dt = date_parser.parse(published_str)
-        if published_dt.tzinfo is None:
-            published_dt = published_dt.replace(tzinfo=timezone.utc)
-    except Exception:
-        published_dt = datetime.now(timezone.utc)
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from App.api.naverNewsAPI import fetch_naver_news_recent_cached
+from App.core.simhash import collapse_near_duplicates
+from App.repository.articleRepo import KST
+from App.repository.inboxRepo import InboxRepository
+from App.repository.seenRepo import SeenFilterRepository, article_key
+from App.service.popularity_service import record_keywords
+from .feed_cache import FEED_MAX_ITEMS, feed_cache, feed_version
+from .keyword_index import article_index
+from .ranking_engine import rank_users_batch
+from .schemas import InboxArticle, NewsArticle
+
+# 유사 기사 묶기로 줄어드는 만큼 상위 후보를 limit 의 몇 배로 가져올지
+RANK_OVERFETCH = 3
+
+
+# ---------------------------
+# 점수 계산기 (요청별 선택 가능 -> A/B 비교용)
+# ---------------------------
+
+class ArticleScorer(abc.ABC):
+    """
+    인덱스 후보 기사 점수 계산 인터페이스.
+    prepare() 에서 요청 단위로 한 번만 계산할 것(idf, 평균 길이, 현재 시각 등)을 미리 구하고,
+    기사별로 호출할 함수 score(article, term_freqs) -> float 를 돌려준다.
+    - stats     : keyword_index.CorpusStats (문서 수, 평균 길이, df)
+    - article   : keyword_index.IndexedArticle (길이, 발행 시각 등)
+    - term_freqs: 사용자 키워드(소문자) -> 제목/요약 등장 횟수 (매칭된 키워드만)
+    """
+    name = ""
 
-    now = datetime.now(timezone.utc)
-    age_days = (now - published_dt).days
-    recency_score = max(0, days - age_days)  # 3일 이내면 3,2,1 정도
+    @abc.abstractmethod
+    def prepare(
+        self, stats, keywords: List[str], days: int, now_ts: float
+    ) -> Callable[[Any, Dict[str, int]], float]:
+        ...
 
-    # 최종 점수 (가중치는 상황에 맞게 조절)
-    return kw_score * 2 + recency_score
 
+class KeywordRecencyScorer(ArticleScorer):
+    """
+    기존 방식: 매칭 키워드 수 * 2 + 최신 점수 (ArticleIndex.rank 기본 점수와 동일)
+    """
+    name = "keyword"
+
+    def prepare(self, stats, keywords, days, now_ts):
+        def score(article, term_freqs):
+            age_days = int((now_ts - article.published_ts) // 86400)
+            return len(term_freqs) * 2 + max(0, days - age_days)
+        return score
+
+
+class BM25Scorer(ArticleScorer):
+    """
+    BM25 관련도 * 시간 감쇠.
+    키워드 한 번 스친 낚시성 제목보다 키워드가 여러 번, 짧은 글에 집중된 기사를 우대하고,
+    희귀한 키워드(df 낮음)에 가중치를 더 준다.
+    감쇠: half_life_hours 마다 절반, 단 decay_floor 아래로는 내려가지 않음
+    """
+    name = "bm25"
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        half_life_hours: float = 24.0,
+        decay_floor: float = 0.3,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.half_life_hours = half_life_hours
+        self.decay_floor = decay_floor
 
-def get_personalized_articles(
+    def prepare(self, stats, keywords, days, now_ts):
+        n = stats.doc_count
+        idf = {}
+        for kw in keywords:
+            df = stats.df(kw)
+            idf[kw] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+        k1, k1_plus_1 = self.k1, self.k1 + 1
+        len_a = k1 * (1 - self.b)
+        len_b = k1 * self.b / stats.avg_length
+        half_life_sec = self.half_life_hours * 3600
+        floor, span = self.decay_floor, 1 - self.decay_floor
+
+        def score(article, term_freqs):
+            norm = len_a + len_b * article.length
+            relevance = 0.0
+            for kw, tf in term_freqs.items():
+                relevance += idf[kw] * tf * k1_plus_1 / (tf + norm)
+            if not relevance:
+                return 0.0
+            age_sec = max(0.0, now_ts - article.published_ts)
+            return relevance * (floor + span * 0.5 ** (age_sec / half_life_sec))
+        return score
+
+
+SCORERS: Dict[str, ArticleScorer] = {
+    KeywordRecencyScorer.name: KeywordRecencyScorer(),
+    BM25Scorer.name: BM25Scorer(),
+}
+DEFAULT_RANKING = KeywordRecencyScorer.name
+
+
+def _to_news_article(art: Dict[str, Any], published_dt: datetime) -> NewsArticle:
+    # 네이버 응답의 "summary"를 NewsArticle.description에 매핑
+    description = art.get("description") or art.get("summary")
+
+    # 네이버 응답의 "source"는 문자열이므로 그대로 사용
+    src = art.get("source")
+    if isinstance(src, dict):
+        src_name = src.get("name")
+    else:
+        src_name = src
+
+    return NewsArticle(
+        title=art.get("title", ""),
+        description=description,
+        url=art.get("origin_url") or art.get("url", ""),
+        published_at=published_dt,
+        source=src_name,
+        related_count=art.get("related_count", 1),
+    )
+
+
+async def get_personalized_articles(
     user_keywords: List[str],
     days: int = 3,
     per_keyword: int = 5,
     limit: int = 20,
+    ranking: str = DEFAULT_RANKING,
+    exclude_keywords: Optional[List[str]] = None,
+    seen=None,
 ) -> List[NewsArticle]:
+    """
+    seen: 이미 본 기사 필터 (article_key 로 `in` 검사, 보통 RotatingBloomFilter). 걸리면 건너뜀
+    """
     if not user_keywords:
         return []
 
-    raw_articles: List[Dict[str, Any]] = []
+    scorer = SCORERS.get(ranking) or SCORERS[DEFAULT_RANKING]
+
+    # 1) 인메모리 역색인을 수집 저장소(articles)와 증분 동기화
+    try:
+        await asyncio.to_thread(article_index.sync_from_store)
+    except Exception as e:
+        print(f"[ERR] article index sync failed: {e}")
 
-    # 1) 키워드별로 뉴스 긁어오기 (네이버 API 재사용)
-    for kw in user_keywords:
-        articles = fetch_naver_news_recent(
-            query=kw,
-            days=days,
-            max_pages=1,          # 키워드당 1페이지 정도만
-            display=per_keyword,  # 키워드당 per_keyword개
+    # 2) 아직 수집되지 않은 키워드만 네이버 API로 보충 (동시 호출) 후 인덱스에 추가
+    missing = [kw for kw in user_keywords if not article_index.has_query(kw)]
+    if missing:
+        fetched = await asyncio.gather(
+            *(
+                fetch_naver_news_recent_cached(
+                    query=kw,
+                    days=days,
+                    max_pages=1,          # 키워드당 1페이지 정도만
+                    display=per_keyword,  # 키워드당 per_keyword개
+                )
+                for kw in missing
+            ),
+            return_exceptions=True,
         )
-        raw_articles.extend(articles)
+        for kw, articles in zip(missing, fetched):
+            if isinstance(articles, Exception):
+                print(f"[ERR] Naver fetch failed: {articles}")
+                continue
+            await asyncio.to_thread(article_index.add_rows, kw, articles)
 
-    # 2) URL 기준으로 중복 제거
-    unique_by_url: Dict[str, Dict[str, Any]] = {}
-    for art in raw_articles:
-        url = art.get("origin_url") or art.get("url")
-        if not url:
-            continue
-        if url not in unique_by_url:
-            unique_by_url[url] = art
+    # 3) 포함/제외 키워드 비트맵 연산으로 후보를 고르고 스코어 계산
+    #    (유사 기사 묶기 여유분 포함해서 넉넉히), 4) 이미 본 기사 제외 + 유사 기사 묶기
+    ranked = await asyncio.to_thread(
+        article_index.rank,
+        user_keywords,
+        days,
+        limit * RANK_OVERFETCH,
+        scorer,
+        exclude_keywords or (),
+    )
 
-    deduped_articles = list(unique_by_url.values())
+    return _finish_ranked([row for _, row in ranked], limit, seen)
 
-    # 3) 스코어 계산
-    scored: List[tuple[float, Dict[str, Any]]] = []
-    for art in deduped_articles:
-        score = score_article(art, user_keywords, days)
-        scored.append((score, art))
 
-    # 4) 점수 순으로 정렬 후 상위 limit개 선택
-    scored.sort(key=lambda x: x[0], reverse=True)
-    top = [a for _, a in scored[:limit]]
+def _finish_ranked(rows: List[Dict[str, Any]], limit: int, seen=None) -> List[NewsArticle]:
+    """
+    점수순 기사 row -> 이미 본 기사 제외, 제목+요약 SimHash 로 유사 기사(같은 기사 재전송 등) 묶은 뒤 상위 limit개
+    """
+    if seen is not None:
+        rows = [row for row in rows if article_key(row) not in seen]
 
     result: List[NewsArticle] = []
-    for art in top:
-        published_str = (
-            art.get("publishedAt")
-            or art.get("published_at")
-        )
+    for art in collapse_near_duplicates(rows)[:limit]:
+        published_dt = art["published_dt"].replace(tzinfo=timezone.utc).astimezone(KST)
+        result.append(_to_news_article(art, published_dt))
+    return result
+
+
+async def get_personalized_feed(
+    user_id: int,
+    user_keywords: List[str],
+    exclude_keywords: List[str],
+    days: int = 3,
+    per_keyword: int = 5,
+    ranking: str = DEFAULT_RANKING,
+    db: Optional[Session] = None,
+) -> Tuple[str, List[NewsArticle]]:
+    """
+    사용자 피드 전체(FEED_MAX_ITEMS개)를 캐시에서 꺼내거나, 없으면 계산해서 캐시에 저장.
+    db 가 있으면 새로 계산할 때 이미 본 기사(seen filter)를 뺀다.
+    반환: (버전 태그, 정렬된 피드) — 버전 태그는 페이지 커서에 들어간다.
+    """
+    record_keywords(user_keywords)
+
+    try:
+        await asyncio.to_thread(article_index.sync_from_store)
+    except Exception as e:
+        print(f"[ERR] article index sync failed: {e}")
+
+    version = feed_version(user_keywords, exclude_keywords, days, ranking, article_index.generation)
+    cached = feed_cache.get(user_id, version)
+    if cached is not None:
+        return version, cached
+
+    seen = None
+    if db is not None:
         try:
-            published_dt = date_parser.parse(published_str)
-        except Exception:
-            published_dt = datetime.utcnow()
-
-        # 네이버 응답의 "summary"를 NewsArticle.description에 매핑
-        description = art.get("description") or art.get("summary")
-
-        # 네이버 응답의 "source"는 문자열이므로 그대로 사용
-        src = art.get("source")
-        if isinstance(src, dict):
-            src_name = src.get("name")
-        else:
-            src_name = src
-
-        result.append(
-            NewsArticle(
-                title=art.get("title", ""),
-                description=description,
-                url=art.get("origin_url") or art.get("url", ""),
-                published_at=published_dt,
-                source=src_name,
-            )
-        )
+            seen = await asyncio.to_thread(SeenFilterRepository(db).load, user_id)
+        except Exception as e:
+            print(f"[ERR] seen filter load failed: {e}")
 
+    items = await get_personalized_articles(
+        user_keywords=user_keywords,
+        days=days,
+        per_keyword=per_keyword,
+        limit=FEED_MAX_ITEMS,
+        ranking=ranking,
+        exclude_keywords=exclude_keywords,
+        seen=seen,
+    )
+    # 라이브 보충으로 색인 세대가 바뀌었을 수 있으니 계산이 끝난 시점 기준으로 버전을 다시 만든다
+    version = feed_version(user_keywords, exclude_keywords, days, ranking, article_index.generation)
+    feed_cache.put(user_id, version, items)
+    return version, items
+
+
+def precompute_feeds(
+    db: Session,
+    subscriptions: Dict[int, Tuple[List[str], List[str]]],
+    days: int = 3,
+) -> int:
+    """
+    수집 사이클 직후 구독 사용자들의 기본 피드(ranking=keyword, days=3)를 배치 랭킹 엔진으로
+    한 번에 계산해서 feed_cache 에 넣어 둔다. 버전 태그가 요청 경로와 같아서 첫 페이지 요청이 캐시에서 끝난다.
+    subscriptions: user_id -> (포함 키워드, 제외 키워드)  (fanout_service.load_subscriptions)
+    반환값: 새로 캐시에 넣은 사용자 수
+    """
+    article_index.sync_from_store()
+    generation = article_index.generation
+    versions = {
+        user_id: feed_version(include, exclude, days, DEFAULT_RANKING, generation)
+        for user_id, (include, exclude) in subscriptions.items()
+    }
+    user_ids = [u for u, version in versions.items() if feed_cache.get(u, version) is None]
+    if not user_ids:
+        return 0
+
+    ranked = rank_users_batch(
+        [subscriptions[u][0] for u in user_ids],
+        days=days,
+        k=FEED_MAX_ITEMS * RANK_OVERFETCH,
+        users_excludes=[subscriptions[u][1] for u in user_ids],
+    )
+    seen_repo = SeenFilterRepository(db)
+    for user_id, user_ranked in zip(user_ids, ranked):
+        seen = seen_repo.load(user_id)
+        items = _finish_ranked([row for _, row in user_ranked], FEED_MAX_ITEMS, seen)
+        feed_cache.put(user_id, versions[user_id], items)
+    return len(user_ids)
+
+
+def mark_articles_seen(db: Session, user_id: int, articles: List[NewsArticle]) -> None:
+    """
+    응답으로 내보낸 기사를 사용자 seen filter 에 기록 (다음 피드 계산부터 제외)
+    """
+    try:
+        SeenFilterRepository(db).mark_seen(user_id, [a.url for a in articles])
+    except Exception as e:
+        db.rollback()
+        print(f"[ERR] seen filter update failed: {e}")
+
+
+def get_inbox_articles(db: Session, user_id: int, days: int = 3, limit: int = 20) -> List[InboxArticle]:
+    """
+    수집 시점에 fan-out 된 사용자 인박스 (최신순, 유사 기사 묶기)
+    """
+    rows = InboxRepository(db).get_inbox(user_id, days=days, limit=limit * RANK_OVERFETCH)
+    result: List[InboxArticle] = []
+    for art in collapse_near_duplicates(rows)[:limit]:
+        published_dt = art["published_dt"].replace(tzinfo=timezone.utc).astimezone(KST)
+        article = _to_news_article(art, published_dt)
+        result.append(InboxArticle(**article.model_dump(), matched_keywords=art["matched_keywords"]))
     return result
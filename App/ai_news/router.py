@@ -1,47 +1,115 @@
+from typing import Literal, Optional
+
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from App.core.database import get_db
 from App.user.models import User  # 기존 User 모델
 
-from .schemas import PersonalizedNewsResponse
-from .aiNews_service import build_user_keywords
-from .recommendService import get_personalized_articles
+from .schemas import InboxResponse, PersonalizedNewsResponse
+from .aiNews_service import build_user_keyword_sets
+from .feed_cache import FeedCursor, decode_cursor, feed_cache, page
+from .recommendService import (
+    DEFAULT_RANKING,
+    get_inbox_articles,
+    get_personalized_feed,
+    mark_articles_seen,
+)
 from App.user.deps import get_current_user
 
 router = APIRouter(prefix="/api/news", tags=["news"])
 
 
 @router.get("/personalized", response_model=PersonalizedNewsResponse)
-def get_personalized_news(
+async def get_personalized_news(
     days: int = Query(3, ge=1, le=7, description="최근 N일"),
     limit: int = Query(20, ge=1, le=50),
+    ranking: Literal["keyword", "bm25"] = Query(
+        DEFAULT_RANKING, description="정렬 방식 (keyword: 키워드 수+최신, bm25: BM25+시간 감쇠)"
+    ),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor (다음 페이지)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     초기 온보딩에서 입력받은 취향을 기반으로
     최근 days일 동안의 사용자 맞춤형 뉴스를 추천.
+    cursor 없이 부르면 첫 페이지, 응답의 next_cursor 로 다음 페이지를 가져온다.
+    (커서가 가리키는 피드는 캐시에 고정되어 있어서 다음 페이지는 캐시 조회만 하고,
+    days / ranking 도 커서에 들어 있는 값을 따른다)
     """
     user_id = current_user.id
 
-    user_keywords = build_user_keywords(db, user_id)
+    # 다음 페이지: 커서에 들어 있는 피드 버전으로 캐시만 조회
+    if cursor:
+        decoded = decode_cursor(cursor)
+        if decoded is None:
+            raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+        items = feed_cache.get(user_id, decoded.version)
+        if items is None:
+            raise HTTPException(
+                status_code=410,
+                detail="피드가 갱신되었습니다. 처음부터 다시 불러와 주세요.",
+            )
+        articles, next_cursor = page(items, decoded, limit)
+        await run_in_threadpool(mark_articles_seen, db, user_id, articles)
+        return PersonalizedNewsResponse(
+            user_id=user_id,
+            days=decoded.days,
+            ranking=decoded.ranking,
+            total=len(articles),
+            articles=articles,
+            next_cursor=next_cursor,
+        )
+
+    user_keywords, exclude_keywords = await run_in_threadpool(
+        build_user_keyword_sets, db, user_id
+    )
     if not user_keywords:
         raise HTTPException(
             status_code=400,
             detail="온보딩 정보가 없어서 맞춤형 뉴스를 제공할 수 없습니다.",
         )
 
-    articles = get_personalized_articles(
+    version, items = await get_personalized_feed(
+        user_id=user_id,
         user_keywords=user_keywords,
+        exclude_keywords=exclude_keywords,
         days=days,
         per_keyword=5,
-        limit=limit,
+        ranking=ranking,
+        db=db,
     )
+    articles, next_cursor = page(items, FeedCursor(version, 0, days, ranking), limit)
+    # 내보낸 기사는 본 것으로 기록 (다음 피드 버전부터 제외, 현재 커서 피드는 그대로)
+    await run_in_threadpool(mark_articles_seen, db, user_id, articles)
 
     return PersonalizedNewsResponse(
         user_id=user_id,
         days=days,
+        ranking=ranking,
+        total=len(articles),
+        articles=articles,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/inbox", response_model=InboxResponse)
+async def get_news_inbox(
+    days: int = Query(3, ge=1, le=7, description="최근 N일"),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    수집 직후 구독 키워드(Q1/Q2) 매칭으로 사용자에게 전달된 새 기사 (Q3 제외 키워드 반영).
+    요청 시점에는 매칭 계산 없이 인박스 테이블만 읽는다.
+    """
+    articles = await run_in_threadpool(get_inbox_articles, db, current_user.id, days, limit)
+    return InboxResponse(
+        user_id=current_user.id,
+        days=days,
         total=len(articles),
         articles=articles,
     )
@@ -8,9 +8,21 @@ class NewsArticle(BaseModel):
     url: str
     published_at: datetime
     source: Optional[str] = None
+    related_count: int = 1  # 같은 내용으로 묶인 유사 기사 수 (자기 포함)
 
 class PersonalizedNewsResponse(BaseModel):
     user_id: int
     days: int
+    ranking: str = "keyword"
     total: int
     articles: List[NewsArticle]
+    next_cursor: Optional[str] = None  # 다음 페이지 커서 (마지막 페이지면 None)
+
+class InboxArticle(NewsArticle):
+    matched_keywords: List[str] = []  # 인박스에 들어오게 한 구독 키워드
+
+class InboxResponse(BaseModel):
+    user_id: int
+    days: int
+    total: int
+    articles: List[InboxArticle]
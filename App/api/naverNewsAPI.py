@@ -4,12 +4,22 @@ import os
 import time
 import re
 import html
-from typing import List, Dict, Optional
+import asyncio
+import threading
+from typing import List, Dict, Optional, Set, Tuple
 from datetime import datetime
 from email.utils import parsedate_to_datetime
 
 from dotenv import load_dotenv
-import requests
+import httpx
+
+from App.core.cache import AsyncTTLCache
+from App.core.http_client import get_naver_client, get_naver_async_client
+from App.core.rate_limiter import (
+    PRIORITY_INTERACTIVE,
+    backoff_delay,
+    get_naver_rate_limiter,
+)
 
 # ---------------------------
 # 환경변수 / 기본 설정
@@ -24,6 +34,9 @@ if not client_id or not client_secret:
 
 BASE_URL = "https://openapi.naver.com/v1/search/news.json"
 
+# 429 / 5xx / 네트워크 오류 시 재시도 횟수 (지수 백오프 + jitter)
+MAX_RETRIES = 4
+
 HEADERS = {
     "X-Naver-Client-Id": client_id,
     "X-Naver-Client-Secret": client_secret,
@@ -67,6 +80,127 @@ def is_within_days_kst(pub_date: str, days: int = 3) -> bool:
         return False
 
 
+# ---------------------------
+# 응답 파싱 / 중복 제거 (sync, async 경로 공용)
+# ---------------------------
+
+def _to_row(it: Dict) -> Dict:
+    return {
+        "title": clean_text(it.get("title")),
+        "summary": clean_text(it.get("description")),
+        "published_at": it.get("pubDate"),
+        # 네이버는 별도의 source name 필드는 없어서
+        # originallink(언론사 페이지)를 그대로 source로 쓰는 정도
+        "source": clean_text(it.get("originallink") or ""),
+        "url": it.get("link"),  # 네이버 뉴스 링크
+        "origin_url": it.get("originallink"),  # 원문 언론사 링크
+    }
+
+
+# ---------------------------
+# 증분(incremental) 수집용 워터마크
+# ---------------------------
+# query -> (지금까지 본 가장 최신 pubDate, 그 시각에 본 기사 키들)
+# sort=date(최신순)이므로 다음 호출에서 워터마크보다 오래된 기사를 만나면
+# 그 뒤 페이지는 전부 이미 본 기사라서 페이징을 멈출 수 있다.
+_watermarks: Dict[str, Tuple[datetime, Set[str]]] = {}
+_watermark_lock = threading.Lock()
+
+
+def get_watermark(query: str) -> Optional[Tuple[datetime, Set[str]]]:
+    with _watermark_lock:
+        return _watermarks.get(query)
+
+
+def reset_watermarks() -> None:
+    with _watermark_lock:
+        _watermarks.clear()
+
+
+def _advance_watermark(query: str, rows: List[Dict]) -> None:
+    newest: Optional[datetime] = None
+    keys: Set[str] = set()
+    for row in rows:
+        try:
+            dt = parsedate_to_datetime(row.get("published_at") or "")
+        except Exception:
+            continue
+        key = row.get("origin_url") or row.get("url")
+        if newest is None or dt > newest:
+            newest, keys = dt, {key}
+        elif dt == newest:
+            keys.add(key)
+
+    if newest is None:
+        return
+
+    with _watermark_lock:
+        prev = _watermarks.get(query)
+        if prev is None or newest > prev[0]:
+            _watermarks[query] = (newest, keys)
+        elif newest == prev[0]:
+            _watermarks[query] = (newest, prev[1] | keys)
+
+
+def _collect_page(
+    data: Dict,
+    days: int,
+    results: List[Dict],
+    watermark: Optional[Tuple[datetime, Set[str]]] = None,
+) -> bool:
+    """
+    한 페이지 응답에서 최근 `days`일 안의 기사만 results에 담는다.
+    다음 페이지가 필요 없으면 False:
+    - 아이템 없음
+    - 기간 밖(더 오래된) 기사에 도달 (최신순 정렬이라 뒤쪽은 전부 기간 밖)
+    - 워터마크(이미 본 기사)에 도달
+    """
+    items = data.get("items", [])
+    if not items:
+        return False
+
+    for it in items:
+        pub = it.get("pubDate", "")
+        if not is_within_days_kst(pub, days=days):
+            try:
+                dt = parsedate_to_datetime(pub)
+            except Exception:
+                continue
+            if dt.date() < datetime.now(dt.tzinfo).date():
+                return False  # 기간 밖으로 넘어감
+            continue  # 파싱 불가/미래 날짜 등은 버리고 계속
+
+        if watermark is not None:
+            wm_dt, wm_keys = watermark
+            dt = parsedate_to_datetime(pub)
+            if dt < wm_dt:
+                return False  # 여기부터는 지난번에 이미 본 기사
+            if dt == wm_dt and (it.get("originallink") or it.get("link")) in wm_keys:
+                continue
+
+        results.append(_to_row(it))
+    return True
+
+
+def _should_retry(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _dedup(results: List[Dict]) -> List[Dict]:
+    # 중복 제거 (origin_url 우선, 없으면 url로)
+    seen = set()
+    deduped: List[Dict] = []
+    for row in results:
+        key = row["origin_url"] or row["url"]
+        if not key:
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        deduped.append(row)
+    return deduped
+
+
 # ---------------------------
 # 핵심: 재사용 가능한 네이버 뉴스 fetch 함수
 # ---------------------------
@@ -76,11 +210,17 @@ def fetch_naver_news_recent(
     days: int = 3,
     max_pages: int = 3,
     display: int = 100,
+    priority: int = PRIORITY_INTERACTIVE,
+    incremental: bool = False,
 ) -> List[Dict]:
     """
     - 네이버 뉴스 검색 API에서 `query`로 검색
     - sort=date (최신순)
     - pubDate 기준으로 최근 `days`일 안에 있는 기사만 필터링
+    - 모든 페이지 호출은 공유 레이트 리미터를 거침 (`priority`: 인터랙티브/백그라운드)
+    - incremental=True 면 지난 호출 이후 새로 올라온 기사(delta)만 반환하고,
+      이미 본 기사에 도달하는 즉시 페이징을 멈춤 (수집 루프용).
+      한도/오류/max_pages 로 워터마크까지 못 가고 끊기면 워터마크는 올리지 않음
     - 결과는 중복(origin_url 또는 url 기준) 제거 후 Dict 리스트로 반환
 
     반환 형식 예:
@@ -93,11 +233,21 @@ def fetch_naver_news_recent(
         "origin_url": "..."
     }
     """
+    client = get_naver_client()
+    limiter = get_naver_rate_limiter()
     results: List[Dict] = []
     start = 1
     pages = 0
+    attempt = 0
+    watermark = get_watermark(query) if incremental else None
+    caught_up = False   # 워터마크 / 기간 끝 / 마지막 결과까지 실제로 훑었는지
 
     while pages < max_pages:
+        # 워커 간 공유 토큰 버킷 + 일일 예산 (호출 간 간격도 여기서 조절됨)
+        if not limiter.acquire(priority):
+            print(f"[ERR] Naver rate limit/daily budget exhausted (query={query})")
+            break
+
         params = {
             "query": query,
             "display": display,
@@ -105,67 +255,245 @@ def fetch_naver_news_recent(
             "sort": "date",  # 최신순
         }
         try:
-            resp = requests.get(BASE_URL, params=params, headers=HEADERS, timeout=8)
-        except requests.RequestException as e:
+            resp = client.get(BASE_URL, params=params, headers=HEADERS)
+        except httpx.HTTPError as e:
+            if attempt < MAX_RETRIES:
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
             print(f"[ERR] Naver request failed: {e}")
             break
 
-        if resp.status_code == 429:
-            # 레이트리밋: 간단한 백오프
-            time.sleep(1.0)
+        if _should_retry(resp.status_code) and attempt < MAX_RETRIES:
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
             continue
 
-        if not resp.ok:
+        if not resp.is_success:
             print(f"[ERR] status={resp.status_code}, body={resp.text[:200]}")
             break
 
+        attempt = 0
         data = resp.json()
-        items = data.get("items", [])
-        if not items:
+        if not _collect_page(data, days, results, watermark):
+            caught_up = True
             break
 
-        for it in items:
-            pub = it.get("pubDate", "")
-            if not is_within_days_kst(pub, days=days):
-                continue  # 최근 days일 밖이면 버림
-
-            results.append(
-                {
-                    "title": clean_text(it.get("title")),
-                    "summary": clean_text(it.get("description")),
-                    "published_at": it.get("pubDate"),
-                    # 네이버는 별도의 source name 필드는 없어서
-                    # originallink(언론사 페이지)를 그대로 source로 쓰는 정도
-                    "source": clean_text(it.get("originallink") or ""),
-                    "url": it.get("link"),  # 네이버 뉴스 링크
-                    "origin_url": it.get("originallink"),  # 원문 언론사 링크
-                }
-            )
-
         total = data.get("total", 0)
 
         pages += 1
         start += display
         if start > total:
+            caught_up = True
             break
 
-        time.sleep(0.2)
+    deduped = _dedup(results)
+    # 중간에 끊겼으면(한도/오류/max_pages) 워터마크를 그대로 둬야 사이에 못 받은 기사를 다음 호출에서 받는다
+    if incremental and caught_up:
+        _advance_watermark(query, deduped)
+    return deduped
+
 
-    # 중복 제거 (origin_url 우선, 없으면 url로)
-    seen = set()
-    deduped: List[Dict] = []
-    for row in results:
-        key = row["origin_url"] or row["url"]
-        if not key:
-            continue
-        if key in seen:
+# ---------------------------
+# asyncio 기반 fetch 경로
+# ---------------------------
+
+class NaverFetchError(RuntimeError):
+    """
+    호출 한도 소진 / 네트워크 오류 / 2xx 아닌 응답으로 페이징이 중간에 끊겼을 때.
+    partial 에는 그때까지 받은 결과 (없으면 빈 리스트)
+    """
+
+    def __init__(self, query: str, partial: List[Dict]):
+        super().__init__(f"Naver fetch incomplete (query={query}, rows={len(partial)})")
+        self.partial = partial
+
+
+async def _fetch_recent_pages_async(
+    query: str,
+    days: int,
+    max_pages: int,
+    display: int,
+    priority: int,
+    watermark: Optional[Tuple[datetime, Set[str]]],
+) -> Tuple[List[Dict], bool, bool]:
+    """
+    반환: (중복 제거 전 결과, 실패 없이 끝났는지, 워터마크 / 기간 끝 / 마지막 결과까지 훑었는지)
+    """
+    client = get_naver_async_client()
+    limiter = get_naver_rate_limiter()
+    results: List[Dict] = []
+    start = 1
+    pages = 0
+    attempt = 0
+
+    while pages < max_pages:
+        if not await limiter.acquire_async(priority):
+            print(f"[ERR] Naver rate limit/daily budget exhausted (query={query})")
+            return results, False, False
+
+        params = {
+            "query": query,
+            "display": display,
+            "start": start,
+            "sort": "date",  # 최신순
+        }
+        try:
+            resp = await client.get(BASE_URL, params=params, headers=HEADERS)
+        except httpx.HTTPError as e:
+            if attempt < MAX_RETRIES:
+                await asyncio.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+            print(f"[ERR] Naver request failed: {e}")
+            return results, False, False
+
+        if _should_retry(resp.status_code) and attempt < MAX_RETRIES:
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
             continue
-        seen.add(key)
-        deduped.append(row)
 
+        if not resp.is_success:
+            print(f"[ERR] status={resp.status_code}, body={resp.text[:200]}")
+            return results, False, False
+
+        attempt = 0
+        data = resp.json()
+        if not _collect_page(data, days, results, watermark):
+            return results, True, True
+
+        total = data.get("total", 0)
+
+        pages += 1
+        start += display
+        if start > total:
+            return results, True, True
+
+    # max_pages 에서 멈춤: 실패는 아니지만 워터마크까지 다 훑지는 못함
+    return results, True, False
+
+
+async def fetch_naver_news_recent_async(
+    query: str,
+    days: int = 3,
+    max_pages: int = 3,
+    display: int = 100,
+    priority: int = PRIORITY_INTERACTIVE,
+    incremental: bool = False,
+    raise_on_error: bool = False,
+) -> List[Dict]:
+    """
+    fetch_naver_news_recent 의 코루틴 버전.
+    공용 AsyncClient 커넥션 풀을 사용하므로 이벤트 루프를 막지 않는다.
+    raise_on_error=True 면 페이징이 실패로 끊겼을 때 부분 결과를 담아 NaverFetchError 를 던진다.
+    """
+    watermark = get_watermark(query) if incremental else None
+    results, complete, caught_up = await _fetch_recent_pages_async(
+        query, days, max_pages, display, priority, watermark
+    )
+    deduped = _dedup(results)
+    # 중간에 끊겼으면(한도/오류/max_pages) 워터마크를 그대로 둬야 사이에 못 받은 기사를 다음 호출에서 받는다
+    if incremental and caught_up:
+        _advance_watermark(query, deduped)
+    if raise_on_error and not complete:
+        raise NaverFetchError(query, deduped)
     return deduped
 
 
+# (query, days, display, max_pages) -> 결과 리스트
+# 여러 사용자가 같은 키워드(코스피, 환율 ...)를 동시에 조회해도 네이버 호출은 한 번
+# 기사가 없는 키워드(빈 결과)는 짧게만 캐시
+NAVER_CACHE_TTL_SEC = float(os.getenv("NAVER_CACHE_TTL_SEC", "120"))
+NAVER_CACHE_EMPTY_TTL_SEC = float(os.getenv("NAVER_CACHE_EMPTY_TTL_SEC", "30"))
+_news_cache = AsyncTTLCache(
+    maxsize=int(os.getenv("NAVER_CACHE_MAXSIZE", "1024")),
+    ttl=NAVER_CACHE_TTL_SEC,
+    stale_ttl=float(os.getenv("NAVER_CACHE_STALE_SEC", "600")),
+    ttl_for=lambda rows: NAVER_CACHE_TTL_SEC if rows else NAVER_CACHE_EMPTY_TTL_SEC,
+)
+
+
+async def fetch_naver_news_recent_cached(
+    query: str,
+    days: int = 3,
+    max_pages: int = 3,
+    display: int = 100,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> List[Dict]:
+    """
+    fetch_naver_news_recent_async 앞단의 TTL 캐시 (stale-while-revalidate + single-flight).
+    반환 리스트는 캐시와 공유되므로 호출한 쪽에서 수정하지 말 것.
+    실패로 끊긴 결과는 캐시하지 않는다 (백그라운드 갱신이면 기존 stale 값 유지).
+    정상적으로 끝난 빈 결과는 NAVER_CACHE_EMPTY_TTL_SEC 동안만 캐시.
+    """
+    key = (query, days, display, max_pages)
+
+    async def _load() -> List[Dict]:
+        return await fetch_naver_news_recent_async(
+            query, days=days, max_pages=max_pages, display=display, priority=priority,
+            raise_on_error=True,
+        )
+
+    try:
+        return await _news_cache.get_or_load(key, _load)
+    except NaverFetchError as e:
+        return e.partial
+
+
+async def fetch_naver_news_many(
+    queries: List[str],
+    days: int = 3,
+    max_pages: int = 1,
+    display: int = 20,
+    concurrency: int = 6,
+    deadline: float = 6.0,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> List[Dict]:
+    """
+    여러 키워드를 동시에(최대 `concurrency`개) 조회해서 합친다.
+
+    - 먼저 끝난 키워드부터 결과를 합치면서 중복(origin_url 우선, 없으면 url) 제거
+    - `deadline`초 안에 끝나지 않은 키워드는 버리고, 그때까지 모인 결과만 반환
+      (전체 지연이 키워드 수의 합이 아니라 가장 느린 한 건에 좌우되도록)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _fetch_one(q: str) -> List[Dict]:
+        async with semaphore:
+            return await fetch_naver_news_recent_cached(
+                q, days=days, max_pages=max_pages, display=display, priority=priority
+            )
+
+    tasks = [asyncio.create_task(_fetch_one(q)) for q in queries]
+
+    seen = set()
+    merged: List[Dict] = []
+    try:
+        for next_done in asyncio.as_completed(tasks, timeout=deadline):
+            try:
+                rows = await next_done
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                print(f"[ERR] Naver fan-out query failed: {e}")
+                continue
+
+            for row in rows:
+                key = row.get("origin_url") or row.get("url")
+                if key and key not in seen:
+                    seen.add(key)
+                    merged.append(row)
+    except asyncio.TimeoutError:
+        pending = sum(1 for t in tasks if not t.done())
+        print(f"[WARN] Naver fan-out deadline({deadline}s) 초과, 미완료 {pending}건은 제외")
+    finally:
+        for t in tasks:
+            if not t.done():
+                t.cancel()
+
+    return merged
+
+
 # 간단 테스트용 (로컬 실행 시에만)
 if __name__ == "__main__":
     rows = fetch_naver_news_recent("오늘의 주요 경제뉴스", days=3)
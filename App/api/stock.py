@@ -1,9 +1,11 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from App.core.database import get_db
+from App.service.market_snapshot import NUMERIC_COLUMNS, snapshot_store
 from App.service.stock_service import stock_service
 from App.user.models import UserOnBoarding
 from App.service.preferenceService import Q1_CATEGORIES  # Q1 카테고리 메타데이터 (id, key, label 등)
@@ -67,7 +69,7 @@ async def recommend_personal(
     - DB에 저장된 온보딩 정보를 읽어서
     - stock_service.get_recommendation()에 넘긴다.
     """
-    user_data = build_user_data_from_onboarding(user_id=user_id, db=db)
+    user_data = await run_in_threadpool(build_user_data_from_onboarding, user_id=user_id, db=db)
 
     try:
         result = await stock_service.get_recommendation(user_data)
@@ -75,3 +77,65 @@ async def recommend_personal(
     except Exception as e:
         # 내부 에러는 500으로 래핑
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/screener")
+async def screener(
+    market: Optional[str] = None,               # KOSPI / KOSDAQ
+    sector: Optional[str] = None,               # 업종명 일부 (예: 반도체)
+    min_return_5d: Optional[float] = None,      # 수익률/변동성은 비율 (0.05 = 5%)
+    max_return_5d: Optional[float] = None,
+    min_return_14d: Optional[float] = None,
+    max_return_14d: Optional[float] = None,
+    min_return_60d: Optional[float] = None,
+    max_return_60d: Optional[float] = None,
+    max_volatility_20d: Optional[float] = None,
+    min_volume_spike: Optional[float] = None,   # 오늘 거래량 / 20일 평균
+    min_marcap: Optional[float] = None,
+    golden_cross: Optional[bool] = None,
+    dead_cross: Optional[bool] = None,
+    above_ma60: Optional[bool] = None,
+    sort: str = "return_14d",
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """
+    전 종목 스크리너. 야간 배치(market_snapshot)가 계산해 둔 지표 열에서 필터/정렬만 한다.
+    """
+    if sort not in NUMERIC_COLUMNS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"sort 는 {', '.join(NUMERIC_COLUMNS)} 중 하나여야 합니다.",
+        )
+
+    snapshot = await run_in_threadpool(snapshot_store.current)
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="시장 스냅샷이 아직 생성되지 않았습니다.")
+
+    ranges = {
+        "return_5d": (min_return_5d, max_return_5d),
+        "return_14d": (min_return_14d, max_return_14d),
+        "return_60d": (min_return_60d, max_return_60d),
+        "volatility_20d": (None, max_volatility_20d),
+        "volume_spike": (min_volume_spike, None),
+        "marcap": (min_marcap, None),
+    }
+    flags = {
+        "golden_cross": golden_cross,
+        "dead_cross": dead_cross,
+        "above_ma60": above_ma60,
+    }
+    total, items = snapshot.screen(
+        ranges={k: v for k, v in ranges.items() if v != (None, None)},
+        flags={k: v for k, v in flags.items() if v is not None},
+        market=market,
+        sector=sector,
+        sort=sort,
+        descending=order == "desc",
+        limit=limit,
+    )
+    return {
+        "as_of": snapshot.as_of,
+        "total": total,
+        "items": items,
+    }
@@ -0,0 +1,192 @@
+# App/core/bitmap.py
+"""
+Roaring 방식의 압축 비트맵 (정수 id 집합).
+
+id 를 상위 16bit(컨테이너 키) / 하위 16bit 로 나눠서 컨테이너별로
+- 원소가 적으면(<= ARRAY_MAX) 정렬된 array('H')  : 원소당 2바이트
+- 많으면 65536bit 비트셋(int)                      : 최대 8KB 고정
+중 작은 쪽으로 저장한다. 비어 버린 컨테이너는 바로 지우므로, 기사 id 가 계속 늘어나도
+메모리는 현재 살아 있는 id 개수/범위에만 비례한다.
+
+합집합(|), 교집합(&), 차집합(-) 은 컨테이너 단위로 계산한다.
+"""
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, Union
+
+import numpy as np
+
+ARRAY_MAX = 4096
+_BITSET_BYTES = 65536 // 8
+
+Container = Union[array, int]
+
+
+def _to_bits(c: Container) -> int:
+    if isinstance(c, int):
+        return c
+    buf = np.zeros(65536, dtype=np.uint8)
+    buf[np.frombuffer(c, dtype=np.uint16)] = 1
+    return int.from_bytes(np.packbits(buf, bitorder="little").tobytes(), "little")
+
+
+def _bits_to_values(bits: int) -> np.ndarray:
+    raw = np.frombuffer(bits.to_bytes(_BITSET_BYTES, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little")).astype(np.uint16)
+
+
+def _normalize(c: Container) -> Container:
+    """
+    원소 수에 맞게 array / 비트셋 중 하나로 변환. 비었으면 None 반환용으로 빈 array.
+    """
+    if isinstance(c, int):
+        if c.bit_count() <= ARRAY_MAX:
+            return array("H", _bits_to_values(c).tobytes())
+        return c
+    if len(c) > ARRAY_MAX:
+        return _to_bits(c)
+    return c
+
+
+def _card(c: Container) -> int:
+    return c.bit_count() if isinstance(c, int) else len(c)
+
+
+def _or(a: Container, b: Container) -> Container:
+    if isinstance(a, int) or isinstance(b, int):
+        return _to_bits(a) | _to_bits(b)
+    merged = np.union1d(np.frombuffer(a, dtype=np.uint16), np.frombuffer(b, dtype=np.uint16))
+    return _normalize(array("H", merged.astype(np.uint16).tobytes()))
+
+
+def _and(a: Container, b: Container) -> Container:
+    if isinstance(a, int) and isinstance(b, int):
+        return _normalize(a & b)
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        # array & 비트셋: array 원소 중 비트가 켜진 것만
+        return array("H", (v for v in a if (b >> v) & 1))
+    common = np.intersect1d(np.frombuffer(a, dtype=np.uint16), np.frombuffer(b, dtype=np.uint16))
+    return array("H", common.astype(np.uint16).tobytes())
+
+
+def _andnot(a: Container, b: Container) -> Container:
+    if isinstance(a, int):
+        return _normalize(a & ~_to_bits(b))
+    if isinstance(b, int):
+        return array("H", (v for v in a if not (b >> v) & 1))
+    diff = np.setdiff1d(np.frombuffer(a, dtype=np.uint16), np.frombuffer(b, dtype=np.uint16))
+    return array("H", diff.astype(np.uint16).tobytes())
+
+
+class RoaringBitmap:
+    __slots__ = ("_containers",)
+
+    def __init__(self, values: Iterable[int] = ()):
+        self._containers: Dict[int, Container] = {}
+        for v in values:
+            self.add(v)
+
+    # ---------- 원소 단위 ----------
+    def add(self, value: int) -> None:
+        key, low = value >> 16, value & 0xFFFF
+        c = self._containers.get(key)
+        if c is None:
+            self._containers[key] = array("H", [low])
+        elif isinstance(c, int):
+            self._containers[key] = c | (1 << low)
+        else:
+            i = bisect_left(c, low)
+            if i == len(c) or c[i] != low:
+                c.insert(i, low)
+                if len(c) > ARRAY_MAX:
+                    self._containers[key] = _to_bits(c)
+
+    def discard(self, value: int) -> None:
+        key, low = value >> 16, value & 0xFFFF
+        c = self._containers.get(key)
+        if c is None:
+            return
+        if isinstance(c, int):
+            c &= ~(1 << low)
+            c = _normalize(c)
+        else:
+            i = bisect_left(c, low)
+            if i < len(c) and c[i] == low:
+                del c[i]
+        if _card(c):
+            self._containers[key] = c
+        else:
+            del self._containers[key]
+
+    def __contains__(self, value: int) -> bool:
+        c = self._containers.get(value >> 16)
+        if c is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(c, int):
+            return bool((c >> low) & 1)
+        i = bisect_left(c, low)
+        return i < len(c) and c[i] == low
+
+    def __len__(self) -> int:
+        return sum(_card(c) for c in self._containers.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._containers)
+
+    def __iter__(self) -> Iterator[int]:
+        for key in sorted(self._containers):
+            base = key << 16
+            c = self._containers[key]
+            lows = _bits_to_values(c) if isinstance(c, int) else c
+            for low in lows:
+                yield base | int(low)
+
+    def copy(self) -> "RoaringBitmap":
+        out = RoaringBitmap()
+        out._containers = {
+            k: (c if isinstance(c, int) else array("H", c)) for k, c in self._containers.items()
+        }
+        return out
+
+    # ---------- 집합 연산 ----------
+    def __or__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        out = self.copy()
+        for key, c in other._containers.items():
+            mine = out._containers.get(key)
+            out._containers[key] = (
+                (c if isinstance(c, int) else array("H", c)) if mine is None else _or(mine, c)
+            )
+        return out
+
+    def __and__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        out = RoaringBitmap()
+        for key in self._containers.keys() & other._containers.keys():
+            c = _and(self._containers[key], other._containers[key])
+            if _card(c):
+                out._containers[key] = c
+        return out
+
+    def __sub__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        out = RoaringBitmap()
+        for key, c in self._containers.items():
+            theirs = other._containers.get(key)
+            c = (c if isinstance(c, int) else array("H", c)) if theirs is None else _andnot(c, theirs)
+            if _card(c):
+                out._containers[key] = c
+        return out
+
+    @classmethod
+    def union(cls, bitmaps: Iterable["RoaringBitmap"]) -> "RoaringBitmap":
+        out = cls()
+        for bm in bitmaps:
+            out = out | bm
+        return out
+
+    def size_in_bytes(self) -> int:
+        return sum(
+            _BITSET_BYTES if isinstance(c, int) else 2 * len(c)
+            for c in self._containers.values()
+        )
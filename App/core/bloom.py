@@ -0,0 +1,128 @@
+# App/core/bloom.py
+"""
+Bloom filter + 시간 회전(rotating) Bloom filter.
+
+"이미 본 기사" 같은 집합을 전체 이력 없이 몇 KB 로 기억하기 위한 용도.
+- 없다고 하면 확실히 없음, 있다고 하면 false positive 확률(fp_rate)로 틀릴 수 있음
+- 비트 수 m = -n ln(p) / (ln 2)^2, 해시 수 k = (m / n) ln 2  (n: 세대당 예상 원소 수)
+- 해시: blake2b 128bit 를 둘로 나눈 double hashing (h1 + i * h2)
+
+RotatingBloomFilter 는 세대(generation)를 여러 개 두고 rotate_seconds 마다 가장 오래된
+세대를 버린다. 조회는 모든 세대, 추가는 최신 세대에만 한다.
+→ 대략 (세대 수 - 1) ~ 세대 수 x rotate_seconds 동안 본 것을 기억하고, 크기는 고정.
+"""
+import hashlib
+import math
+import struct
+import time
+from typing import Iterable, List, Optional, Tuple
+
+_HEADER = struct.Struct(">BIBd")  # version, m_bits, k, 최신 세대 시작 시각(epoch)
+_VERSION = 1
+
+
+def optimal_params(capacity: int, fp_rate: float) -> Tuple[int, int]:
+    """
+    (비트 수, 해시 수)
+    """
+    capacity = max(1, capacity)
+    fp_rate = min(max(fp_rate, 1e-9), 0.5)
+    m = int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+    m = (m + 7) // 8 * 8
+    k = max(1, int(round(m / capacity * math.log(2))))
+    return m, k
+
+
+def _hashes(key: str, m: int, k: int) -> List[int]:
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    h1, h2 = struct.unpack(">QQ", digest)
+    h2 |= 1
+    return [(h1 + i * h2) % m for i in range(k)]
+
+
+class BloomFilter:
+    __slots__ = ("m", "k", "bits")
+
+    def __init__(self, m: int, k: int, bits: Optional[bytearray] = None):
+        self.m = m
+        self.k = k
+        self.bits = bits if bits is not None else bytearray(m // 8)
+
+    def add(self, key: str) -> None:
+        for pos in _hashes(key, self.m, self.k):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in _hashes(key, self.m, self.k))
+
+
+class RotatingBloomFilter:
+    def __init__(
+        self,
+        capacity: int,
+        fp_rate: float,
+        generations: int = 2,
+        rotate_seconds: float = 7 * 86400,
+    ):
+        self.m, self.k = optimal_params(capacity, fp_rate)
+        self.rotate_seconds = rotate_seconds
+        self.slots: List[BloomFilter] = [BloomFilter(self.m, self.k) for _ in range(max(1, generations))]
+        self.started_at = time.time()  # slots[0](최신 세대) 시작 시각
+
+    def _rotate(self, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        elapsed = now - self.started_at
+        if elapsed < self.rotate_seconds:
+            return
+        steps = min(len(self.slots), int(elapsed // self.rotate_seconds))
+        for _ in range(steps):
+            self.slots.pop()
+            self.slots.insert(0, BloomFilter(self.m, self.k))
+        self.started_at = now
+
+    def add(self, key: str) -> None:
+        self._rotate()
+        self.slots[0].add(key)
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        self._rotate()
+        for key in keys:
+            self.slots[0].add(key)
+
+    def __contains__(self, key: str) -> bool:
+        self._rotate()
+        return any(key in slot for slot in self.slots)
+
+    # ---------- 직렬화 ----------
+    def to_bytes(self) -> bytes:
+        header = _HEADER.pack(_VERSION, self.m, self.k, self.started_at)
+        return header + bytes([len(self.slots)]) + b"".join(bytes(s.bits) for s in self.slots)
+
+    @classmethod
+    def from_bytes(
+        cls,
+        data: bytes,
+        capacity: int,
+        fp_rate: float,
+        generations: int = 2,
+        rotate_seconds: float = 7 * 86400,
+    ) -> "RotatingBloomFilter":
+        """
+        저장된 파라미터(m, k, 세대 수)가 현재 설정과 다르면 새로 시작한다 (설정 변경 시).
+        """
+        bf = cls(capacity, fp_rate, generations, rotate_seconds)
+        try:
+            version, m, k, started_at = _HEADER.unpack_from(data)
+            n_slots = data[_HEADER.size]
+        except (struct.error, IndexError):
+            return bf
+        size = m // 8
+        body = data[_HEADER.size + 1:]
+        if version != _VERSION or (m, k, n_slots) != (bf.m, bf.k, len(bf.slots)) or len(body) != size * n_slots:
+            return bf
+        bf.slots = [
+            BloomFilter(m, k, bytearray(body[i * size:(i + 1) * size])) for i in range(n_slots)
+        ]
+        bf.started_at = started_at
+        return bf
@@ -0,0 +1,198 @@
+# App/core/cache.py
+"""
+asyncio 용 TTL + LRU 캐시.
+
+- ttl 안: 캐시 값을 그대로 반환
+- ttl ~ ttl + stale_ttl: 오래된(stale) 값을 바로 반환하고, 백그라운드에서 한 번만 갱신
+- 그 이후 / 없음: 로더 호출. 같은 키로 동시에 들어온 요청은 하나의 호출 결과를 같이 기다림
+  (single-flight: N개 동시 요청 -> upstream 호출 1번)
+- maxsize 를 넘으면 가장 오래 안 쓰인 키부터 제거
+- ttl_for(value) 를 주면 값마다 ttl 을 따로 정할 수 있음 (예: 빈 결과는 짧게)
+
+이벤트 루프 하나 안에서만 쓰는 것을 전제로 하므로 별도 락은 없다.
+(KST 날짜 단위로 하루 동안 캐시할 때는 DailyCache)
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from App.core.rate_limiter import kst_today
+
+
+class AsyncTTLCache:
+    def __init__(
+        self,
+        maxsize: int = 512,
+        ttl: float = 120.0,
+        stale_ttl: float = 600.0,
+        ttl_for: Optional[Callable[[Any], float]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.ttl_for = ttl_for
+        # key -> (값, 저장 시각, 이 값의 ttl)
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, float]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _set(self, key: Hashable, value: Any) -> None:
+        ttl = self.ttl_for(value) if self.ttl_for is not None else self.ttl
+        self._data[key] = (value, time.monotonic(), ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        self._set(key, value)
+        return value
+
+    def _refresh_in_background(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._refreshing or key in self._inflight:
+            return
+
+        async def _refresh():
+            try:
+                await self._load(key, loader)
+            except Exception as e:
+                # 갱신 실패 시 stale 값 유지
+                print(f"[Cache] background refresh failed ({key}): {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(_refresh())
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            value, stored_at, ttl = entry
+            age = time.monotonic() - stored_at
+            if age < ttl:
+                self._data.move_to_end(key)
+                return value
+            if age < ttl + self.stale_ttl:
+                self._data.move_to_end(key)
+                self._refresh_in_background(key, loader)
+                return value
+
+        # miss: 같은 키로 이미 진행 중인 호출이 있으면 그 결과를 같이 기다림
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _f: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+
+class DailyCache:
+    """
+    KST 날짜 단위 캐시 (스레드 안전, 코루틴 로더는 aget_or_load).
+
+    - 키는 내부적으로 (날짜, key) 로 저장하고, 날짜가 바뀐 뒤 첫 접근 때 이전 날짜 항목을 모두 버린다
+    - 같은 키를 여러 스레드가 동시에 요청하면 로더는 한 번만 호출하고 나머지는 그 결과를 기다린다
+    - maxsize 를 넘으면 가장 오래 안 쓰인 키부터 제거
+    로더가 예외를 던지면 캐시하지 않고 그대로 올린다.
+    """
+
+    def __init__(self, maxsize: int = 10000, today: Optional[Callable[[], str]] = None):
+        self.maxsize = maxsize
+        self._today = today or kst_today
+        self._date = None
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._inflight: Dict[Hashable, threading.Event] = {}
+        self._ainflight: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _roll(self) -> str:
+        today = self._today()
+        if today != self._date:
+            self._data.clear()
+            self._date = today
+        return today
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        while True:
+            with self._lock:
+                full_key = (self._roll(), key)
+                if full_key in self._data:
+                    self._data.move_to_end(full_key)
+                    return self._data[full_key]
+                event = self._inflight.get(full_key)
+                if event is None:
+                    event = threading.Event()
+                    self._inflight[full_key] = event
+                    break
+            # 다른 스레드가 계산 중: 끝나면 다시 조회 (실패했으면 이번 스레드가 이어서 계산)
+            event.wait()
+
+        try:
+            value = loader()
+            self._store(full_key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(full_key, None)
+            event.set()
+
+    def _store(self, full_key: Tuple[str, Hashable], value: Any) -> None:
+        with self._lock:
+            if full_key[0] == self._date:
+                self._data[full_key] = value
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        오늘 날짜로 캐시된 값 (없으면 None). 로더를 부르지 않는다
+        """
+        with self._lock:
+            full_key = (self._roll(), key)
+            if full_key in self._data:
+                self._data.move_to_end(full_key)
+                return self._data[full_key]
+        return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            full_key = (self._roll(), key)
+        self._store(full_key, value)
+
+    async def aget_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        get_or_load 의 코루틴 버전. 같은 루프에서 같은 키로 동시에 들어온 요청은 로더 한 번을 같이 기다린다.
+        """
+        with self._lock:
+            full_key = (self._roll(), key)
+            if full_key in self._data:
+                self._data.move_to_end(full_key)
+                return self._data[full_key]
+            future = self._ainflight.get(full_key)
+            if future is None:
+                async def _load():
+                    value = await loader()
+                    self._store(full_key, value)
+                    return value
+
+                future = asyncio.ensure_future(_load())
+                self._ainflight[full_key] = future
+                future.add_done_callback(lambda _f: self._ainflight.pop(full_key, None))
+        return await asyncio.shield(future)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
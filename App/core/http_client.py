@@ -0,0 +1,115 @@
+# App/core/http_client.py
+"""
+외부 HTTP 호출(네이버 오픈API, 언론사 원문 페이지)에 공통으로 쓰는 커넥션 풀 클라이언트.
+
+- 프로세스당 한 번만 만들어서 keep-alive 커넥션을 재사용 (매 호출마다 TCP+TLS 핸드셰이크 X)
+- 호스트 성격별로 풀을 분리해서 커넥션 수를 따로 제한
+    * naver  : openapi.naver.com 전용
+    * origin : 기사 원문(OG 이미지 추출 등) 용
+- h2 패키지가 설치되어 있으면 HTTP/2 사용
+- 타임아웃은 여기서 한 곳에서 관리
+"""
+import os
+from typing import Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (HTTP/2 지원 여부 확인용)
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+
+NAVER_TIMEOUT = httpx.Timeout(8.0, connect=3.0)
+ORIGIN_TIMEOUT = httpx.Timeout(2.0, connect=1.0)
+
+NAVER_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("NAVER_MAX_CONNECTIONS", "10")),
+    max_keepalive_connections=int(os.getenv("NAVER_MAX_KEEPALIVE", "10")),
+    keepalive_expiry=60.0,
+)
+ORIGIN_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("ORIGIN_MAX_CONNECTIONS", "20")),
+    max_keepalive_connections=int(os.getenv("ORIGIN_MAX_KEEPALIVE", "10")),
+    keepalive_expiry=30.0,
+)
+
+DEFAULT_HEADERS = {"User-Agent": "news-fetcher/1.0"}
+
+_naver_client: Optional[httpx.Client] = None
+_origin_client: Optional[httpx.Client] = None
+_naver_async_client: Optional[httpx.AsyncClient] = None
+_origin_async_client: Optional[httpx.AsyncClient] = None
+
+
+def get_naver_client() -> httpx.Client:
+    global _naver_client
+    if _naver_client is None:
+        _naver_client = httpx.Client(
+            http2=HTTP2_ENABLED,
+            timeout=NAVER_TIMEOUT,
+            limits=NAVER_LIMITS,
+            headers=DEFAULT_HEADERS,
+        )
+    return _naver_client
+
+
+def get_origin_client() -> httpx.Client:
+    global _origin_client
+    if _origin_client is None:
+        _origin_client = httpx.Client(
+            http2=HTTP2_ENABLED,
+            timeout=ORIGIN_TIMEOUT,
+            limits=ORIGIN_LIMITS,
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+        )
+    return _origin_client
+
+
+def get_naver_async_client() -> httpx.AsyncClient:
+    """
+    비동기 클라이언트는 이벤트 루프에 묶이므로 앱의 메인 루프 안에서만 사용할 것.
+    """
+    global _naver_async_client
+    if _naver_async_client is None:
+        _naver_async_client = httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            timeout=NAVER_TIMEOUT,
+            limits=NAVER_LIMITS,
+            headers=DEFAULT_HEADERS,
+        )
+    return _naver_async_client
+
+
+def get_origin_async_client() -> httpx.AsyncClient:
+    global _origin_async_client
+    if _origin_async_client is None:
+        _origin_async_client = httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            timeout=ORIGIN_TIMEOUT,
+            limits=ORIGIN_LIMITS,
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+        )
+    return _origin_async_client
+
+
+async def close_http_clients() -> None:
+    """
+    앱 종료(shutdown) 시 커넥션 풀 정리.
+    """
+    global _naver_client, _origin_client, _naver_async_client, _origin_async_client
+
+    for client in (_naver_client, _origin_client):
+        if client is not None:
+            client.close()
+    for aclient in (_naver_async_client, _origin_async_client):
+        if aclient is not None:
+            await aclient.aclose()
+
+    _naver_client = None
+    _origin_client = None
+    _naver_async_client = None
+    _origin_async_client = None
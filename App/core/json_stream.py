@@ -0,0 +1,127 @@
+# App/core/json_stream.py
+"""
+스트리밍으로 들어오는 JSON 객체 텍스트에서 최상위 필드를 완성되는 대로 꺼내는 증분 파서.
+
+    parser = JsonFieldStream()
+    for delta in llm_stream:
+        for key, value in parser.feed(delta):
+            ...  # "overall" 값이 끝나는 순간 ("overall", "...") 가 나온다
+
+- 첫 '{' 전의 텍스트(```json 같은 코드펜스)는 무시
+- 값은 문자열/배열/객체는 닫히는 순간, 숫자/true/false/null 은 뒤따르는 ',' 또는 '}' 에서 완성
+- 값 하나가 완성될 때만 json.loads 하므로 전체 파싱 비용은 한 번 파싱하는 것과 비슷하다
+값 문법이 깨져 있으면 json.JSONDecodeError(ValueError) 를 그대로 올리고,
+키/':'/','/'}' 자리에 다른 글자가 오면(공백 제외) ValueError 를 올린다.
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+_SEEK, _KEY_START, _KEY, _COLON, _VALUE, _AFTER_VALUE, _DONE = range(7)
+
+
+class JsonFieldStream:
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self._state = _SEEK
+        self._key: Optional[str] = None
+        self._buf: List[str] = []
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._after_comma = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def _complete(self, out: List[Tuple[str, Any]]) -> None:
+        value = json.loads("".join(self._buf))
+        self.fields[self._key] = value
+        out.append((self._key, value))
+        self._buf = []
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        새 텍스트 조각 -> 이번 조각으로 완성된 (필드명, 값) 목록
+        """
+        out: List[Tuple[str, Any]] = []
+        for ch in text:
+            state = self._state
+            if state == _DONE:
+                break
+
+            if state == _SEEK:
+                if ch == "{":
+                    self._state = _KEY_START
+
+            elif state == _KEY_START:
+                if ch == '"':
+                    self._buf = [ch]
+                    self._state = _KEY
+                    self._after_comma = False
+                elif ch == "}" and not self._after_comma:
+                    self._state = _DONE
+                elif not ch.isspace():
+                    raise ValueError(f"JSON 키 자리에 예상치 못한 문자: {ch!r}")
+
+            elif state == _KEY:
+                self._buf.append(ch)
+                if self._esc:
+                    self._esc = False
+                elif ch == "\\":
+                    self._esc = True
+                elif ch == '"':
+                    self._key = json.loads("".join(self._buf))
+                    self._buf = []
+                    self._state = _COLON
+
+            elif state == _COLON:
+                if ch == ":":
+                    self._state = _VALUE
+                elif not ch.isspace():
+                    raise ValueError(f"JSON ':' 자리에 예상치 못한 문자: {ch!r}")
+
+            elif state == _VALUE:
+                if self._in_str:
+                    self._buf.append(ch)
+                    if self._esc:
+                        self._esc = False
+                    elif ch == "\\":
+                        self._esc = True
+                    elif ch == '"':
+                        self._in_str = False
+                        if self._depth == 0:
+                            self._complete(out)
+                            self._state = _AFTER_VALUE
+                    continue
+
+                if self._depth == 0 and ch in ",}":
+                    # 숫자 / true / false / null
+                    self._complete(out)
+                    self._state = _KEY_START if ch == "," else _DONE
+                    self._after_comma = ch == ","
+                    continue
+                if not self._buf and ch.isspace():
+                    continue
+
+                self._buf.append(ch)
+                if ch == '"':
+                    self._in_str = True
+                elif ch in "[{":
+                    self._depth += 1
+                elif ch in "]}":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._complete(out)
+                        self._state = _AFTER_VALUE
+
+            elif state == _AFTER_VALUE:
+                if ch == ",":
+                    self._state = _KEY_START
+                    self._after_comma = True
+                elif ch == "}":
+                    self._state = _DONE
+                elif not ch.isspace():
+                    raise ValueError(f"JSON ',' / '}}' 자리에 예상치 못한 문자: {ch!r}")
+
+        return out
@@ -0,0 +1,332 @@
+# App/core/llm_gateway.py
+"""
+OpenAI 호출 공통 게이트웨이 (AsyncOpenAI).
+
+- 프로세스당 클라이언트 하나 + httpx 커넥션 풀 공유 (서비스마다 클라이언트를 만들지 않음)
+- 동시 호출 수 제한: 전체(LLM_MAX_CONCURRENCY) + 모델별(LLM_MODEL_CONCURRENCY)
+    예) LLM_MODEL_CONCURRENCY="gpt-5.1:4,gpt-4o-mini:16"  (목록에 없는 모델은 LLM_DEFAULT_MODEL_CONCURRENCY)
+- 호출마다 타임아웃 (기본 LLM_TIMEOUT 초)
+- 429 / 5xx / 타임아웃 / 연결 오류는 지수 백오프(+지터)로 LLM_MAX_RETRIES 번까지 재시도
+  (SDK 자체 재시도는 끄고 여기서만 재시도해서 횟수가 겹치지 않게 함. 스트리밍은 첫 조각을 보내기 전까지만)
+- 모델별 호출 수/실패/재시도/지연 시간/토큰 사용량 집계 → llm_gateway.stats()
+- 스트리밍(chat_stream / speech_stream): 업스트림은 별도 태스크가 동시성 슬롯을 잡고 버퍼(STREAM_BUFFER_CHUNKS)로
+  읽어 들이고, 다 읽는 즉시 슬롯을 반납한다. 소비하는 쪽 제너레이터가 닫히면(aclose/취소) 읽기 태스크도 취소
+
+비동기 클라이언트는 이벤트 루프에 묶이므로 루프 하나(앱 메인 루프 또는 배치의 asyncio.run) 안에서만 사용할 것.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_TTS_TIMEOUT = float(os.getenv("LLM_TTS_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = 0.5
+LLM_BACKOFF_MAX = 8.0
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_DEFAULT_MODEL_CONCURRENCY = int(os.getenv("LLM_DEFAULT_MODEL_CONCURRENCY", "16"))
+STREAM_BUFFER_CHUNKS = 256   # 스트리밍 조각 버퍼 (TTS 1KB 청크 기준 256KB)
+
+LLM_LIMITS = httpx.Limits(
+    max_connections=LLM_MAX_CONCURRENCY,
+    max_keepalive_connections=LLM_MAX_CONCURRENCY,
+    keepalive_expiry=60.0,
+)
+
+_RETRYABLE = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    asyncio.TimeoutError,
+)
+
+
+def _parse_model_limits(spec: str) -> Dict[str, int]:
+    limits: Dict[str, int] = {}
+    for part in spec.split(","):
+        model, _, n = part.strip().rpartition(":")
+        if model and n.isdigit():
+            limits[model] = max(1, int(n))
+    return limits
+
+
+class _ModelStats:
+    __slots__ = ("calls", "errors", "retries", "latency_sum", "latency_max", "input_tokens", "output_tokens")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_latency_ms": round(self.latency_sum / self.calls * 1000, 1) if self.calls else 0.0,
+            "max_latency_ms": round(self.latency_max * 1000, 1),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        model_limits: Optional[Dict[str, int]] = None,
+        default_model_concurrency: int = LLM_DEFAULT_MODEL_CONCURRENCY,
+        max_retries: int = LLM_MAX_RETRIES,
+    ):
+        self.max_retries = max_retries
+        self.default_model_concurrency = default_model_concurrency
+        self.model_limits = model_limits if model_limits is not None else _parse_model_limits(
+            os.getenv("LLM_MODEL_CONCURRENCY", "")
+        )
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._per_model: Dict[str, asyncio.Semaphore] = {}
+        self._client: Optional[AsyncOpenAI] = None
+        self._stats: Dict[str, _ModelStats] = {}
+        self._stats_lock = threading.Lock()
+
+    # ---------- 클라이언트 ----------
+    @property
+    def client(self) -> AsyncOpenAI:
+        # 키가 없을 때 import 시점이 아니라 첫 호출 시점에 에러가 나도록 지연 생성
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                max_retries=0,
+                timeout=LLM_TIMEOUT,
+                http_client=httpx.AsyncClient(limits=LLM_LIMITS, timeout=LLM_TIMEOUT),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    # ---------- 동시성 / 재시도 / 집계 ----------
+    def _model_semaphore(self, model: str) -> asyncio.Semaphore:
+        sem = self._per_model.get(model)
+        if sem is None:
+            sem = asyncio.Semaphore(self.model_limits.get(model, self.default_model_concurrency))
+            self._per_model[model] = sem
+        return sem
+
+    @asynccontextmanager
+    async def _slot(self, model: str) -> AsyncIterator[None]:
+        async with self._global:
+            async with self._model_semaphore(model):
+                yield
+
+    def _record(self, model: str, latency: float, usage: Any = None, error: bool = False, retries: int = 0) -> None:
+        with self._stats_lock:
+            st = self._stats.setdefault(model, _ModelStats())
+            st.calls += 1
+            st.retries += retries
+            st.latency_sum += latency
+            st.latency_max = max(st.latency_max, latency)
+            if error:
+                st.errors += 1
+            if usage is not None:
+                # chat.completions: prompt/completion_tokens, responses: input/output_tokens
+                st.input_tokens += getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", 0) or 0
+                st.output_tokens += getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", 0) or 0
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+    async def _wait_or_raise(self, model: str, e: Exception, attempt: int, started: float, retryable: bool = True) -> None:
+        """
+        재시도할 수 있으면 백오프만큼 기다리고, 아니면 실패로 집계하고 예외를 다시 던진다
+        """
+        if not retryable or not isinstance(e, _RETRYABLE) or attempt >= self.max_retries:
+            self._record(model, time.monotonic() - started, error=True, retries=attempt)
+            raise e
+        delay = self._backoff(attempt)
+        print(f"[LLM] {model} 호출 실패({type(e).__name__}) → {delay:.1f}s 후 재시도 ({attempt + 1}/{self.max_retries})")
+        await asyncio.sleep(delay)
+
+    async def _call(self, model: str, make_request, timeout: float) -> Any:
+        """
+        make_request: 호출할 때마다 새 코루틴을 만드는 함수 (재시도용)
+        """
+        started = time.monotonic()
+        attempt = 0
+        async with self._slot(model):
+            while True:
+                try:
+                    result = await asyncio.wait_for(make_request(), timeout=timeout)
+                except Exception as e:
+                    await self._wait_or_raise(model, e, attempt, started)
+                    attempt += 1
+                else:
+                    self._record(model, time.monotonic() - started, getattr(result, "usage", None), retries=attempt)
+                    return result
+
+    # ---------- 공개 API ----------
+    async def chat(self, model: str, messages: list, timeout: float = LLM_TIMEOUT, **kwargs) -> Any:
+        """
+        chat.completions.create 결과(ChatCompletion) 그대로 반환
+        """
+        return await self._call(
+            model,
+            lambda: self.client.chat.completions.create(
+                model=model, messages=messages, timeout=timeout, **kwargs
+            ),
+            timeout,
+        )
+
+    async def chat_text(self, model: str, messages: list, timeout: float = LLM_TIMEOUT, **kwargs) -> str:
+        completion = await self.chat(model, messages, timeout=timeout, **kwargs)
+        return completion.choices[0].message.content or ""
+
+    async def _stream(
+        self,
+        model: str,
+        read_upstream: Callable[[Callable[[Any], Awaitable[None]]], Awaitable[Any]],
+    ) -> AsyncIterator[Any]:
+        """
+        read_upstream(emit): 업스트림 응답을 끝까지 읽으면서 조각마다 await emit(조각), 반환값은 usage (없으면 None).
+        읽기는 별도 태스크에서 슬롯을 잡고 하고, 이 제너레이터는 버퍼에서 꺼내 흘려보내기만 한다.
+        재시도는 첫 조각을 버퍼에 넣기 전까지만.
+        """
+        buffer: asyncio.Queue = asyncio.Queue(maxsize=STREAM_BUFFER_CHUNKS)
+
+        async def _produce() -> None:
+            started = time.monotonic()
+            attempt = 0
+            try:
+                async with self._slot(model):
+                    while True:
+                        sent = False
+
+                        async def emit(piece: Any) -> None:
+                            nonlocal sent
+                            sent = True
+                            await buffer.put(("data", piece))
+
+                        try:
+                            usage = await read_upstream(emit)
+                        except Exception as e:
+                            await self._wait_or_raise(model, e, attempt, started, retryable=not sent)
+                            attempt += 1
+                        else:
+                            self._record(model, time.monotonic() - started, usage, retries=attempt)
+                            break
+            except Exception as e:
+                await buffer.put(("error", e))
+            else:
+                await buffer.put(("end", None))
+
+        producer = asyncio.create_task(_produce())
+        try:
+            while True:
+                kind, item = await buffer.get()
+                if kind == "data":
+                    yield item
+                elif kind == "error":
+                    raise item
+                else:
+                    return
+        finally:
+            # 소비하는 쪽이 중간에 끊긴 경우 업스트림 읽기(와 슬롯)도 바로 정리
+            producer.cancel()
+
+    async def chat_stream(self, model: str, messages: list, timeout: float = LLM_TIMEOUT, **kwargs) -> AsyncIterator[str]:
+        """
+        chat.completions 스트리밍. 텍스트 조각(delta)을 받는 대로 흘려보낸다.
+        재시도는 첫 조각을 보내기 전까지만 하고, 토큰 사용량은 마지막 usage 청크로 집계한다.
+        """
+        async def _read(emit) -> Any:
+            usage = None
+            stream = await asyncio.wait_for(
+                self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    timeout=timeout,
+                    **kwargs,
+                ),
+                timeout=timeout,
+            )
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        await emit(delta)
+            return usage
+
+        async with aclosing(self._stream(model, _read)) as pieces:
+            async for piece in pieces:
+                yield piece
+
+    async def respond(self, model: str, input: Any, timeout: float = LLM_TIMEOUT, **kwargs) -> Any:
+        """
+        responses.create 결과 그대로 반환
+        """
+        return await self._call(
+            model,
+            lambda: self.client.responses.create(model=model, input=input, timeout=timeout, **kwargs),
+            timeout,
+        )
+
+    async def speech_stream(
+        self,
+        model: str,
+        input: str,
+        voice: str = "alloy",
+        response_format: str = "mp3",
+        chunk_size: int = 1024,
+        timeout: float = LLM_TTS_TIMEOUT,
+    ) -> AsyncIterator[bytes]:
+        """
+        TTS 오디오를 청크 단위로 흘려보냄. 재시도는 첫 청크를 보내기 전(연결 단계)까지만 한다.
+        """
+        async def _read(emit) -> None:
+            async with self.client.audio.speech.with_streaming_response.create(
+                model=model,
+                voice=voice,
+                response_format=response_format,
+                input=input,
+                timeout=timeout,
+            ) as response:
+                async for chunk in response.iter_bytes(chunk_size=chunk_size):
+                    if chunk:
+                        await emit(chunk)
+
+        async with aclosing(self._stream(model, _read)) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._stats_lock:
+            return {model: st.as_dict() for model, st in self._stats.items()}
+
+
+llm_gateway = LLMGateway()
+
+
+async def close_llm_gateway() -> None:
+    """
+    앱 종료(shutdown) 시 커넥션 풀 정리.
+    """
+    await llm_gateway.close()
@@ -0,0 +1,103 @@
+# App/core/popularity.py
+"""
+슬라이딩 윈도우 키워드 인기도 추적기 (count-min sketch + top-k).
+
+- 윈도우(window_sec)를 n_buckets 개 시간 버킷으로 나누고, 버킷마다 count-min sketch 하나
+  (depth x width 카운터 행렬). 시간이 지나면 가장 오래된 버킷을 0으로 비우고 재사용한다.
+- 키워드 빈도 추정 = 윈도우 안 버킷들의 min-over-rows 합 (과대추정만 있고 과소추정은 없음)
+- 상위 키워드 후보는 최대 capacity 개만 dict 로 들고 있고, 넘치면 추정값이 가장 작은 후보를 버린다.
+  top(n) 은 후보들의 추정값을 다시 계산해서 정렬 (오래된 버킷이 빠진 값 반영).
+메모리는 키워드 종류 수와 무관하게 n_buckets x depth x width x 4바이트 + capacity.
+"""
+import hashlib
+import heapq
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class CountMinSketch:
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int32)
+        self._rows = np.arange(depth)
+
+    def columns(self, key: str) -> np.ndarray:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=4 * self.depth).digest()
+        return np.frombuffer(digest, dtype=np.uint32) % self.width
+
+    def add(self, cols: np.ndarray, count: int = 1) -> None:
+        self.table[self._rows, cols] += count
+
+    def estimate(self, cols: np.ndarray) -> int:
+        return int(self.table[self._rows, cols].min())
+
+    def clear(self) -> None:
+        self.table.fill(0)
+
+
+class SlidingTopK:
+    def __init__(
+        self,
+        window_sec: float = 3600.0,
+        n_buckets: int = 12,
+        width: int = 2048,
+        depth: int = 4,
+        capacity: int = 256,
+    ):
+        self.bucket_sec = window_sec / n_buckets
+        self.capacity = capacity
+        self._sketches = [CountMinSketch(width, depth) for _ in range(n_buckets)]
+        self._bucket_ids = [-1] * n_buckets   # 각 슬롯이 담고 있는 시간 버킷 번호
+        self._candidates: Dict[str, int] = {}  # 키워드 -> 마지막 추정값
+        self._lock = threading.Lock()
+
+    def _slot(self, now: float) -> int:
+        bucket_id = int(now // self.bucket_sec)
+        slot = bucket_id % len(self._sketches)
+        if self._bucket_ids[slot] != bucket_id:
+            self._sketches[slot].clear()
+            self._bucket_ids[slot] = bucket_id
+        return slot
+
+    def _estimate(self, cols: np.ndarray, now: float) -> int:
+        oldest = int(now // self.bucket_sec) - len(self._sketches) + 1
+        return sum(
+            sk.estimate(cols)
+            for sk, bucket_id in zip(self._sketches, self._bucket_ids)
+            if bucket_id >= oldest
+        )
+
+    def add(self, key: str, count: int = 1, now: Optional[float] = None) -> None:
+        if not key:
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            slot = self._slot(now)
+            cols = self._sketches[slot].columns(key)
+            self._sketches[slot].add(cols, count)
+            self._candidates[key] = self._estimate(cols, now)
+            if len(self._candidates) > self.capacity:
+                # 후보가 넘치면 추정값이 가장 작은 후보부터 버림
+                drop = len(self._candidates) - self.capacity
+                for k, _ in heapq.nsmallest(drop, self._candidates.items(), key=lambda kv: kv[1]):
+                    del self._candidates[k]
+
+    def add_many(self, keys: Iterable[str], now: Optional[float] = None) -> None:
+        for key in keys:
+            self.add(key, now=now)
+
+    def top(self, n: int, now: Optional[float] = None) -> List[Tuple[str, int]]:
+        """
+        윈도우 기준 상위 n개 (키워드, 추정 빈도). 빈도 0 인 후보는 빠진다.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._slot(now)
+            cols_of = self._sketches[0].columns
+            scored = {k: self._estimate(cols_of(k), now) for k in self._candidates}
+            self._candidates = {k: v for k, v in scored.items() if v > 0}
+            return heapq.nlargest(n, self._candidates.items(), key=lambda kv: kv[1])
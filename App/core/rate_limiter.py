@@ -0,0 +1,274 @@
+# App/core/rate_limiter.py
+"""
+네이버 오픈API 호출용 레이트 리미터.
+
+- 토큰 버킷: 초당 `rate`개씩 토큰이 차고, 최대 `capacity`개까지 쌓임
+- 일일 호출 예산: KST 날짜 기준으로 하루 호출 수를 세고, 예산을 넘으면 거절
+- 우선순위: 백그라운드(프리페치/수집) 호출은 버킷과 일일 예산의 일부를
+  인터랙티브(사용자 요청) 몫으로 남겨두고 그 위에서만 토큰을 가져감
+- 저장소는 교체 가능
+    * SQLiteRateLimitStore : 같은 호스트의 모든 uvicorn 워커가 파일 하나를 공유
+    * MemoryRateLimitStore : 단일 프로세스/로컬 테스트용
+"""
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Protocol, Tuple
+
+KST = timezone(timedelta(hours=9))
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+def kst_today() -> str:
+    return datetime.now(KST).strftime("%Y-%m-%d")
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """
+    지수 백오프 + full jitter.
+    attempt=0 -> 0~0.5s, 1 -> 0~1s, 2 -> 0~2s ... 최대 cap초
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RateLimitStore(Protocol):
+    def take(
+        self,
+        name: str,
+        rate: float,
+        capacity: float,
+        min_tokens_left: float,
+        daily_limit: int,
+        now: float,
+    ) -> Tuple[bool, float]:
+        """
+        토큰 하나 소비 시도.
+        반환: (성공 여부, 실패 시 다시 시도하기까지 기다릴 초. 예산 소진이면 -1)
+        """
+        ...
+
+    def used_today(self, name: str) -> int:
+        ...
+
+
+def _refill_and_take(
+    tokens: float,
+    updated: float,
+    used: int,
+    rate: float,
+    capacity: float,
+    min_tokens_left: float,
+    daily_limit: int,
+    now: float,
+) -> Tuple[bool, float, float, int]:
+    """
+    저장소 공통 계산 로직.
+    반환: (성공 여부, 대기 초, 새 토큰 수, 새 일일 사용량)
+    """
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+
+    if used >= daily_limit:
+        return False, -1.0, tokens, used
+
+    if tokens - 1.0 >= min_tokens_left:
+        return True, 0.0, tokens - 1.0, used + 1
+
+    wait = (1.0 + min_tokens_left - tokens) / rate
+    return False, max(wait, 0.01), tokens, used
+
+
+class MemoryRateLimitStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}  # name -> (tokens, updated)
+        self._budget = {}   # (name, day) -> used
+
+    def take(self, name, rate, capacity, min_tokens_left, daily_limit, now):
+        day = kst_today()
+        with self._lock:
+            tokens, updated = self._buckets.get(name, (capacity, now))
+            used = self._budget.get((name, day), 0)
+            ok, wait, tokens, used = _refill_and_take(
+                tokens, updated, used, rate, capacity, min_tokens_left, daily_limit, now
+            )
+            self._buckets[name] = (tokens, now)
+            self._budget[(name, day)] = used
+        return ok, wait
+
+    def used_today(self, name):
+        with self._lock:
+            return self._budget.get((name, kst_today()), 0)
+
+
+class SQLiteRateLimitStore:
+    """
+    로컬 SQLite 파일 하나로 여러 워커 프로세스가 버킷을 공유.
+    BEGIN IMMEDIATE 로 쓰기 잠금을 잡기 때문에 프로세스 간에도 원자적으로 동작한다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path,
+            timeout=5.0,
+            isolation_level=None,  # 트랜잭션은 직접 관리
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS daily_budget ("
+            " name TEXT NOT NULL, day TEXT NOT NULL, used INTEGER NOT NULL,"
+            " PRIMARY KEY (name, day))"
+        )
+
+    def take(self, name, rate, capacity, min_tokens_left, daily_limit, now):
+        day = kst_today()
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                row = cur.execute(
+                    "SELECT tokens, updated FROM buckets WHERE name = ?", (name,)
+                ).fetchone()
+                tokens, updated = row if row else (capacity, now)
+
+                row = cur.execute(
+                    "SELECT used FROM daily_budget WHERE name = ? AND day = ?", (name, day)
+                ).fetchone()
+                used = row[0] if row else 0
+
+                ok, wait, tokens, used = _refill_and_take(
+                    tokens, updated, used, rate, capacity, min_tokens_left, daily_limit, now
+                )
+
+                cur.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                    (name, tokens, now),
+                )
+                cur.execute(
+                    "INSERT OR REPLACE INTO daily_budget (name, day, used) VALUES (?, ?, ?)",
+                    (name, day, used),
+                )
+                # 지난 날짜 카운터 정리
+                cur.execute("DELETE FROM daily_budget WHERE day < ?", (day,))
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+        return ok, wait
+
+    def used_today(self, name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT used FROM daily_budget WHERE name = ? AND day = ?",
+                (name, kst_today()),
+            ).fetchone()
+        return row[0] if row else 0
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        store: RateLimitStore,
+        name: str,
+        rate: float,
+        capacity: float,
+        daily_budget: int,
+        background_reserve: float = 0.3,
+    ):
+        """
+        background_reserve: 버킷/일일 예산 중 인터랙티브 요청 몫으로 남겨둘 비율
+        """
+        self.store = store
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.daily_budget = daily_budget
+        self.background_reserve = background_reserve
+
+    def _limits_for(self, priority: int) -> Tuple[float, int]:
+        if priority == PRIORITY_INTERACTIVE:
+            return 0.0, self.daily_budget
+        return (
+            self.capacity * self.background_reserve,
+            int(self.daily_budget * (1 - self.background_reserve)),
+        )
+
+    def try_acquire(self, priority: int = PRIORITY_INTERACTIVE) -> Tuple[bool, float]:
+        min_tokens_left, daily_limit = self._limits_for(priority)
+        return self.store.take(
+            self.name,
+            self.rate,
+            self.capacity,
+            min_tokens_left,
+            daily_limit,
+            time.time(),
+        )
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE, timeout: float = 10.0) -> bool:
+        """
+        토큰을 얻을 때까지 (최대 timeout초) 블로킹.
+        일일 예산이 소진됐거나 시간 안에 못 얻으면 False.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            ok, wait = self.try_acquire(priority)
+            if ok:
+                return True
+            if wait < 0 or time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(
+        self, priority: int = PRIORITY_INTERACTIVE, timeout: float = 10.0
+    ) -> bool:
+        """
+        acquire 의 비동기 버전. 저장소 접근(SQLite 잠금 대기 포함)은 스레드에서 실행해서 이벤트 루프를 막지 않음
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            ok, wait = await asyncio.to_thread(self.try_acquire, priority)
+            if ok:
+                return True
+            if wait < 0 or time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    def remaining_today(self) -> int:
+        return max(0, self.daily_budget - self.store.used_today(self.name))
+
+
+def _build_store() -> RateLimitStore:
+    backend = os.getenv("RATE_LIMIT_BACKEND", "sqlite")
+    if backend == "memory":
+        return MemoryRateLimitStore()
+    path = os.getenv("RATE_LIMIT_DB", "/tmp/naver_rate_limit.sqlite3")
+    return SQLiteRateLimitStore(path)
+
+
+_naver_limiter: Optional[RateLimiter] = None
+
+
+def get_naver_rate_limiter() -> RateLimiter:
+    global _naver_limiter
+    if _naver_limiter is None:
+        _naver_limiter = RateLimiter(
+            store=_build_store(),
+            name="naver_news",
+            rate=float(os.getenv("NAVER_RATE_PER_SEC", "8")),
+            capacity=float(os.getenv("NAVER_RATE_BURST", "10")),
+            # 네이버 검색 API 기본 한도: 하루 25,000건
+            daily_budget=int(os.getenv("NAVER_DAILY_BUDGET", "25000")),
+        )
+    return _naver_limiter
@@ -0,0 +1,115 @@
+# App/core/simhash.py
+"""
+SimHash 기반 유사(near-duplicate) 기사 묶기.
+
+같은 연합뉴스 기사를 여러 언론사가 받아 쓰면 URL은 다르지만 제목/요약이 거의 같다.
+제목 + 요약으로 64bit SimHash를 만들고, 해밍 거리가 `max_distance` 이하인 기사끼리
+한 묶음(cluster)으로 보고 대표 기사 하나만 남긴다 (대표에 related_count 기록).
+
+- 특징(feature): 공백/기호를 뺀 문자 3-gram (한국어는 띄어쓰기가 들쭉날쭉해서 문자 단위가 안정적)
+- 후보 탐색: 64bit를 (max_distance + 1)개 밴드로 나눠서 버킷팅 (LSH)
+  해밍 거리 <= k 이면 비둘기집 원리로 최소 한 밴드는 완전히 같으므로 놓치는 쌍이 없고,
+  버킷에 든 대표끼리만 비교하므로 배치 크기에 대해 선형 시간
+"""
+import hashlib
+import os
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+DEFAULT_MAX_DISTANCE = int(os.getenv("NEWS_SIMHASH_MAX_DISTANCE", "7"))
+
+_NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
+
+
+def _normalize(text: str) -> str:
+    return _NON_WORD.sub("", (text or "").lower())
+
+
+def _features(text: str, n: int = 3) -> List[str]:
+    s = _normalize(text)
+    if len(s) <= n:
+        return [s] if s else []
+    return [s[i:i + n] for i in range(len(s) - n + 1)]
+
+
+def simhash(text: str) -> int:
+    feats = _features(text)
+    if not feats:
+        return 0
+
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big")
+            for f in feats
+        ),
+        dtype=np.uint64,
+        count=len(feats),
+    )
+    # (특징 수, 64) 비트 행렬 -> 비트별로 1이 과반이면 1
+    bits = np.unpackbits(hashes.astype(">u8").view(np.uint8)).reshape(-1, 64)
+    votes = bits.sum(axis=0) * 2 > len(feats)
+    return int.from_bytes(np.packbits(votes).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _bands(max_distance: int) -> List[Tuple[int, int]]:
+    """
+    64bit를 max_distance + 1 개 밴드로 나눈 (shift, mask) 목록
+    """
+    n = max(1, min(max_distance + 1, 64))
+    base, extra = divmod(64, n)
+    bands = []
+    shift = 0
+    for i in range(n):
+        width = base + (1 if i < extra else 0)
+        bands.append((shift, (1 << width) - 1))
+        shift += width
+    return bands
+
+
+def article_text(row: Dict) -> str:
+    return f"{row.get('title') or ''} {row.get('summary') or row.get('description') or ''}"
+
+
+def collapse_near_duplicates(
+    rows: List[Dict],
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+) -> List[Dict]:
+    """
+    유사 기사 묶기. 입력 순서상 먼저 나온 기사를 대표로 남기고,
+    대표 기사 복사본에 related_count(묶음 크기, 자기 포함)를 넣어서 반환.
+    입력 dict 는 수정하지 않는다 (캐시와 공유될 수 있음).
+    """
+    bands = _bands(max_distance)
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+    reps: List[Tuple[int, Dict]] = []  # (simhash, 대표 row 복사본)
+
+    for row in rows:
+        h = simhash(article_text(row))
+
+        match = None
+        for i, (shift, mask) in enumerate(bands):
+            for rep_idx in buckets.get((i, (h >> shift) & mask), ()):
+                if hamming(h, reps[rep_idx][0]) <= max_distance:
+                    match = rep_idx
+                    break
+            if match is not None:
+                break
+
+        if match is not None:
+            reps[match][1]["related_count"] += 1
+            continue
+
+        rep = dict(row)
+        rep["related_count"] = 1
+        rep_idx = len(reps)
+        reps.append((h, rep))
+        for i, (shift, mask) in enumerate(bands):
+            buckets.setdefault((i, (h >> shift) & mask), []).append(rep_idx)
+
+    return [rep for _, rep in reps]
@@ -0,0 +1,20 @@
+# App/core/streaming.py
+"""
+StreamingResponse 가 끝나면(정상 종료 / 클라이언트 연결 끊김 / 취소) 본문 제너레이터를 바로 aclose 한다.
+
+기본 StreamingResponse 는 클라이언트가 끊기면 전송만 멈추고, 멈춘 제너레이터는 GC 때에야 정리된다.
+그 사이 llm_gateway 스트림(chat_stream / speech_stream)이 잡은 동시성 슬롯이 반납되지 않으므로
+LLM 스트림을 흘려보내는 응답은 이걸로 보낸다.
+"""
+from starlette.responses import StreamingResponse
+from starlette.types import Send
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    async def stream_response(self, send: Send) -> None:
+        try:
+            await super().stream_response(send)
+        finally:
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
@@ -0,0 +1,128 @@
+# App/db/models.py
+from sqlalchemy import JSON, Column, Integer, LargeBinary, String, Text, DateTime, ForeignKey, Index, func
+
+from App.core.database import Base
+
+
+class Article(Base):
+    """
+    수집(ingestion) 루프가 네이버에서 가져온 기사 저장소.
+    url_hash = sha1(origin_url 또는 url)
+    """
+    __tablename__ = "articles"
+
+    url_hash = Column(String(40), primary_key=True)
+    url = Column(String(1000), nullable=True)          # 네이버 뉴스 링크
+    origin_url = Column(String(1000), nullable=True)   # 원문 언론사 링크
+    title = Column(String(500), nullable=False)
+    summary = Column(Text, nullable=True)
+    source = Column(String(500), nullable=True)
+    pub_date = Column(String(64), nullable=True)       # 원본 pubDate 문자열 (응답 포맷 유지용)
+    published_at = Column(DateTime, nullable=True, index=True)  # UTC 기준
+    ingested_at = Column(DateTime, server_default=func.now(), index=True)
+
+
+class ArticleKeyword(Base):
+    """
+    어떤 검색 키워드로 수집된 기사인지 (기사 : 키워드 = N : M)
+    """
+    __tablename__ = "article_keywords"
+
+    url_hash = Column(
+        String(40),
+        ForeignKey("articles.url_hash", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    keyword = Column(String(100), primary_key=True)
+    ingested_at = Column(DateTime, server_default=func.now(), index=True)
+
+    __table_args__ = (
+        Index("ix_article_keywords_keyword", "keyword", "url_hash"),
+    )
+
+
+class UserInboxItem(Base):
+    """
+    수집 직후 fan-out 매처가 사용자별로 밀어 넣은 새 기사 (사용자 : 기사 = N : M)
+    """
+    __tablename__ = "user_inbox"
+
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    url_hash = Column(
+        String(40),
+        ForeignKey("articles.url_hash", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    matched_keywords = Column(String(500), nullable=True)  # 매칭된 구독 키워드 (콤마 구분)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_user_inbox_user_created", "user_id", "created_at"),
+    )
+
+
+class UserSeenFilter(Base):
+    """
+    사용자별 "이미 본 기사" 회전 Bloom filter (App.core.bloom.RotatingBloomFilter 직렬화 값).
+    전체 이력 대신 사용자당 몇 KB 만 저장한다.
+    """
+    __tablename__ = "user_seen_filter"
+
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    data = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class KeywordPopularity(Base):
+    """
+    API 프로세스별 최근 윈도우 키워드 조회 수 스냅샷 (popularity_service 가 주기적으로 덮어씀).
+    수집 루프는 최근 갱신된 스냅샷을 키워드별로 합산해서 프리페치 대상을 고른다.
+    """
+    __tablename__ = "keyword_popularity"
+
+    source = Column(String(100), primary_key=True)   # 호스트명:pid
+    keyword = Column(String(100), primary_key=True)
+    hits = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, index=True)  # UTC
+
+
+class DailyKeyword(Base):
+    """
+    사용자별 오늘의 키워드 (야간 배치가 미리 생성, /api/keywords/today_keywords 는 PK 조회만)
+    """
+    __tablename__ = "daily_keywords"
+
+    date = Column(String(10), primary_key=True)      # KST 날짜 (YYYY-MM-DD)
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    keywords = Column(JSON, nullable=False)
+    profile_hash = Column(String(40), nullable=True)  # keyword_service.profile_key
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class DailyFortune(Base):
+    """
+    (날짜, 정규화된 별자리/띠 + 관심사 묶음) 단위 오늘의 운세.
+    야간 배치가 미리 만들어 두고, 배치가 커버하지 못한 조합은 첫 요청 때 생성해서 저장한다.
+    본문 안의 이름 자리는 "{이름}" 으로 비워 두고 응답할 때 채운다.
+    """
+    __tablename__ = "daily_fortunes"
+
+    date = Column(String(10), primary_key=True)          # KST 날짜 (YYYY-MM-DD)
+    profile_hash = Column(String(40), primary_key=True)  # fortune_service.fortune_profile_key
+    sign = Column(String(20), nullable=False)             # 정규화된 별자리/띠 ("" = 없음)
+    interests = Column(JSON, nullable=False)              # 정렬된 관심사 목록
+    fortune = Column(JSON, nullable=False)
+    source = Column(String(10), nullable=False)           # batch / live
+    created_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,281 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from App.db.models import Article, ArticleKeyword, UserInboxItem
+
+KST = timezone(timedelta(hours=9))
+IN_CHUNK = 1000  # IN (...) 절 하나에 넣을 최대 값 수
+
+
+def url_hash_of(row: Dict) -> Optional[str]:
+    """
+    기사 키: origin_url 우선, 없으면 url 의 sha1
+    """
+    key = row.get("origin_url") or row.get("url")
+    if not key:
+        return None
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def parse_pub_date_utc(pub_date: Optional[str]) -> Optional[datetime]:
+    """
+    "Mon, 13 Nov 2025 10:25:00 +0900" -> UTC naive datetime
+    """
+    if not pub_date:
+        return None
+    try:
+        dt = parsedate_to_datetime(pub_date)
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=KST)
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def window_start_utc(days: int) -> datetime:
+    """
+    is_within_days_kst 와 같은 기준:
+    days=3 이면 KST 기준 그제 0시부터 (오늘, 어제, 그제)
+    """
+    today_kst = datetime.now(KST).replace(hour=0, minute=0, second=0, microsecond=0)
+    start_kst = today_kst - timedelta(days=days - 1)
+    return start_kst.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _to_dict(article: Article) -> Dict:
+    # fetch_naver_news_recent 반환 형식과 동일하게 맞춤
+    return {
+        "title": article.title,
+        "summary": article.summary or "",
+        "published_at": article.pub_date,
+        "source": article.source or "",
+        "url": article.url,
+        "origin_url": article.origin_url,
+        "url_hash": article.url_hash,
+    }
+
+
+class ArticleRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _insert(self, model):
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        return insert(model), dialect
+
+    # ---------- 쓰기 (수집 경로) ----------
+    def upsert_articles(self, keyword: str, rows: Iterable[Dict]) -> int:
+        """
+        키워드 하나로 수집한 기사들을 url_hash 기준으로 upsert 하고
+        (기사, 키워드) 매핑을 추가한다. 반환값: 처리한 기사 수
+        """
+        article_values = {}
+        for row in rows:
+            h = url_hash_of(row)
+            if not h:
+                continue
+            article_values[h] = {
+                "url_hash": h,
+                "url": row.get("url"),
+                "origin_url": row.get("origin_url"),
+                "title": (row.get("title") or "")[:500],
+                "summary": row.get("summary"),
+                "source": (row.get("source") or "")[:500],
+                "pub_date": row.get("published_at"),
+                "published_at": parse_pub_date_utc(row.get("published_at")),
+            }
+
+        if not article_values:
+            return 0
+
+        stmt, dialect = self._insert(Article)
+        update_cols = ["url", "origin_url", "title", "summary", "source", "pub_date", "published_at"]
+        if dialect == "mysql":
+            stmt = stmt.on_duplicate_key_update(
+                **{c: stmt.inserted[c] for c in update_cols}
+            )
+        else:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["url_hash"],
+                set_={c: stmt.excluded[c] for c in update_cols},
+            )
+        self.db.execute(stmt, list(article_values.values()))
+
+        kw_stmt, dialect = self._insert(ArticleKeyword)
+        if dialect == "mysql":
+            kw_stmt = kw_stmt.prefix_with("IGNORE")
+        else:
+            kw_stmt = kw_stmt.on_conflict_do_nothing()
+        self.db.execute(
+            kw_stmt,
+            [{"url_hash": h, "keyword": keyword} for h in article_values],
+        )
+
+        self.db.commit()
+        return len(article_values)
+
+    def purge_older_than(self, days: int) -> int:
+        cutoff = window_start_utc(days)
+        old_ids = self.db.query(Article.url_hash).filter(Article.published_at < cutoff)
+        self.db.query(ArticleKeyword).filter(
+            ArticleKeyword.url_hash.in_(old_ids.scalar_subquery())
+        ).delete(synchronize_session=False)
+        self.db.query(UserInboxItem).filter(
+            UserInboxItem.url_hash.in_(old_ids.scalar_subquery())
+        ).delete(synchronize_session=False)
+        deleted = (
+            self.db.query(Article)
+            .filter(Article.published_at < cutoff)
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
+        return deleted
+
+    # ---------- 읽기 (API 경로) ----------
+    def get_recent_by_keywords(
+        self,
+        keywords: List[str],
+        days: int = 3,
+        per_keyword: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        키워드들로 수집된 최근 `days`일 기사 (최신순, url_hash 기준 중복 제거)
+        per_keyword: 키워드별 최대 기사 수
+        """
+        if not keywords:
+            return []
+
+        rows = (
+            self.db.query(Article, ArticleKeyword.keyword)
+            .join(ArticleKeyword, ArticleKeyword.url_hash == Article.url_hash)
+            .filter(
+                ArticleKeyword.keyword.in_(keywords),
+                Article.published_at >= window_start_utc(days),
+            )
+            .order_by(Article.published_at.desc())
+            .all()
+        )
+
+        per_kw_count: Dict[str, int] = {}
+        seen: Set[str] = set()
+        result: List[Dict] = []
+        for article, kw in rows:
+            if per_keyword is not None:
+                if per_kw_count.get(kw, 0) >= per_keyword:
+                    continue
+                per_kw_count[kw] = per_kw_count.get(kw, 0) + 1
+            if article.url_hash in seen:
+                continue
+            seen.add(article.url_hash)
+            result.append(_to_dict(article))
+            if limit is not None and len(result) >= limit:
+                break
+
+        return result
+
+    def existing_hashes(self, hashes: Iterable[str]) -> Set[str]:
+        """
+        이미 저장소에 있는 url_hash (이번 수집에서 새로 들어온 기사 구분용)
+        """
+        hashes = list(hashes)
+        found: Set[str] = set()
+        for i in range(0, len(hashes), IN_CHUNK):
+            rows = (
+                self.db.query(Article.url_hash)
+                .filter(Article.url_hash.in_(hashes[i:i + IN_CHUNK]))
+                .all()
+            )
+            found.update(h for (h,) in rows)
+        return found
+
+    def covered_keywords(self, keywords: List[str], days: int = 3) -> Set[str]:
+        """
+        저장소에 최근 `days`일 기사가 하나라도 있는 키워드 집합
+        (없는 키워드만 라이브 호출로 보충할 때 사용)
+        """
+        if not keywords:
+            return set()
+        rows = (
+            self.db.query(ArticleKeyword.keyword, func.count())
+            .join(Article, ArticleKeyword.url_hash == Article.url_hash)
+            .filter(
+                ArticleKeyword.keyword.in_(keywords),
+                Article.published_at >= window_start_utc(days),
+            )
+            .group_by(ArticleKeyword.keyword)
+            .all()
+        )
+        return {kw for kw, _ in rows}
+
+    def get_keyword_pairs_since(
+        self,
+        since: Optional[datetime],
+        days: int,
+    ) -> Tuple[List[Tuple[Dict, datetime, str]], Optional[datetime]]:
+        """
+        since 이후 새로 수집된 (기사, 검색 키워드) 쌍. 인메모리 인덱스 증분 동기화용.
+        반환: ([(기사 dict(published_dt 포함), 수집 시각, 키워드)], 마지막 수집 시각)
+        since 는 DB 에서 읽은 값을 그대로 넘기므로 서버 간 시계 차이와 무관하다.
+        """
+        q = (
+            self.db.query(Article, ArticleKeyword.keyword, ArticleKeyword.ingested_at)
+            .join(ArticleKeyword, ArticleKeyword.url_hash == Article.url_hash)
+            .filter(Article.published_at >= window_start_utc(days))
+        )
+        if since is not None:
+            q = q.filter(ArticleKeyword.ingested_at >= since)
+
+        pairs = []
+        last = since
+        for article, kw, ingested_at in q.all():
+            row = _to_dict(article)
+            row["published_dt"] = article.published_at
+            pairs.append((row, ingested_at, kw))
+            if ingested_at is not None and (last is None or ingested_at > last):
+                last = ingested_at
+        return pairs, last
+
+    def get_titles_since(
+        self,
+        since: datetime,
+        keywords: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, datetime]]:
+        """
+        since(UTC) 이후 발행된 기사 제목과 발행 시각. 트렌드 키워드 계산용.
+        keywords 를 주면 그 수집 키워드로 들어온 기사만
+        """
+        query = self.db.query(Article.title, Article.published_at).filter(Article.published_at >= since)
+        if keywords is not None:
+            query = query.filter(
+                Article.url_hash.in_(
+                    self.db.query(ArticleKeyword.url_hash)
+                    .filter(ArticleKeyword.keyword.in_(list(keywords)))
+                    .scalar_subquery()
+                )
+            )
+        return [(title, published_at) for title, published_at in query.all()]
+
+    def keyword_coverage_start(self) -> Dict[str, datetime]:
+        """
+        수집 키워드 -> 저장소에 남아 있는 그 키워드 기사 중 가장 오래된 발행 시각 (UTC).
+        계속 수집해 온 키워드는 보관 기간 시작 무렵, 최근에 수집 대상이 된 키워드는 그 무렵이 된다
+        """
+        rows = (
+            self.db.query(ArticleKeyword.keyword, func.min(Article.published_at))
+            .join(Article, Article.url_hash == ArticleKeyword.url_hash)
+            .group_by(ArticleKeyword.keyword)
+            .all()
+        )
+        return {keyword: started for keyword, started in rows if started is not None}
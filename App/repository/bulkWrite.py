@@ -0,0 +1,38 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.orm import Session
+
+
+def chunked_upsert(
+    db: Session,
+    model,
+    rows: Iterable[Dict],
+    chunk_size: int,
+    update_cols: Optional[Sequence[str]] = None,
+) -> int:
+    """
+    rows 를 chunk_size 개씩 나눠 INSERT 하고 청크마다 commit. 반환값: 넘긴 행 수
+    - update_cols 가 있으면 PK 가 겹치는 행은 그 열만 덮어씀 (ON DUPLICATE KEY UPDATE)
+    - 없으면 이미 있는 행은 그대로 둠 (INSERT IGNORE)
+    """
+    stmt = insert(model)
+    if update_cols:
+        stmt = stmt.on_duplicate_key_update(**{c: stmt.inserted[c] for c in update_cols})
+    else:
+        stmt = stmt.prefix_with("IGNORE")
+
+    total = 0
+    chunk: List[Dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.execute(stmt, chunk)
+            db.commit()
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        db.execute(stmt, chunk)
+        db.commit()
+        total += len(chunk)
+    return total
@@ -0,0 +1,38 @@
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from App.db.models import DailyKeyword
+from App.repository.bulkWrite import chunked_upsert
+
+BULK_CHUNK = 1000
+
+
+class DailyKeywordRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, date: str, user_id: int) -> Optional[List[str]]:
+        row = self.db.get(DailyKeyword, (date, user_id))
+        return list(row.keywords) if row is not None else None
+
+    def bulk_upsert(self, date: str, rows: Iterable[Dict]) -> int:
+        """
+        rows: [{"user_id", "keywords", "profile_hash"}] 를 BULK_CHUNK 개씩 나눠 upsert
+        """
+        return chunked_upsert(
+            self.db,
+            DailyKeyword,
+            (dict(row, date=date) for row in rows),
+            BULK_CHUNK,
+            update_cols=("keywords", "profile_hash"),
+        )
+
+    def delete_for_user(self, user_id: int, from_date: str) -> None:
+        """
+        취향이 바뀐 사용자의 from_date 이후 미리 생성된 키워드 삭제 (commit 은 호출하는 쪽에서)
+        """
+        self.db.query(DailyKeyword).filter(
+            DailyKeyword.user_id == user_id,
+            DailyKeyword.date >= from_date,
+        ).delete(synchronize_session=False)
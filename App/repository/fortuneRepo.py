@@ -0,0 +1,33 @@
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from App.db.models import DailyFortune
+from App.repository.bulkWrite import chunked_upsert
+
+BULK_CHUNK = 500
+
+
+class FortuneRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, date: str, profile_hash: str) -> Optional[Dict]:
+        row = self.db.get(DailyFortune, (date, profile_hash))
+        return dict(row.fortune) if row is not None else None
+
+    def bulk_insert(self, date: str, rows: Iterable[Dict]) -> int:
+        """
+        rows: [{"profile_hash", "sign", "interests", "fortune", "source"}] 를 BULK_CHUNK 개씩 insert.
+        같은 날짜/조합이 이미 있으면 그대로 둔다 (먼저 내려간 운세 문구가 하루 동안 바뀌지 않게)
+        """
+        return chunked_upsert(self.db, DailyFortune, (dict(row, date=date) for row in rows), BULK_CHUNK)
+
+    def purge_before(self, date: str) -> int:
+        deleted = (
+            self.db.query(DailyFortune)
+            .filter(DailyFortune.date < date)
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
+        return deleted
@@ -0,0 +1,61 @@
+from typing import Dict, Iterable, List
+
+from sqlalchemy.orm import Session
+
+from App.db.models import Article, UserInboxItem
+from App.repository.articleRepo import _to_dict, window_start_utc
+
+
+class InboxRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _insert_ignore(self):
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert
+            return insert(UserInboxItem).prefix_with("IGNORE")
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        return insert(UserInboxItem).on_conflict_do_nothing()
+
+    # ---------- 쓰기 (fan-out 경로) ----------
+    def add_items(self, items: Iterable[Dict]) -> int:
+        """
+        items: [{"user_id", "url_hash", "matched_keywords"}] (이미 있는 쌍은 무시)
+        """
+        values = list(items)
+        if not values:
+            return 0
+        self.db.execute(self._insert_ignore(), values)
+        self.db.commit()
+        return len(values)
+
+    # ---------- 읽기 (API 경로) ----------
+    def get_inbox(
+        self,
+        user_id: int,
+        days: int = 3,
+        limit: int = 20,
+    ) -> List[Dict]:
+        """
+        사용자 인박스의 최근 `days`일 기사 (최신순). row 에 matched_keywords 포함
+        """
+        q = (
+            self.db.query(Article, UserInboxItem.matched_keywords)
+            .join(UserInboxItem, UserInboxItem.url_hash == Article.url_hash)
+            .filter(
+                UserInboxItem.user_id == user_id,
+                Article.published_at >= window_start_utc(days),
+            )
+            .order_by(Article.published_at.desc())
+        )
+        result: List[Dict] = []
+        for article, matched in q.limit(limit).all():
+            row = _to_dict(article)
+            row["published_dt"] = article.published_at
+            row["matched_keywords"] = [kw for kw in (matched or "").split(",") if kw]
+            result.append(row)
+        return result
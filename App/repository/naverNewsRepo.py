@@ -1,4 +1,9 @@
-from App.api.naverNewsAPI import fetch_naver_news_recent
+import asyncio
+
+from App.api.naverNewsAPI import fetch_naver_news_many
+from App.core.database import SessionLocal
+from App.core.simhash import collapse_near_duplicates
+from App.repository.articleRepo import ArticleRepository
 
 DOMESTIC_KEYWORDS = [
     "코스피",
@@ -29,21 +34,41 @@ STOCK_KEYWORDS = [
 
 ALL_KEYWORDS = DOMESTIC_KEYWORDS + US_KEYWORDS + STOCK_KEYWORDS
 
-def get_today_news():
-    all_results = []
+TODAY_NEWS_DAYS = 3
+TODAY_NEWS_PER_KEYWORD = 20
+
+
+def _read_today_news_from_store():
+    db = SessionLocal()
+    try:
+        return ArticleRepository(db).get_recent_by_keywords(
+            ALL_KEYWORDS,
+            days=TODAY_NEWS_DAYS,
+            per_keyword=TODAY_NEWS_PER_KEYWORD,
+        )
+    finally:
+        db.close()
 
-    # 키워드별로 따로 호출해서 결과를 쌓음 (사실상 OR 효과)
-    for kw in ALL_KEYWORDS:
-        rows = fetch_naver_news_recent(kw, max_pages=1, display=20)
-        all_results.extend(rows)
 
-    # 중복 제거 (origin_url 우선, 없으면 url)
-    seen = set()
-    merged = []
-    for row in all_results:
-        key = row.get("origin_url") or row.get("url")
-        if key and key not in seen:
-            seen.add(key)
-            merged.append(row)
+async def get_today_news(deadline: float = 6.0):
+    # 1) 수집 저장소(articles)에서 먼저 읽기
+    try:
+        stored = await asyncio.to_thread(_read_today_news_from_store)
+    except Exception as e:
+        print(f"[ERR] article store read failed: {e}")
+        stored = []
+    if stored:
+        # 같은 기사를 여러 언론사가 받아 쓴 경우 하나로 묶음 (related_count)
+        return collapse_near_duplicates(stored)
 
-    return merged
\ No newline at end of file
+    # 2) 저장소가 비어 있으면(수집 전) 네이버 라이브 호출
+    # 키워드별 호출을 동시에 돌려서 결과를 합침 (사실상 OR 효과)
+    # 중복 제거(origin_url 우선, 없으면 url)는 fetch_naver_news_many 안에서 처리
+    rows = await fetch_naver_news_many(
+        ALL_KEYWORDS,
+        days=TODAY_NEWS_DAYS,
+        max_pages=1,
+        display=TODAY_NEWS_PER_KEYWORD,
+        deadline=deadline,
+    )
+    return collapse_near_duplicates(rows)
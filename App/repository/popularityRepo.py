@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from App.db.models import KeywordPopularity
+
+
+class PopularityRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def replace_snapshot(self, source: str, counts: List[Tuple[str, int]], updated_at: datetime) -> None:
+        """
+        source(프로세스)의 스냅샷을 통째로 교체
+        """
+        self.db.query(KeywordPopularity).filter(KeywordPopularity.source == source).delete(
+            synchronize_session=False
+        )
+        self.db.add_all(
+            KeywordPopularity(source=source, keyword=kw[:100], hits=hits, updated_at=updated_at)
+            for kw, hits in counts
+        )
+        self.db.commit()
+
+    def hot_keywords(self, since: datetime, limit: int) -> List[Tuple[str, int]]:
+        """
+        since 이후 갱신된 스냅샷들을 합산한 상위 키워드 (조회 수 많은 순)
+        """
+        total = func.sum(KeywordPopularity.hits)
+        rows = (
+            self.db.query(KeywordPopularity.keyword, total)
+            .filter(KeywordPopularity.updated_at >= since)
+            .group_by(KeywordPopularity.keyword)
+            .order_by(total.desc())
+            .limit(limit)
+            .all()
+        )
+        return [(kw, int(hits)) for kw, hits in rows]
+
+    def purge_older_than(self, cutoff: datetime) -> int:
+        deleted = (
+            self.db.query(KeywordPopularity)
+            .filter(KeywordPopularity.updated_at < cutoff)
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
+        return deleted
@@ -1,7 +1,56 @@
-from typing import List, Dict, Optional
+import unicodedata
+from typing import List, Dict, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from App.core.database import get_db
-from App.user.models import UserOnBoarding
+from App.user.models import (
+    KEYWORD_KIND_EXCLUDE,
+    KEYWORD_KIND_INCLUDE,
+    UserCategory,
+    UserKeyword,
+    UserOnBoarding,
+)
+
+KEYWORD_MAX_LEN = 100
+BACKFILL_BATCH = 1000
+
+
+def _keyword_key(kw: str) -> str:
+    """
+    MySQL utf8mb4_0900_ai_ci 비교에 맞춘 키: 전각/반각(NFKC), 대소문자, 악센트를 무시
+    ("AI" == "ai" == "ＡＩ", "café" == "cafe")
+    """
+    decomposed = unicodedata.normalize("NFKD", unicodedata.normalize("NFKC", kw).casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _clean_keywords(keywords) -> List[str]:
+    """
+    공백 제거 + 중복 제거. user_keyword PK 는 MySQL 기본 *_ai_ci collation 으로 비교되므로
+    대소문자/전각/악센트만 다른 표기는 처음 쓴 것 하나만 남긴다 (안 그러면 IntegrityError)
+    """
+    cleaned = []
+    seen = set()
+    for kw in keywords or []:
+        kw = str(kw or "").strip()[:KEYWORD_MAX_LEN]
+        folded = _keyword_key(kw)
+        if kw and folded not in seen:
+            seen.add(folded)
+            cleaned.append(kw)
+    return cleaned
+
+
+def _clean_category_ids(category_ids) -> List[int]:
+    cleaned = []
+    for cid in category_ids or []:
+        try:
+            cid = int(cid)
+        except (TypeError, ValueError):
+            continue
+        if cid not in cleaned:
+            cleaned.append(cid)
+    return cleaned
 
 class PreferenceRepository:
     def __init__(self, db: Session):
@@ -18,6 +67,26 @@ class PreferenceRepository:
             .first()
         )
 
+    # ---------- 정규화 구독 테이블 (user_category / user_keyword) ----------
+    def _replace_categories(self, user_id: int, category_ids) -> None:
+        self.db.query(UserCategory).filter(UserCategory.user_id == user_id).delete(
+            synchronize_session=False
+        )
+        self.db.add_all(
+            UserCategory(user_id=user_id, category_id=cid)
+            for cid in _clean_category_ids(category_ids)
+        )
+
+    def _replace_keywords(self, user_id: int, kind: str, keywords) -> None:
+        self.db.query(UserKeyword).filter(
+            UserKeyword.user_id == user_id,
+            UserKeyword.kind == kind,
+        ).delete(synchronize_session=False)
+        self.db.add_all(
+            UserKeyword(user_id=user_id, kind=kind, keyword=kw)
+            for kw in _clean_keywords(keywords)
+        )
+
     # ---------- Q1 ----------
     def save_q1_selection(self, user_id: int, selected_ids: List[int]) -> None:
         onboarding = (
@@ -35,6 +104,7 @@ class PreferenceRepository:
         else:
             onboarding.q1_categories = selected_ids
 
+        self._replace_categories(user_id, selected_ids)
         self.db.commit()
         self.db.refresh(onboarding)
 
@@ -55,6 +125,7 @@ class PreferenceRepository:
         else:
             onboarding.q2_keywords = keywords
 
+        self._replace_keywords(user_id, KEYWORD_KIND_INCLUDE, keywords)
         self.db.commit()
         self.db.refresh(onboarding)
 
@@ -75,6 +146,7 @@ class PreferenceRepository:
         else:
             onboarding.q3_keywords = exclude_keywords
 
+        self._replace_keywords(user_id, KEYWORD_KIND_EXCLUDE, exclude_keywords)
         self.db.commit()
         self.db.refresh(onboarding)
 
@@ -102,4 +174,107 @@ class PreferenceRepository:
             .filter(UserOnBoarding.user_id == user_id)
             .first()
         )
-        return onboarding is not None and onboarding.q3_keywords is not None
\ No newline at end of file
+        return onboarding is not None and onboarding.q3_keywords is not None
+
+    # ---------- 역방향 조회 (배치 / fan-out / 통계) ----------
+    def get_user_ids_by_keyword(self, keyword: str, kind: str = KEYWORD_KIND_INCLUDE) -> List[int]:
+        rows = (
+            self.db.query(UserKeyword.user_id)
+            .filter(UserKeyword.keyword == keyword.strip(), UserKeyword.kind == kind)
+            .all()
+        )
+        return [user_id for (user_id,) in rows]
+
+    def get_user_ids_by_category(self, category_id: int) -> List[int]:
+        rows = (
+            self.db.query(UserCategory.user_id)
+            .filter(UserCategory.category_id == category_id)
+            .all()
+        )
+        return [user_id for (user_id,) in rows]
+
+    def get_followed_keywords(self) -> List[str]:
+        """
+        한 명 이상이 팔로우(Q2)하는 키워드 목록
+        """
+        rows = (
+            self.db.query(UserKeyword.keyword)
+            .filter(UserKeyword.kind == KEYWORD_KIND_INCLUDE)
+            .distinct()
+            .all()
+        )
+        return [kw for (kw,) in rows]
+
+    def get_followed_categories(self) -> List[int]:
+        rows = self.db.query(UserCategory.category_id).distinct().all()
+        return [cid for (cid,) in rows]
+
+    def keyword_follower_counts(
+        self,
+        kind: str = KEYWORD_KIND_INCLUDE,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[str, int]]:
+        """
+        키워드별 팔로워 수 (많은 순)
+        """
+        q = (
+            self.db.query(UserKeyword.keyword, func.count(UserKeyword.user_id))
+            .filter(UserKeyword.kind == kind)
+            .group_by(UserKeyword.keyword)
+            .order_by(func.count(UserKeyword.user_id).desc())
+        )
+        if limit is not None:
+            q = q.limit(limit)
+        return [(kw, count) for kw, count in q.all()]
+
+    def get_all_subscriptions(self) -> Dict[int, Dict[str, list]]:
+        """
+        user_id -> {"categories": [...], "include": [...], "exclude": [...]}
+        """
+        subs: Dict[int, Dict[str, list]] = {}
+
+        def _entry(user_id: int) -> Dict[str, list]:
+            return subs.setdefault(user_id, {"categories": [], "include": [], "exclude": []})
+
+        for user_id, cid in self.db.query(UserCategory.user_id, UserCategory.category_id).yield_per(
+            BACKFILL_BATCH
+        ):
+            _entry(user_id)["categories"].append(cid)
+        for user_id, kind, kw in self.db.query(
+            UserKeyword.user_id, UserKeyword.kind, UserKeyword.keyword
+        ).yield_per(BACKFILL_BATCH):
+            _entry(user_id)[kind].append(kw)
+        return subs
+
+    # ---------- 백필 ----------
+    def backfill_subscriptions(self) -> int:
+        """
+        온보딩 JSON 컬럼 -> user_category / user_keyword 로 다시 채움 (여러 번 실행해도 결과 동일).
+        반환값: 처리한 온보딩 레코드 수
+        """
+        rows = self.db.query(
+            UserOnBoarding.user_id,
+            UserOnBoarding.q1_categories,
+            UserOnBoarding.q2_keywords,
+            UserOnBoarding.q3_keywords,
+        ).all()
+
+        for i, (user_id, q1, q2, q3) in enumerate(rows, start=1):
+            # 사용자 한 명이 실패해도 (예: 저장된 값이 PK 와 충돌) 나머지는 계속 채움
+            try:
+                with self.db.begin_nested():
+                    self._replace_categories(user_id, q1)
+                    self._replace_keywords(user_id, KEYWORD_KIND_INCLUDE, q2)
+                    self._replace_keywords(user_id, KEYWORD_KIND_EXCLUDE, q3)
+            except SQLAlchemyError as e:
+                print(f"[Backfill] user {user_id} 건너뜀: {e}")
+            if i % BACKFILL_BATCH == 0:
+                self.db.commit()
+        self.db.commit()
+        return len(rows)
+
+    def subscriptions_empty(self) -> bool:
+        return (
+            self.db.query(UserCategory.user_id).first() is None
+            and self.db.query(UserKeyword.user_id).first() is None
+        )
@@ -0,0 +1,58 @@
+import os
+from typing import Dict, Iterable
+
+from sqlalchemy.orm import Session
+
+from App.core.bloom import RotatingBloomFilter
+from App.db.models import UserSeenFilter
+
+# 세대당 기억할 기사 수 / false positive 확률 (기본값 기준 세대당 약 2.4KB, 2세대 약 4.8KB)
+SEEN_FILTER_CAPACITY = int(os.getenv("SEEN_FILTER_CAPACITY", "2000"))
+SEEN_FILTER_FP_RATE = float(os.getenv("SEEN_FILTER_FP_RATE", "0.01"))
+SEEN_FILTER_GENERATIONS = 2
+SEEN_FILTER_ROTATE_SEC = float(os.getenv("SEEN_FILTER_ROTATE_DAYS", "7")) * 86400
+
+
+def article_key(row: Dict) -> str:
+    """
+    본 기사 판별 키: 원문 링크 우선 (NewsArticle.url, TTS origin_link 와 같은 기준)
+    """
+    return row.get("origin_url") or row.get("originallink") or row.get("url") or row.get("link") or ""
+
+
+def new_seen_filter() -> RotatingBloomFilter:
+    return RotatingBloomFilter(
+        SEEN_FILTER_CAPACITY,
+        SEEN_FILTER_FP_RATE,
+        generations=SEEN_FILTER_GENERATIONS,
+        rotate_seconds=SEEN_FILTER_ROTATE_SEC,
+    )
+
+
+class SeenFilterRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load(self, user_id: int) -> RotatingBloomFilter:
+        row = self.db.get(UserSeenFilter, user_id)
+        if row is None:
+            return new_seen_filter()
+        return RotatingBloomFilter.from_bytes(
+            row.data,
+            SEEN_FILTER_CAPACITY,
+            SEEN_FILTER_FP_RATE,
+            generations=SEEN_FILTER_GENERATIONS,
+            rotate_seconds=SEEN_FILTER_ROTATE_SEC,
+        )
+
+    def save(self, user_id: int, seen: RotatingBloomFilter) -> None:
+        self.db.merge(UserSeenFilter(user_id=user_id, data=seen.to_bytes()))
+        self.db.commit()
+
+    def mark_seen(self, user_id: int, keys: Iterable[str]) -> None:
+        keys = [k for k in keys if k]
+        if not keys:
+            return
+        seen = self.load(user_id)
+        seen.add_many(keys)
+        self.save(user_id, seen)
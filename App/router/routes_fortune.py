@@ -1,21 +1,75 @@
+import json
+from contextlib import aclosing
 from fastapi import APIRouter, Query
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
-from App.service.fortune_service import generate_today_fortune
+from App.core.streaming import ClosingStreamingResponse
+from App.service.fortune_service import generate_today_fortune, stream_today_fortune
 
 router = APIRouter(
     prefix="/api/fortune",
     tags=["fortune"]
 )
 
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _fortune_events(
+    name: Optional[str],
+    birthdate: Optional[str],
+    sign: Optional[str],
+    interests: List[str],
+) -> AsyncIterator[str]:
+    """
+    SSE 이벤트 순서
+    - start : 연결 직후 바로 (첫 바이트)
+    - field : {"key": "overall", "value": "..."} 필드가 완성될 때마다
+    - done  : 스트리밍이 아닐 때의 응답 JSON 과 같은 형태
+    - error : {"detail": "..."} (생성 중 실패)
+    """
+    yield _sse("start", {})
+    try:
+        events = stream_today_fortune(
+            name=name,
+            birthdate=birthdate,
+            sign=sign,
+            interests=interests,
+        )
+        async with aclosing(events):
+            async for event, payload in events:
+                if event == "field":
+                    key, value = payload
+                    yield _sse("field", {"key": key, "value": value})
+                else:
+                    yield _sse("done", {
+                        "name": name,
+                        "birthdate": birthdate,
+                        "sign": sign,
+                        "fortune": payload,
+                    })
+    except Exception as e:
+        print(f"[Fortune] 스트리밍 생성 실패: {e}")
+        yield _sse("error", {"detail": "운세 생성 중 오류가 발생했습니다."})
+
+
 @router.get("/today")
-def today_fortune(
+async def today_fortune(
     name: Optional[str] = None,
     birthdate: Optional[str] = None,
     sign: Optional[str] = None,
     interests: Optional[List[str]] = Query(default=None),
+    stream: bool = False,   # true 면 text/event-stream 으로 필드 단위 전송
 ):
-    result = generate_today_fortune(
+    if stream:
+        return ClosingStreamingResponse(
+            _fortune_events(name, birthdate, sign, interests or []),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    result = await generate_today_fortune(
         name=name,
         birthdate=birthdate,
         sign=sign,
@@ -26,4 +80,4 @@ def today_fortune(
         "birthdate": birthdate,
         "sign": sign,
         "fortune": result
-    }
\ No newline at end of file
+    }
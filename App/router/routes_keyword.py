@@ -1,27 +1,70 @@
+from typing import List
+
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from App.core.database import get_db
+from App.core.rate_limiter import kst_today
+from App.repository.dailyKeywordRepo import DailyKeywordRepository
 from App.user.models import UserOnBoarding
-from App.service.keyword_service import generate_today_keywords
+from App.service.keyword_service import TODAY_KEYWORDS_SIZE, generate_today_keywords, profile_key
 
 router = APIRouter(prefix="/api/keywords", tags=["keywords"])
 
-@router.get("/today_keywords")
-def get_today_keywords(user_id: int, db: Session = Depends(get_db)):
 
+def _load_stored(db: Session, date: str, user_id: int):
+    """
+    (야간 배치가 만들어 둔 키워드, 온보딩) - 저장된 키워드가 있으면 온보딩은 조회하지 않음
+    """
+    stored = DailyKeywordRepository(db).get(date, user_id)
+    if stored is not None:
+        return stored, None
     onboarding = (
         db.query(UserOnBoarding)
         .filter(UserOnBoarding.user_id == user_id)
         .first()
     )
+    return None, onboarding
+
+
+def _save(db: Session, date: str, user_id: int, onboarding: UserOnBoarding, keywords: List[str]) -> None:
+    try:
+        DailyKeywordRepository(db).bulk_upsert(date, [{
+            "user_id": user_id,
+            "keywords": keywords,
+            "profile_hash": profile_key(
+                onboarding.q1_categories or [],
+                onboarding.q2_keywords or [],
+                onboarding.q3_keywords or [],
+                TODAY_KEYWORDS_SIZE,
+            ),
+        }])
+    except Exception as e:
+        db.rollback()
+        print(f"[Keyword] daily_keywords 저장 실패: {e}")
+
 
+@router.get("/today_keywords")
+async def get_today_keywords(user_id: int, db: Session = Depends(get_db)):
+
+    # 1) 야간 배치(daily_keywords_batch)가 만들어 둔 결과: PK 조회 한 번
+    date = kst_today()
+    stored, onboarding = await run_in_threadpool(_load_stored, db, date, user_id)
+    if stored is not None:
+        return {"keywords": stored}
+
+    # 2) 배치 이후 가입/취향 변경 사용자: 즉시 생성 후 저장
     if onboarding is None:
         return {"keywords": []}
 
-    keywords = generate_today_keywords(
+    keywords = await generate_today_keywords(
         onboarding.q1_categories,
         onboarding.q2_keywords,
         onboarding.q3_keywords,
+        TODAY_KEYWORDS_SIZE,
     )
 
+    if keywords:
+        await run_in_threadpool(_save, db, date, user_id, onboarding, keywords)
+
     return {"keywords": keywords}
@@ -4,6 +4,6 @@ from App.service.naverNewsService import get_today_economy_news
 router = APIRouter(prefix="/api/news", tags=["news"])
 
 @router.get("/today")
-def read_today_news():
-    news = get_today_economy_news() or []
+async def read_today_news():
+    news = await get_today_economy_news() or []
     return {"count": len(news), "data": news}
\ No newline at end of file
@@ -7,4 +7,5 @@ class NewsItem(BaseModel):
     published_at: str
     source: Optional[str] = None
     url: Optional[HttpUrl] = None
-    origin_url: Optional[str] = None
\ No newline at end of file
+    origin_url: Optional[str] = None
+    related_count: int = 1
\ No newline at end of file
@@ -0,0 +1,120 @@
+# App/service/daily_keywords_batch.py
+"""
+오늘의 키워드 야간 배치.
+
+1) user_onboarding 을 서버 사이드 커서(stream_results)로 LOAD_BATCH 행씩 읽으면서
+   프로필(Q1/Q2/Q3 정규화 해시)이 같은 사용자끼리 묶는다
+2) 프로필마다 generate_today_keywords 를 한 번씩, 동시에 최대 BATCH_CONCURRENCY 개까지 호출
+   (LLM 실패/부족 시 규칙 기반 fallback 은 generate_today_keywords 안에서 처리)
+3) 결과를 daily_keywords 테이블에 (날짜, user_id) 단위로 bulk upsert
+
+아침에 /api/keywords/today_keywords 는 daily_keywords PK 조회만 하게 된다.
+
+실행: KST 자정 이후 하루 한 번 (예: cron "10 0 * * *")
+    python -m App.service.daily_keywords_batch
+"""
+import asyncio
+import os
+import time
+from typing import Dict, List, Tuple
+
+from App.core.database import SessionLocal
+from App.core.llm_gateway import close_llm_gateway
+from App.core.rate_limiter import kst_today
+from App.repository.dailyKeywordRepo import DailyKeywordRepository
+from App.service.keyword_service import TODAY_KEYWORDS_SIZE, generate_today_keywords, profile_key
+from App.user.models import UserOnBoarding
+
+LOAD_BATCH = 1000
+BATCH_CONCURRENCY = int(os.getenv("DAILY_KEYWORDS_CONCURRENCY", "8"))
+TARGET_SIZE = TODAY_KEYWORDS_SIZE
+
+Profile = Tuple[List[int], List[str], List[str]]
+
+
+def load_profile_groups() -> Dict[str, Tuple[Profile, List[int]]]:
+    """
+    프로필 해시 -> ((q1, q2, q3), [user_id, ...])
+    """
+    groups: Dict[str, Tuple[Profile, List[int]]] = {}
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(
+                UserOnBoarding.user_id,
+                UserOnBoarding.q1_categories,
+                UserOnBoarding.q2_keywords,
+                UserOnBoarding.q3_keywords,
+            )
+            .execution_options(stream_results=True, yield_per=LOAD_BATCH)
+        )
+        for user_id, q1, q2, q3 in rows:
+            profile = (list(q1 or []), list(q2 or []), list(q3 or []))
+            key = profile_key(*profile, TARGET_SIZE)
+            groups.setdefault(key, (profile, []))[1].append(user_id)
+    finally:
+        db.close()
+    return groups
+
+
+async def run_daily_keywords_batch() -> int:
+    """
+    반환값: daily_keywords 에 저장한 사용자 수
+    """
+    started = time.monotonic()
+    date = kst_today()
+    groups = await asyncio.to_thread(load_profile_groups)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def _generate(key: str, profile: Profile) -> Tuple[str, List[str]]:
+        async with semaphore:
+            try:
+                keywords = await generate_today_keywords(*profile, TARGET_SIZE)
+            except Exception as e:
+                print(f"[DailyKeywords] 프로필 {key[:8]} 생성 실패: {e}")
+                keywords = []
+            return key, keywords
+
+    results = await asyncio.gather(
+        *(_generate(key, profile) for key, (profile, _) in groups.items())
+    )
+
+    rows = (
+        {"user_id": user_id, "keywords": keywords, "profile_hash": key}
+        for key, keywords in results
+        if keywords
+        for user_id in groups[key][1]
+    )
+
+    def _store() -> int:
+        db = SessionLocal()
+        try:
+            return DailyKeywordRepository(db).bulk_upsert(date, rows)
+        finally:
+            db.close()
+
+    stored = await asyncio.to_thread(_store)
+    print(
+        f"[DailyKeywords] {date}: 프로필 {len(groups)}개, 사용자 {stored}명 저장 "
+        f"({time.monotonic() - started:.1f}s)"
+    )
+    return stored
+
+
+async def main() -> None:
+    """
+    단독 실행용: 배치가 끝나면(실패해도) LLM 클라이언트 연결을 닫고 루프를 끝낸다
+    """
+    try:
+        await run_daily_keywords_batch()
+    finally:
+        await close_llm_gateway()
+
+
+if __name__ == "__main__":
+    from App.core.database import engine
+    from App.db import models as db_models
+    from App.user import password_reset  # noqa: F401  (User.reset_tokens 관계 매핑용)
+
+    db_models.Base.metadata.create_all(bind=engine)
+    asyncio.run(main())
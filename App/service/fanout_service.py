@@ -0,0 +1,98 @@
+# App/service/fanout_service.py
+"""
+새로 수집된 기사 -> 사용자 인박스(user_inbox) fan-out.
+
+피드를 요청할 때마다 사용자 x 기사 매칭을 다시 계산하는 대신,
+수집 사이클마다
+- 모든 사용자의 포함 키워드(Q2 + Q1 카테고리 확장)와 제외 키워드(Q3)를
+  Aho-Corasick 오토마톤 하나로 컴파일하고
+- 이번 사이클에 새로 들어온 기사만 한 번씩 스캔해서
+- 걸린 키워드를 구독하는 사용자 중 제외 키워드에 걸리지 않은 사용자 인박스에 추가한다.
+비용은 (새 기사 텍스트 길이 + 실제로 전달되는 (사용자, 기사) 쌍 수) 에 비례하고
+사용자 수 x 기사 수에 비례하지 않는다.
+
+포함 판정은 색인(ArticleIndex.select)과 같다: 제목/요약에 키워드가 있거나 그 키워드로 수집된 기사.
+제외 판정은 제목/요약에 제외 키워드가 있는지만 본다.
+"""
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from App.ai_news.aiNews_service import keyword_sets_from_onboarding
+from App.ai_news.keyword_index import AhoCorasick, normalize_keyword
+from App.repository.inboxRepo import InboxRepository
+from App.repository.preferenceRepo import PreferenceRepository
+
+MATCHED_KEYWORDS_MAX_LEN = 500
+
+
+def load_subscriptions(db: Session) -> Dict[int, Tuple[List[str], List[str]]]:
+    """
+    user_id -> (포함 키워드, 제외 키워드). 정규화 구독 테이블(user_category / user_keyword)에서 읽음
+    """
+    subscriptions: Dict[int, Tuple[List[str], List[str]]] = {}
+    for user_id, sub in PreferenceRepository(db).get_all_subscriptions().items():
+        include, exclude = keyword_sets_from_onboarding(
+            sub["categories"], sub["include"], sub["exclude"]
+        )
+        if include:
+            subscriptions[user_id] = (include, exclude)
+    return subscriptions
+
+
+def _article_text(row: Dict) -> str:
+    # ArticleIndex 와 같은 정규화 (소문자 제목 + 요약)
+    title = (row.get("title") or "").lower()
+    desc = (row.get("summary") or row.get("description") or "").lower()
+    return f"{title}\n{desc}"
+
+
+class SubscriptionMatcher:
+    def __init__(self, subscriptions: Dict[int, Tuple[List[str], List[str]]]):
+        # 키워드(정규화) -> 구독 사용자 / 제외 사용자
+        self.include_subs: Dict[str, List[int]] = {}
+        self.exclude_subs: Dict[str, List[int]] = {}
+        for user_id, (include, exclude) in subscriptions.items():
+            for kw in {normalize_keyword(k) for k in include} - {""}:
+                self.include_subs.setdefault(kw, []).append(user_id)
+            for kw in {normalize_keyword(k) for k in exclude} - {""}:
+                self.exclude_subs.setdefault(kw, []).append(user_id)
+        self._automaton = AhoCorasick(self.include_subs.keys() | self.exclude_subs.keys())
+
+    def match(self, row: Dict, queries: Iterable[str] = ()) -> Dict[int, List[str]]:
+        """
+        기사 하나 -> {user_id: 매칭된 포함 키워드들}
+        """
+        text_hits = self._automaton.count(_article_text(row)).keys()
+
+        vetoed: Set[int] = set()
+        for kw in text_hits:
+            vetoed.update(self.exclude_subs.get(kw, ()))
+
+        hits = set(text_hits) | {normalize_keyword(q) for q in queries}
+        matched: Dict[int, List[str]] = {}
+        for kw in hits:
+            for user_id in self.include_subs.get(kw, ()):
+                if user_id not in vetoed:
+                    matched.setdefault(user_id, []).append(kw)
+        return matched
+
+
+def fan_out_new_articles(db: Session, new_articles: Dict[str, Tuple[Dict, Set[str]]]) -> int:
+    """
+    new_articles: url_hash -> (기사 row, 수집에 쓰인 검색 키워드들)
+    반환값: 인박스에 추가한 (사용자, 기사) 건수
+    """
+    if not new_articles:
+        return 0
+
+    matcher = SubscriptionMatcher(load_subscriptions(db))
+    items = []
+    for url_hash, (row, queries) in new_articles.items():
+        for user_id, keywords in matcher.match(row, queries).items():
+            items.append({
+                "user_id": user_id,
+                "url_hash": url_hash,
+                "matched_keywords": ",".join(sorted(keywords))[:MATCHED_KEYWORDS_MAX_LEN],
+            })
+    return InboxRepository(db).add_items(items)
@@ -0,0 +1,171 @@
+# App/service/fortune_batch.py
+"""
+오늘의 운세 야간 배치.
+
+오늘 날짜 기준으로 아래 (별자리/띠, 관심사 묶음) 조합의 운세를 미리 생성해서 daily_fortunes 에 저장한다.
+1) 모든 별자리/띠(+ 정보 없음) x (관심사 없음 + 사용자 온보딩 Q1 카테고리 조합 중 많은 순 FORTUNE_BATCH_INTEREST_SETS 개)
+2) 최근 FORTUNE_LIVE_LOOKBACK_DAYS 일 중 FORTUNE_LIVE_MIN_DAYS 일 이상 요청 시점에 생성됐던(source=live) 조합
+   (하루 한 번 들어온 조합까지 매일 미리 만들지는 않음)
+오늘 이미 저장된 조합(자정 이후 요청 시점에 만들어진 것)은 다시 만들지도, 덮어쓰지도 않는다.
+/api/fortune/today 는 대부분 테이블 PK 조회로 끝나고, 남는 조합만 요청 시점에 생성된다.
+
+실행: KST 자정 이후 하루 한 번 (예: cron "20 0 * * *")
+    python -m App.service.fortune_batch
+"""
+import asyncio
+import os
+import time
+from collections import Counter
+from datetime import date as date_cls, timedelta
+from typing import Dict, List, Tuple
+
+from App.core.database import SessionLocal
+from App.core.llm_gateway import close_llm_gateway
+from App.core.rate_limiter import kst_today
+from App.db.models import DailyFortune
+from App.repository.fortuneRepo import FortuneRepository
+from App.service.fortune_service import (
+    CANONICAL_SIGNS,
+    FortuneParseError,
+    canonical_interests,
+    canonical_sign,
+    fortune_profile_key,
+    generate_fortune_template,
+)
+from App.service.preferenceService import Q1_CATEGORIES
+from App.user.models import UserOnBoarding
+
+LOAD_BATCH = 1000
+BATCH_CONCURRENCY = int(os.getenv("FORTUNE_BATCH_CONCURRENCY", "8"))
+FORTUNE_BATCH_INTEREST_SETS = int(os.getenv("FORTUNE_BATCH_INTEREST_SETS", "10"))
+FORTUNE_LIVE_LOOKBACK_DAYS = 7
+FORTUNE_LIVE_MIN_DAYS = int(os.getenv("FORTUNE_LIVE_MIN_DAYS", "2"))
+FORTUNE_RETENTION_DAYS = FORTUNE_LIVE_LOOKBACK_DAYS + 1
+
+Bucket = Tuple[str, List[str]]
+
+
+def _days_before(date: str, days: int) -> str:
+    return (date_cls.fromisoformat(date) - timedelta(days=days)).isoformat()
+
+
+def load_buckets(date: str) -> Dict[str, Bucket]:
+    """
+    운세 프로필 해시 -> (별자리/띠, 관심사)
+    """
+    id_to_label = {c.id: c.label for c in Q1_CATEGORIES}
+    db = SessionLocal()
+    try:
+        # 온보딩 Q1 카테고리 조합별 사용자 수
+        interest_sets: Counter = Counter()
+        rows = (
+            db.query(UserOnBoarding.q1_categories)
+            .execution_options(stream_results=True, yield_per=LOAD_BATCH)
+        )
+        for (q1,) in rows:
+            labels = canonical_interests(id_to_label.get(cid) for cid in q1 or [] if cid in id_to_label)
+            if labels:
+                interest_sets[tuple(labels)] += 1
+
+        live = (
+            db.query(DailyFortune.profile_hash, DailyFortune.sign, DailyFortune.interests)
+            .filter(
+                DailyFortune.source == "live",
+                DailyFortune.date >= _days_before(date, FORTUNE_LIVE_LOOKBACK_DAYS),
+            )
+            .all()
+        )
+        stored_today = {
+            key for (key,) in db.query(DailyFortune.profile_hash).filter(DailyFortune.date == date)
+        }
+    finally:
+        db.close()
+
+    buckets: Dict[str, Bucket] = {}
+    interest_grid = [[]] + [list(labels) for labels, _ in interest_sets.most_common(FORTUNE_BATCH_INTEREST_SETS)]
+    for sign in [""] + CANONICAL_SIGNS:
+        for interests in interest_grid:
+            buckets[fortune_profile_key(sign, interests)] = (sign, interests)
+    live_days = Counter(key for key, _, _ in live)
+    for key, sign, interests in live:
+        if live_days[key] < FORTUNE_LIVE_MIN_DAYS or key in buckets:
+            continue
+        # 예전 규칙으로 저장된 (지금은 받지 않는) 별자리/관심사 조합은 건너뜀
+        sign, interests = canonical_sign(sign), canonical_interests(interests)
+        if fortune_profile_key(sign, interests) == key:
+            buckets[key] = (sign, interests)
+    for key in stored_today:
+        buckets.pop(key, None)
+    return buckets
+
+
+async def run_fortune_batch() -> int:
+    """
+    반환값: daily_fortunes 에 저장한 조합 수
+    """
+    started = time.monotonic()
+    date = kst_today()
+    buckets = await asyncio.to_thread(load_buckets, date)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def _generate(key: str, sign: str, interests: List[str]):
+        async with semaphore:
+            try:
+                return key, await generate_fortune_template(sign, interests)
+            except FortuneParseError:
+                print(f"[FortuneBatch] 조합 {key[:8]} JSON 파싱 실패 → 요청 시점 생성으로 넘김")
+            except Exception as e:
+                print(f"[FortuneBatch] 조합 {key[:8]} 생성 실패: {e}")
+            return key, None
+
+    results = await asyncio.gather(
+        *(_generate(key, sign, interests) for key, (sign, interests) in buckets.items())
+    )
+
+    rows = (
+        {
+            "profile_hash": key,
+            "sign": buckets[key][0],
+            "interests": buckets[key][1],
+            "fortune": fortune,
+            "source": "batch",
+        }
+        for key, fortune in results
+        if fortune is not None
+    )
+
+    def _store() -> int:
+        db = SessionLocal()
+        try:
+            repo = FortuneRepository(db)
+            stored = repo.bulk_insert(date, rows)
+            repo.purge_before(_days_before(date, FORTUNE_RETENTION_DAYS))
+            return stored
+        finally:
+            db.close()
+
+    stored = await asyncio.to_thread(_store)
+    print(
+        f"[FortuneBatch] {date}: 조합 {len(buckets)}개 중 {stored}개 저장 "
+        f"({time.monotonic() - started:.1f}s)"
+    )
+    return stored
+
+
+async def main() -> None:
+    """
+    단독 실행용: 배치가 끝나면(실패해도) LLM 클라이언트 연결을 닫고 루프를 끝낸다
+    """
+    try:
+        await run_fortune_batch()
+    finally:
+        await close_llm_gateway()
+
+
+if __name__ == "__main__":
+    from App.core.database import engine
+    from App.db import models as db_models
+    from App.user import password_reset  # noqa: F401  (User.reset_tokens 관계 매핑용)
+
+    db_models.Base.metadata.create_all(bind=engine)
+    asyncio.run(main())
@@ -1,26 +1,124 @@
+import asyncio
+import hashlib
 import json
 import os
-from platform import system
-from typing import List, Optional
+from contextlib import aclosing
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
-from openai import OpenAI
+from App.core.cache import DailyCache
+from App.core.database import SessionLocal
+from App.core.json_stream import JsonFieldStream
+from App.core.llm_gateway import llm_gateway
+from App.core.rate_limiter import kst_today
+from App.repository.fortuneRepo import FortuneRepository
+from App.service.preferenceService import Q1_CATEGORIES
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+FORTUNE_MODEL = "gpt-5.1"
 
-def generate_today_fortune(
-        name: Optional[str] = None,
-        birthdate: Optional[str] = None,    # "2002-08-05" 형식 등
-        interests: Optional[List[str]] = None,
-        sign: Optional[str] = None,     # 별자리/띠
-) -> dict:
+# 운세 본문은 이름 자리를 비워 두고 (날짜, 별자리/띠, 관심사) 묶음 단위로 한 번만 생성한다.
+# 응답할 때 NAME_TOKEN 을 실제 이름으로 바꿔 넣음
+NAME_TOKEN = "{이름}"
+ANONYMOUS_NAME = "회원"
+
+# (별자리, 시작 월, 시작 일) - 날짜순
+ZODIAC_SIGNS = [
+    ("염소자리", 1, 1), ("물병자리", 1, 20), ("물고기자리", 2, 19), ("양자리", 3, 21),
+    ("황소자리", 4, 20), ("쌍둥이자리", 5, 21), ("게자리", 6, 22), ("사자자리", 7, 23),
+    ("처녀자리", 8, 23), ("천칭자리", 9, 23), ("전갈자리", 10, 23), ("사수자리", 11, 22),
+    ("염소자리", 12, 22),
+]
+ZODIAC_ANIMALS = [
+    "쥐띠", "소띠", "호랑이띠", "토끼띠", "용띠", "뱀띠",
+    "말띠", "양띠", "원숭이띠", "닭띠", "개띠", "돼지띠",
+]
+CANONICAL_SIGNS = list(dict.fromkeys(name for name, _, _ in ZODIAC_SIGNS)) + ZODIAC_ANIMALS
+
+# 관심사는 온보딩 Q1 카테고리만 받는다 (라벨 / key -> 라벨). 최대 선택 수도 Q1 과 같게
+INTEREST_LABELS = {**{c.key: c.label for c in Q1_CATEGORIES}, **{c.label: c.label for c in Q1_CATEGORIES}}
+MAX_INTERESTS = 3
+
+# 프롬프트 [출력 형식] 의 필드. 하나라도 빠진 응답은 파싱 실패로 보고 저장/캐시하지 않는다
+FORTUNE_FIELDS = (
+    "overall", "money", "love", "work_study", "health",
+    "lucky_item", "lucky_color", "summary_keywords",
+)
+
+# (KST 날짜, 운세 프로필 해시) -> 이름 자리가 비어 있는 운세. 테이블 조회/실시간 생성 결과를 프로세스 안에 하루 동안 보관
+_daily_fortunes = DailyCache(maxsize=int(os.getenv("FORTUNE_CACHE_SIZE", "5000")))
+
+
+class FortuneParseError(ValueError):
+    """
+    LLM 응답이 JSON 이 아닐 때. fallback 에는 원문을 overall 에 담은 운세가 들어 있다 (캐시/저장하지 않음)
+    """
+
+    def __init__(self, fallback: Dict[str, Any]):
+        super().__init__("운세 응답 JSON 파싱 실패")
+        self.fallback = fallback
+
+
+def sign_from_birthdate(birthdate: Optional[str]) -> Optional[str]:
+    """
+    "2002-08-05" / "2002.08.05" / "20020805" -> 별자리
+    """
+    digits = "".join(ch for ch in (birthdate or "") if ch.isdigit())
+    try:
+        born = datetime.strptime(digits[:8], "%Y%m%d")
+    except ValueError:
+        return None
+    result = ZODIAC_SIGNS[0][0]
+    for name, month, day in ZODIAC_SIGNS:
+        if (born.month, born.day) >= (month, day):
+            result = name
+    return result
+
+
+def canonical_sign(sign: Optional[str], birthdate: Optional[str] = None) -> str:
+    """
+    "양 자리" / "양자리" -> "양자리", "호랑이" -> "호랑이띠".
+    별자리/띠를 안 주면 생년월일에서 별자리를 구한다 (생년월일은 이 용도로만 씀).
+    둘 다 없거나 모르는 별자리/띠면 "" (운세 조합 수가 CANONICAL_SIGNS 밖으로 늘어나지 않게)
+    """
+    s = (sign or "").replace(" ", "")
+    if s:
+        for candidate in (s, s + "자리", s + "띠"):
+            if candidate in CANONICAL_SIGNS:
+                return candidate
+        return ""
+    return sign_from_birthdate(birthdate) or ""
+
+
+def canonical_interests(interests: Optional[Sequence[str]]) -> List[str]:
+    """
+    Q1 카테고리 라벨/key 만 라벨로 바꿔 남기고 (모르는 값은 버림) 앞에서부터 MAX_INTERESTS 개, 정렬해서 반환
+    """
+    labels = dict.fromkeys(
+        INTEREST_LABELS[i] for i in (str(i).strip() for i in interests or []) if i in INTEREST_LABELS
+    )
+    return sorted(list(labels)[:MAX_INTERESTS])
+
+
+def fortune_profile_key(sign: str, interests: Sequence[str]) -> str:
+    canonical = json.dumps([sign, list(interests)], ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def fill_name(fortune: Any, name: Optional[str]) -> Any:
     """
-    OpenAI API를 사용해서 오늘의 운세를 JSON 형태로 생성해주는 함수.
+    NAME_TOKEN 을 이름으로 바꾼 사본 (캐시된 원본은 건드리지 않음)
     """
-    if interests is None:
-        interests = []
+    if isinstance(fortune, str):
+        return fortune.replace(NAME_TOKEN, (name or "").strip() or ANONYMOUS_NAME)
+    if isinstance(fortune, list):
+        return [fill_name(v, name) for v in fortune]
+    if isinstance(fortune, dict):
+        return {k: fill_name(v, name) for k, v in fortune.items()}
+    return fortune
 
-    profile_text = f"""이름: {name or "비공개"}
-생년월일: {birthdate or "비공개"}
+
+def _fortune_messages(sign: str, interests: Sequence[str]) -> List[Dict[str, str]]:
+    profile_text = f"""이름: {NAME_TOKEN}
 관심사: {", ".join(interests) if interests else "비공개"}
 별자리/띠: {sign or "비공개"}"""
 
@@ -41,6 +139,7 @@ def generate_today_fortune(
 - 각 항목은 2~3문장 정도로.
 - 말투는 친근하지만 반말은 쓰지 마.
 - 오늘 하루 기준으로만 이야기해.
+- 사용자를 부를 때는 다른 이름을 지어내지 말고 반드시 "{NAME_TOKEN}님" 이라고 그대로 써.
 
 [출력 형식]
 반드시 아래 JSON 형식 그대로만 출력해. 한국어로 작성해.
@@ -58,32 +157,184 @@ def generate_today_fortune(
 
 위 JSON 이외의 다른 텍스트(설명, 인사말 등)는 절대 쓰지 마.
 """
-    completion = client.chat.completions.create(
-        model="gpt-5.1",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=0.7,
-    )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
 
-    raw_text = completion.choices[0].message.content
+def _is_complete(fortune: Any) -> bool:
+    return isinstance(fortune, dict) and all(field in fortune for field in FORTUNE_FIELDS)
 
 
+def _fallback_fortune(raw_text: str) -> Dict[str, Any]:
+    # 혹시 JSON이 살짝 깨져도 서버가 안 터지게 fallback
+    return {
+        "overall": raw_text.strip(),
+        "money": "",
+        "love": "",
+        "work_study": "",
+        "health": "",
+        "lucky_item": "",
+        "lucky_color": "",
+        "summary_keywords": [],
+    }
+
+
+async def generate_fortune_template(sign: str, interests: Sequence[str]) -> Dict[str, Any]:
+    """
+    OpenAI API를 사용해서 (별자리/띠, 관심사) 기준 오늘의 운세를 JSON 형태로 생성.
+    사용자를 부르는 자리에는 NAME_TOKEN 이 들어 있다. JSON 이 아니면 FortuneParseError.
+    """
+    raw_text = await llm_gateway.chat_text(
+        FORTUNE_MODEL,
+        _fortune_messages(sign, interests),
+        temperature=0.7,
+    )
+
     #JSON 파싱
     try:
-        data = json.loads(raw_text)
+        fortune = json.loads(raw_text)
     except json.JSONDecodeError:
-        # 혹시 JSON이 살짝 깨져도 서버가 안 터지게 fallback
-        data = {
-            "overall": raw_text.strip(),
-            "money": "",
-            "love": "",
-            "work_study": "",
-            "health": "",
-            "lucky_item": "",
-            "lucky_color": "",
-            "summary_keywords": [],
-        }
-
-    return data
\ No newline at end of file
+        raise FortuneParseError(_fallback_fortune(raw_text))
+    if not _is_complete(fortune):
+        raise FortuneParseError(_fallback_fortune(raw_text))
+    return fortune
+
+
+def _read_stored(date: str, key: str) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        return FortuneRepository(db).get(date, key)
+    finally:
+        db.close()
+
+
+def _store_live(date: str, key: str, sign: str, interests: List[str], fortune: Dict[str, Any]) -> None:
+    db = SessionLocal()
+    try:
+        FortuneRepository(db).bulk_insert(date, [{
+            "profile_hash": key,
+            "sign": sign,
+            "interests": interests,
+            "fortune": fortune,
+            "source": "live",
+        }])
+    except Exception as e:
+        db.rollback()
+        print(f"[Fortune] daily_fortunes 저장 실패: {e}")
+    finally:
+        db.close()
+
+
+async def generate_today_fortune(
+        name: Optional[str] = None,
+        birthdate: Optional[str] = None,    # "2002-08-05" 형식 등
+        interests: Optional[List[str]] = None,
+        sign: Optional[str] = None,     # 별자리/띠
+) -> dict:
+    """
+    오늘의 운세.
+    1) 야간 배치(fortune_batch)가 만들어 둔 daily_fortunes 테이블에서 PK 조회
+    2) 없는 조합이면 그때 생성해서 테이블에 저장 (다른 프로세스/다음 요청은 1에서 끝남)
+    같은 프로세스 안에서는 하루 동안 메모리에 보관하고, 동시에 들어온 같은 조합은 LLM 호출 1번을 공유한다.
+    """
+    sign_key = canonical_sign(sign, birthdate)
+    interest_key = canonical_interests(interests)
+    key = fortune_profile_key(sign_key, interest_key)
+
+    async def _load() -> Dict[str, Any]:
+        date = kst_today()
+        stored = await asyncio.to_thread(_read_stored, date, key)
+        if stored is not None:
+            return stored
+        fortune = await generate_fortune_template(sign_key, interest_key)
+        await asyncio.to_thread(_store_live, date, key, sign_key, interest_key, fortune)
+        return fortune
+
+    try:
+        template = await _daily_fortunes.aget_or_load(key, _load)
+    except FortuneParseError as e:
+        template = e.fallback
+    return fill_name(template, name)
+
+
+async def stream_today_fortune(
+        name: Optional[str] = None,
+        birthdate: Optional[str] = None,
+        interests: Optional[List[str]] = None,
+        sign: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    generate_today_fortune 의 스트리밍 버전. ("field", (필드명, 값)) 을 필드가 완성될 때마다,
+    마지막에 ("done", 전체 운세) 를 내보낸다. 전체 운세는 generate_today_fortune 결과와 같은 형태.
+    - 캐시/테이블에 있거나 같은 조합을 이미 누가 만들고 있으면 그 결과를 기다렸다가 모든 필드를 내보냄
+    - 아니면 모델 응답을 토큰 단위로 받으면서 증분 JSON 파싱 (이 생성이 single-flight 로 등록되어
+      동시에 들어온 같은 조합의 요청은 LLM 호출 1번을 공유), 끝나면 테이블/캐시에 저장
+    - 필드를 이미 내보낸 뒤 JSON 이 깨지면 FortuneParseError 를 올린다 (앞의 필드와 다른 fallback 을 done 으로 보내지 않음)
+    """
+    sign_key = canonical_sign(sign, birthdate)
+    interest_key = canonical_interests(interests)
+    key = fortune_profile_key(sign_key, interest_key)
+    fields: asyncio.Queue = asyncio.Queue()
+
+    async def _load() -> Dict[str, Any]:
+        date = kst_today()
+        stored = await asyncio.to_thread(_read_stored, date, key)
+        if stored is not None:
+            return stored
+        parser: Optional[JsonFieldStream] = JsonFieldStream()
+        raw: List[str] = []
+        deltas = llm_gateway.chat_stream(
+            FORTUNE_MODEL, _fortune_messages(sign_key, interest_key), temperature=0.7
+        )
+        async with aclosing(deltas):
+            async for delta in deltas:
+                raw.append(delta)
+                if parser is None:
+                    continue
+                try:
+                    completed = parser.feed(delta)
+                except ValueError:
+                    # JSON 이 깨졌으면 필드 단위 전송은 멈추고 끝에서 fallback
+                    parser = None
+                    continue
+                for completed_field in completed:
+                    fields.put_nowait(completed_field)
+        if parser is None or not parser.done or not _is_complete(parser.fields):
+            raise FortuneParseError(_fallback_fortune("".join(raw)))
+        await asyncio.to_thread(_store_live, date, key, sign_key, interest_key, parser.fields)
+        return parser.fields
+
+    load = asyncio.ensure_future(_daily_fortunes.aget_or_load(key, _load))
+    sent = set()
+    getter: Optional[asyncio.Future] = None
+    try:
+        # 이 요청이 생성을 맡았으면 필드가 완성되는 대로, 아니면 load 가 끝난 뒤 한꺼번에
+        while not (load.done() and fields.empty()):
+            if getter is None:
+                getter = asyncio.ensure_future(fields.get())
+            await asyncio.wait({getter, load}, return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                continue
+            field, value = getter.result()
+            getter = None
+            sent.add(field)
+            yield "field", (field, fill_name(value, name))
+
+        try:
+            template = load.result()
+        except FortuneParseError as e:
+            if sent:
+                raise
+            template = e.fallback
+    finally:
+        if getter is not None:
+            getter.cancel()
+        # 연결이 끊겨도 생성 자체는 (shield 로) 계속되어 캐시/테이블에 남는다
+        load.cancel()
+
+    for field, value in template.items():
+        if field not in sent:
+            yield "field", (field, fill_name(value, name))
+    yield "done", fill_name(template, name)
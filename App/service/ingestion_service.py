@@ -0,0 +1,193 @@
+# App/service/ingestion_service.py
+"""
+네이버 뉴스 주기 수집(ingestion) 루프.
+
+- 최근 실제로 조회된 상위 키워드(popularity_service)를 매 사이클 조회
+- 기본 키워드(ALL_KEYWORDS + 사용자들이 팔로우하는 키워드(Q2, Q1 카테고리 확장))는 INGEST_BASE_EVERY 사이클마다 조회
+  (조회 기록이 없을 때는 매 사이클). 읽기 API 는 저장소에 키워드가 있으면 네이버를 다시 부르지 않으므로
+  인기 목록에서 빠진 키워드도 저장소가 며칠씩 멈춰 있지 않게 낮은 주기로 계속 갱신한다
+- 결과를 articles / article_keywords 테이블에 upsert (url_hash 기준)
+- 이번 사이클에 처음 들어온 기사는 구독 사용자 인박스로 fan-out (fanout_service)
+- 앱 내부 루프에서는 사이클마다 구독 사용자 기본 피드를 배치 랭킹으로 미리 계산 (recommendService.precompute_feeds)
+- 읽기 API(/api/news/today, /api/news/personalized, 맞춤형 TTS)는 이 저장소에서 서빙하고
+  네이버 호출은 이 수집 경로에서만 일어나도록 하는 것이 목적
+
+실행 방법
+- 앱 내부: NEWS_INGEST_IN_APP=1 이면 startup 시 백그라운드 태스크로 실행
+  (워커가 여러 개면 워커마다 루프가 돌기 때문에 별도 프로세스 실행을 권장)
+- 별도 프로세스: python -m App.service.ingestion_service
+"""
+import asyncio
+import os
+from typing import Dict, List, Set, Tuple
+
+from App.ai_news.aiNews_service import Q1_CATEGORY_KEYWORDS
+from App.ai_news.recommendService import precompute_feeds
+from App.api.naverNewsAPI import fetch_naver_news_recent_async, reset_watermarks
+from App.core.database import SessionLocal
+from App.core.rate_limiter import PRIORITY_BACKGROUND
+from App.service.fanout_service import fan_out_new_articles, load_subscriptions
+from App.service.popularity_service import PREFETCH_TOP_N, prefetch_keywords
+from App.repository.articleRepo import ArticleRepository, url_hash_of
+from App.repository.naverNewsRepo import ALL_KEYWORDS
+from App.repository.preferenceRepo import PreferenceRepository
+
+INGEST_INTERVAL_SEC = int(os.getenv("NEWS_INGEST_INTERVAL_SEC", "300"))
+INGEST_DAYS = 7           # 수집 대상 기간 (/api/news/personalized 최대 days 와 맞춤)
+RETENTION_DAYS = 7        # 저장소 보관 기간
+INGEST_CONCURRENCY = 6
+INGEST_MAX_PAGES = 3      # 첫 수집 기준. 이후에는 워터마크 덕분에 보통 1페이지에서 멈춤
+INGEST_DISPLAY = 100
+INGEST_BASE_EVERY = int(os.getenv("NEWS_INGEST_BASE_EVERY", "6"))   # 기본 키워드 갱신 주기 (사이클 수, 기본 30분)
+
+
+def _dedup_keywords(keywords: List[str]) -> List[str]:
+    cleaned = [(kw or "").strip() for kw in keywords]
+    return list(dict.fromkeys(kw for kw in cleaned if kw))
+
+
+def collect_ingest_keywords(include_base: bool = True) -> List[str]:
+    """
+    수집(프리페치) 대상 키워드 (순서 유지, 중복 제거)
+    - 최근 실제 조회 상위 PREFETCH_TOP_N 개 (popularity_service), 자리가 남으면 팔로워 많은 Q2 키워드로 채움
+    - include_base 이거나 조회 기록이 아직 없으면(첫 기동 등) 기본 키워드 + 사용자 Q2 키워드 + Q1 카테고리 확장 키워드를 뒤에 붙임
+    """
+    try:
+        hot = prefetch_keywords(PREFETCH_TOP_N)
+    except Exception as e:
+        print(f"[Ingest] 인기 키워드 조회 실패: {e}")
+        hot = []
+
+    # 정규화 구독 테이블에서 DISTINCT / GROUP BY 로 읽음 (사용자 수와 무관하게 키워드 수만큼)
+    db = SessionLocal()
+    try:
+        repo = PreferenceRepository(db)
+        keywords: List[str] = []
+        if hot:
+            popular = [kw for kw, _ in repo.keyword_follower_counts(limit=PREFETCH_TOP_N)]
+            keywords = _dedup_keywords(hot + popular)[:PREFETCH_TOP_N]
+            if not include_base:
+                return keywords
+        category_ids = repo.get_followed_categories()
+        followed = repo.get_followed_keywords()
+    finally:
+        db.close()
+
+    keywords.extend(ALL_KEYWORDS)
+    for cid in category_ids:
+        keywords.extend(Q1_CATEGORY_KEYWORDS.get(cid, []))
+    keywords.extend(followed)
+    return _dedup_keywords(keywords)
+
+
+def _store(results: Dict[str, List[Dict]]) -> int:
+    db = SessionLocal()
+    try:
+        repo = ArticleRepository(db)
+
+        # url_hash -> (기사, 수집 키워드들): upsert 전에 새 기사만 골라 둔다
+        batch: Dict[str, Tuple[Dict, Set[str]]] = {}
+        for kw, rows in results.items():
+            for row in rows:
+                h = url_hash_of(row)
+                if h:
+                    batch.setdefault(h, (row, set()))[1].add(kw)
+        existing = repo.existing_hashes(batch)
+        new_articles = {h: v for h, v in batch.items() if h not in existing}
+
+        total = 0
+        for kw, rows in results.items():
+            total += repo.upsert_articles(kw, rows)
+        repo.purge_older_than(RETENTION_DAYS)
+
+        try:
+            fanned = fan_out_new_articles(db, new_articles)
+            print(f"[Ingest] 새 기사 {len(new_articles)}건 -> 인박스 {fanned}건")
+        except Exception as e:
+            # fan-out 실패가 수집 자체를 실패로 만들지는 않도록
+            db.rollback()
+            print(f"[Ingest] 인박스 fan-out 실패: {e}")
+        return total
+    finally:
+        db.close()
+
+
+async def ingest_once(include_base: bool = True) -> int:
+    """
+    수집 1회. 반환값: upsert 한 (키워드, 기사) 건수
+    """
+    keywords = await asyncio.to_thread(collect_ingest_keywords, include_base)
+    semaphore = asyncio.Semaphore(INGEST_CONCURRENCY)
+
+    async def _fetch(kw: str):
+        async with semaphore:
+            try:
+                rows = await fetch_naver_news_recent_async(
+                    kw,
+                    days=INGEST_DAYS,
+                    max_pages=INGEST_MAX_PAGES,
+                    display=INGEST_DISPLAY,
+                    priority=PRIORITY_BACKGROUND,
+                    incremental=True,
+                )
+            except Exception as e:
+                print(f"[Ingest] '{kw}' 수집 실패: {e}")
+                rows = []
+            return kw, rows
+
+    pairs = await asyncio.gather(*(_fetch(kw) for kw in keywords))
+    results = {kw: rows for kw, rows in pairs if rows}
+
+    try:
+        stored = await asyncio.to_thread(_store, results)
+    except Exception:
+        # 저장 실패 시 워터마크를 되돌려서 다음 사이클에 전체 구간을 다시 수집
+        reset_watermarks()
+        raise
+    print(f"[Ingest] 키워드 {len(keywords)}개, 기사 {stored}건 upsert")
+    return stored
+
+
+def _precompute_feeds() -> int:
+    """
+    피드 캐시(feed_cache)는 프로세스 메모리라서 앱 안 수집 루프에서만 의미가 있다
+    """
+    db = SessionLocal()
+    try:
+        warmed = precompute_feeds(db, load_subscriptions(db))
+        print(f"[Ingest] 피드 사전 계산 {warmed}명")
+        return warmed
+    finally:
+        db.close()
+
+
+async def run_ingestion_loop(interval_sec: int = INGEST_INTERVAL_SEC) -> None:
+    cycle = 0
+    while True:
+        try:
+            await ingest_once(include_base=cycle % INGEST_BASE_EVERY == 0)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Ingest] 수집 루프 에러: {e}")
+        try:
+            await asyncio.to_thread(_precompute_feeds)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Ingest] 피드 사전 계산 실패: {e}")
+        cycle += 1
+        await asyncio.sleep(interval_sec)
+
+
+def ingestion_enabled_in_app() -> bool:
+    return os.getenv("NEWS_INGEST_IN_APP", "0") == "1"
+
+
+if __name__ == "__main__":
+    from App.core.database import engine
+    from App.db import models as db_models
+    from App.user import password_reset  # noqa: F401  (User.reset_tokens 관계 매핑용)
+
+    db_models.Base.metadata.create_all(bind=engine)
+    asyncio.run(run_ingestion_loop())
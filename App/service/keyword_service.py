@@ -1,25 +1,35 @@
-from typing import List, Optional, Sequence
-import random
-import os
+import asyncio
+import hashlib
 import json
+import os
 import random
 from typing import List, Optional, Sequence
-from openai import OpenAI
-from datetime import datetime
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-today = datetime.now().strftime("%Y-%m-%d")
+from App.core.cache import DailyCache
+from App.core.llm_gateway import llm_gateway
+from App.core.rate_limiter import kst_today
+from App.service.trending_service import trending_engine
+
+KEYWORD_MODEL = "gpt-4.1-mini"   # 프로젝트에서 쓰는 모델 이름에 맞춰 바꿔도 됨
+TODAY_KEYWORDS_SIZE = 6          # 오늘의 키워드 개수 (profile_key 에도 들어감: 배치/라이브/캐시가 같은 값을 써야 함)
+
+# (KST 날짜, 프로필 해시) -> 오늘의 키워드. 같은 프로필 사용자는 하루에 LLM 호출 1번을 공유
+_daily_keywords = DailyCache(maxsize=int(os.getenv("TODAY_KEYWORDS_CACHE_SIZE", "10000")))
 
-def ai_generate_keywords_with_openai(
+async def ai_generate_keywords_with_openai(
     q1_categories: List[int],
     q2_keywords: List[str],
     q3_excluded: List[str],
     target_size: int = 6,
+    trending: Optional[Sequence[str]] = None,
 ) -> List[str]:
     """
     OpenAI API를 사용해서 Q1/Q2/Q3 기반 오늘의 키워드 추천.
     JSON 배열 형태로만 받도록 프롬프트 강제.
+    trending: 수집 기사에서 뽑은 오늘의 트렌드 키워드 (있으면 참고 자료로 전달)
     """
+    # 워커가 오래 떠 있어도 날짜가 바뀌도록 호출할 때마다 계산 (KST)
+    today = kst_today()
 
     prompt = f"""
 오늘 날짜: {today}
@@ -32,6 +42,8 @@ def ai_generate_keywords_with_openai(
 - Q2 선호 키워드: {q2_keywords}
 - Q3 제외(보기 싫은) 키워드: {q3_excluded}
 
+최근 24시간 수집된 뉴스 제목에서 평소보다 많이 등장한 키워드(참고용): {list(trending or [])}
+
 요구사항:
 
 1. 사용자의 Q1, Q2를 바탕으로 오늘 읽으면 좋을 경제/투자 관련 주요 키워드 {target_size}개를 추천해.
@@ -52,10 +64,7 @@ def ai_generate_keywords_with_openai(
 """
 
     try:
-        response = client.responses.create(
-            model="gpt-4.1-mini",   # 프로젝트에서 쓰는 모델 이름에 맞춰 바꿔도 됨
-            input=prompt,
-        )
+        response = await llm_gateway.respond(KEYWORD_MODEL, prompt)
 
         # responses API 구조에서 텍스트 꺼내기
         text = response.output[0].content[0].text.strip()
@@ -91,8 +100,12 @@ CATEGORY_KEYWORDS_BY_ID = {
     8: ["거시경제", "통화정책", "재정정책", "경기침체", "인플레이션"], # 거시·정책
 }
 
+# 트렌드 키워드가 이 개수 이상이면 LLM 없이 규칙 기반으로 오늘의 키워드를 만든다
+TRENDING_MIN_FOR_LOCAL = 3
+
 # 전체 fallback 풀 (부족할 때 채우는 용도)
-GLOBAL_KEYWORDS_POOL = list({
+# (set 순서는 프로세스마다 달라서, 시드 고정 랜덤 결과가 같도록 정렬해 둔다)
+GLOBAL_KEYWORDS_POOL = sorted({
     kw for kws in CATEGORY_KEYWORDS_BY_ID.values() for kw in kws
 })
 
@@ -101,24 +114,36 @@ def rule_based_recommend(
     q2_keywords: Optional[Sequence[str]],
     q3_keywords: Optional[Sequence[str]],
     target_size: int = 6,
+    trending: Optional[Sequence[str]] = None,
+    rng: Optional[random.Random] = None,
 ) -> List[str]:
+    """
+    rng: 랜덤 선택에 쓸 난수 생성기. 같은 시드를 주면 결과가 같아서 캐시할 수 있다.
+    """
+    rng = rng or random.Random()
+
     # None 방어
     q1_categories = list(q1_categories or [])
     q2_keywords   = list(q2_keywords   or [])
     q3_keywords   = list(q3_keywords   or [])
+    trending      = list(trending      or [])
 
     result: List[str] = []
 
     # 1) Q2: 사용자가 직접 적은 키워드 최우선
     result.extend(q2_keywords)
 
+    # 1-1) 오늘의 트렌드 키워드로 절반 정도 채우기 (나머지 자리는 Q1 카테고리 몫)
+    trend_slots = max(0, (target_size + 1) // 2 - len(result))
+    result.extend(trending[:trend_slots])
+
     # 2) Q1: 선택한 카테고리별 대표 키워드 랜덤 추가
     for cat_id in q1_categories:
         if cat_id in CATEGORY_KEYWORDS_BY_ID:
             candidates = CATEGORY_KEYWORDS_BY_ID[cat_id]
             # 너무 많이 뽑지 말고 1~2개 정도
             k = 2 if len(candidates) >= 2 else 1
-            sampled = random.sample(candidates, k=k)
+            sampled = rng.sample(candidates, k=k)
             result.extend(sampled)
 
     # 3) 중복 제거 (순서 유지)
@@ -127,36 +152,61 @@ def rule_based_recommend(
     # 4) Q3: 제외 키워드 제거
     result = [kw for kw in result if kw not in q3_keywords]
 
-    # 5) 아직 target_size 개수보다 적으면, 글로벌 풀에서 채우기
+    # 5) 아직 target_size 개수보다 적으면, 남은 트렌드 키워드 -> 글로벌 풀 순서로 채우기
+    for kw in trending:
+        if len(result) >= target_size:
+            break
+        if kw not in result and kw not in q3_keywords:
+            result.append(kw)
+
     if len(result) < target_size:
         # 이미 사용/제외된 키워드 빼고 후보 생성
         candidates = [
             kw for kw in GLOBAL_KEYWORDS_POOL
             if kw not in result and kw not in q3_keywords
         ]
-        random.shuffle(candidates)
+        rng.shuffle(candidates)
         need = target_size - len(result)
         result.extend(candidates[:need])
 
     # 6) 최종적으로 딱 target_size개만 반환
     return result[:target_size]
 
-def generate_today_keywords(
+async def _generate_today_keywords(
     q1_categories: Optional[Sequence[int]],
     q2_keywords: Optional[Sequence[str]],
     q3_keywords: Optional[Sequence[str]],
-    target_size: int = 6,
+    target_size: int,
+    rng: random.Random,
 ) -> List[str]:
-    q1_categories = list(q1_categories or [])
-    q2_keywords   = list(q2_keywords   or [])
-    q3_keywords   = list(q3_keywords   or [])
 
-    # 1) OpenAI로 먼저 시도
-    ai_result = ai_generate_keywords_with_openai(
+    # 0) 수집 기사 제목에서 뽑은 트렌드 키워드 (사용자 관심사와 관련된 것 우선)
+    related = q2_keywords + [
+        kw for cid in q1_categories for kw in CATEGORY_KEYWORDS_BY_ID.get(cid, [])
+    ]
+    # (트렌드 재계산 시 DB 조회가 있어서 스레드에서 실행)
+    trending = await asyncio.to_thread(
+        trending_engine.top, target_size * 2, q3_keywords, related
+    )
+
+    # 트렌드 키워드가 충분하면 LLM 호출 없이 규칙 기반으로 바로 구성
+    if len(trending) >= TRENDING_MIN_FOR_LOCAL:
+        return rule_based_recommend(
+            q1_categories=q1_categories,
+            q2_keywords=q2_keywords,
+            q3_keywords=q3_keywords,
+            target_size=target_size,
+            trending=trending,
+            rng=rng,
+        )
+
+    # 1) OpenAI로 시도
+    ai_result = await ai_generate_keywords_with_openai(
         q1_categories=q1_categories,
         q2_keywords=q2_keywords,
         q3_excluded=q3_keywords,
         target_size=target_size,
+        trending=trending,
     )
 
     if len(ai_result) >= target_size:
@@ -169,5 +219,52 @@ def generate_today_keywords(
         q2_keywords=q2_keywords,
         q3_keywords=q3_keywords,
         target_size=target_size,
+        trending=trending,
+        rng=rng,
+    )
+
+
+def profile_key(
+    q1_categories: Sequence[int],
+    q2_keywords: Sequence[str],
+    q3_keywords: Sequence[str],
+    target_size: int,
+) -> str:
+    """
+    Q1/Q2/Q3 를 정렬/중복 제거한 정규 형태의 해시 (입력 순서가 달라도 같은 프로필이면 같은 키)
+    """
+    canonical = json.dumps(
+        [
+            sorted({int(c) for c in q1_categories if str(c).lstrip("-").isdigit()}),
+            sorted({str(k).strip() for k in q2_keywords if str(k).strip()}),
+            sorted({str(k).strip() for k in q3_keywords if str(k).strip()}),
+            target_size,
+        ],
+        ensure_ascii=False,
     )
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+async def generate_today_keywords(
+    q1_categories: Optional[Sequence[int]],
+    q2_keywords: Optional[Sequence[str]],
+    q3_keywords: Optional[Sequence[str]],
+    target_size: int = TODAY_KEYWORDS_SIZE,
+) -> List[str]:
+    """
+    (KST 날짜, 프로필 해시) 단위로 하루 동안 캐시. 날짜가 바뀌면 캐시가 비워진다.
+    규칙 기반 랜덤도 같은 키로 시드를 고정해서, 같은 날 같은 프로필이면 결과가 같다.
+    """
+    q1_categories = list(q1_categories or [])
+    q2_keywords   = list(q2_keywords   or [])
+    q3_keywords   = list(q3_keywords   or [])
+
+    key = profile_key(q1_categories, q2_keywords, q3_keywords, target_size)
+
+    async def _load() -> List[str]:
+        rng = random.Random(f"{kst_today()}:{key}")
+        return await _generate_today_keywords(
+            q1_categories, q2_keywords, q3_keywords, target_size, rng
+        )
 
+    return list(await _daily_keywords.aget_or_load(key, _load))
@@ -0,0 +1,247 @@
+# App/service/market_snapshot.py
+"""
+KOSPI/KOSDAQ 전 종목 일일 스냅샷 (야간 배치 + 스크리너).
+
+배치 (python -m App.service.market_snapshot, 장 마감 후 하루 한 번):
+1) 종목 마스터의 KOSPI/KOSDAQ 보통주 전체를 price_store 로 동기화 (이미 받은 날짜는 건너뜀)
+2) 최근 SNAPSHOT_LOOKBACK 거래일 종가/거래량을 (날짜 x 종목) 행렬 하나로 모음 (거래정지일은 직전 종가로 채움)
+3) 행렬 연산 한 번씩으로 전 종목 지표 계산
+    - return_5d / return_14d / return_60d : N 거래일 수익률
+    - volatility_20d : 최근 20 거래일 일간 로그수익률 표준편차 (연율화)
+    - ma5 / ma20 / ma60, golden_cross / dead_cross (오늘 ma5 가 ma20 을 위/아래로 돌파), above_ma60
+    - volume_spike : 오늘 거래량 / 직전 20 거래일 평균 거래량
+4) 종목별 지표 열(column)만 SNAPSHOT_PATH(npz)에 저장
+
+API 프로세스는 파일이 바뀌었을 때만 다시 읽고(snapshot_store.current()), 스크리너 필터/정렬도 열 단위 마스크/argsort 로 처리.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from App.core.rate_limiter import kst_today
+from App.service.price_store import price_store
+from App.service.symbol_master import is_preferred, symbol_master
+
+SNAPSHOT_PATH = os.getenv("MARKET_SNAPSHOT_PATH", "/tmp/market_snapshot.npz")
+SNAPSHOT_LOOKBACK = 90          # 거래일 (60일 수익률 + 이동평균 전날 값 계산에 충분하게)
+SNAPSHOT_MARKETS = ("KOSPI", "KOSDAQ", "KOSDAQ GLOBAL")
+TRADING_DAYS_PER_YEAR = 252
+
+# 스크리너로 필터/정렬할 수 있는 숫자 열
+NUMERIC_COLUMNS = (
+    "close", "marcap", "return_5d", "return_14d", "return_60d",
+    "volatility_20d", "ma5", "ma20", "ma60", "volume_spike",
+)
+FLAG_COLUMNS = ("golden_cross", "dead_cross", "above_ma60")
+TEXT_COLUMNS = ("code", "name", "market", "sector")
+
+
+def build_matrix(codes: Sequence[str], lookback: int = SNAPSHOT_LOOKBACK) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    종목 목록 -> (날짜 [T], 종가 [T x N], 거래량 [T x N]). 없는 값은 NaN (종가는 직전 값으로 채움)
+    """
+    series = [price_store.load(code) for code in codes]
+    non_empty = [s["date"][-lookback:] for s in series if len(s)]
+    if not non_empty:
+        return np.empty(0, dtype="datetime64[D]"), np.empty((0, len(codes))), np.empty((0, len(codes)))
+    dates = np.unique(np.concatenate(non_empty))[-lookback:]
+
+    T, N = len(dates), len(codes)
+    close = np.full((T, N), np.nan)
+    volume = np.full((T, N), np.nan)
+    for j, s in enumerate(series):
+        if not len(s):
+            continue
+        s = s[np.searchsorted(s["date"], dates[0]):]
+        rows = np.searchsorted(dates, s["date"])
+        valid = rows < T
+        valid[valid] = dates[rows[valid]] == s["date"][valid]
+        close[rows[valid], j] = s["close"][valid]
+        volume[rows[valid], j] = s["volume"][valid]
+
+    # 거래정지 등으로 빈 날은 직전 종가로 채움 (상장 전 구간은 NaN 유지)
+    filled = np.where(np.isnan(close), 0, np.arange(T)[:, None])
+    np.maximum.accumulate(filled, axis=0, out=filled)
+    close = close[filled, np.arange(N)]
+    return dates, close, volume
+
+
+def compute_metrics(close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    (날짜 x 종목) 행렬 -> 종목별 지표 열. 기간이 모자란 종목은 NaN / False
+    """
+    T = close.shape[0]
+    n = close.shape[1]
+    nan_col = np.full(n, np.nan)
+
+    def _ret(k: int) -> np.ndarray:
+        return close[-1] / close[-1 - k] - 1 if T > k else nan_col
+
+    def _ma(w: int, shift: int = 0) -> np.ndarray:
+        end = T - shift
+        return close[end - w:end].mean(axis=0) if end >= w else nan_col
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_ret = np.diff(np.log(close[-21:]), axis=0)
+        volatility = (
+            log_ret.std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR) if log_ret.shape[0] >= 2 else nan_col
+        )
+        ma5, ma20, ma60 = _ma(5), _ma(20), _ma(60)
+        ma5_prev, ma20_prev = _ma(5, 1), _ma(20, 1)
+        past_volume = volume[-21:-1]
+        avg_volume = np.nansum(past_volume, axis=0) / (~np.isnan(past_volume)).sum(axis=0)
+        volume_spike = np.where(avg_volume > 0, volume[-1] / avg_volume, np.nan) if T else nan_col
+
+        return {
+            "close": close[-1] if T else nan_col,
+            "return_5d": _ret(5),
+            "return_14d": _ret(14),
+            "return_60d": _ret(60),
+            "volatility_20d": volatility,
+            "ma5": ma5,
+            "ma20": ma20,
+            "ma60": ma60,
+            "golden_cross": (ma5 > ma20) & (ma5_prev <= ma20_prev),
+            "dead_cross": (ma5 < ma20) & (ma5_prev >= ma20_prev),
+            "above_ma60": close[-1] > ma60 if T else np.zeros(n, dtype=bool),
+            "volume_spike": volume_spike,
+        }
+
+
+class MarketSnapshot:
+    def __init__(self, as_of: str, columns: Dict[str, np.ndarray]):
+        self.as_of = as_of
+        self.columns = columns
+        self._row: Dict[str, int] = {code: i for i, code in enumerate(columns["code"])}
+
+    def __len__(self) -> int:
+        return len(self.columns["code"])
+
+    def row(self, code: str) -> Optional[Dict]:
+        i = self._row.get(code)
+        return self._record(i) if i is not None else None
+
+    def _record(self, i: int) -> Dict:
+        record: Dict = {c: str(self.columns[c][i]) for c in TEXT_COLUMNS}
+        for c in NUMERIC_COLUMNS:
+            v = float(self.columns[c][i])
+            record[c] = None if np.isnan(v) else round(v, 6)
+        for c in FLAG_COLUMNS:
+            record[c] = bool(self.columns[c][i])
+        return record
+
+    def screen(
+        self,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        flags: Optional[Dict[str, bool]] = None,
+        market: Optional[str] = None,
+        sector: Optional[str] = None,
+        sort: str = "return_14d",
+        descending: bool = True,
+        limit: int = 20,
+    ) -> Tuple[int, List[Dict]]:
+        """
+        ranges: {열: (최소, 최대)}, flags: {열: True/False}. 정렬 열이 NaN 인 종목은 뒤로.
+        반환값: (조건에 맞는 종목 수, 상위 limit 개)
+        """
+        cols = self.columns
+        mask = np.ones(len(self), dtype=bool)
+        for col, (lo, hi) in (ranges or {}).items():
+            values = cols[col]
+            if lo is not None:
+                mask &= values >= lo
+            if hi is not None:
+                mask &= values <= hi
+        for col, wanted in (flags or {}).items():
+            mask &= cols[col] == wanted
+        if market:
+            mask &= cols["market"] == market
+        if sector:
+            mask &= np.char.find(cols["sector"].astype(str), sector) >= 0
+
+        idx = np.flatnonzero(mask)
+        key = cols[sort][idx].astype(float)
+        key = np.where(np.isnan(key), -np.inf if descending else np.inf, key)
+        order = np.argsort(-key if descending else key, kind="stable")
+        return len(idx), [self._record(i) for i in idx[order[:limit]]]
+
+
+def build_snapshot(codes: Sequence[str], as_of: str) -> MarketSnapshot:
+    _, close, volume = build_matrix(codes)
+    metrics = compute_metrics(close, volume)
+    symbols = [symbol_master.get(code) for code in codes]
+    columns = {
+        "code": np.array(codes, dtype="U6"),
+        "name": np.array([s.name if s else "" for s in symbols]),
+        "market": np.array([s.market if s else "" for s in symbols]),
+        "sector": np.array([s.sector if s else "" for s in symbols]),
+        "marcap": np.array([s.marcap if s else np.nan for s in symbols], dtype=float),
+        **metrics,
+    }
+    return MarketSnapshot(as_of, columns)
+
+
+def universe() -> List[str]:
+    symbol_master.ensure_fresh()
+    return [
+        s.code for s in symbol_master.by_code.values()
+        if s.market in SNAPSHOT_MARKETS and not is_preferred(s.name)
+    ]
+
+
+class SnapshotStore:
+    """
+    SNAPSHOT_PATH 파일 <-> MarketSnapshot. 파일 mtime 이 바뀌었을 때만 다시 읽는다
+    """
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        self._snapshot: Optional[MarketSnapshot] = None
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def save(self, snapshot: MarketSnapshot) -> None:
+        tmp = f"{self.path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, as_of=np.array(snapshot.as_of), **snapshot.columns)
+        os.replace(tmp, self.path)
+
+    def current(self) -> Optional[MarketSnapshot]:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return self._snapshot
+        if mtime == self._mtime:
+            return self._snapshot
+        with self._lock:
+            if mtime != self._mtime:
+                with np.load(self.path) as data:
+                    columns = {k: data[k] for k in data.files if k != "as_of"}
+                    self._snapshot = MarketSnapshot(str(data["as_of"]), columns)
+                self._mtime = mtime
+        return self._snapshot
+
+
+snapshot_store = SnapshotStore()
+
+
+def run_market_snapshot() -> int:
+    """
+    반환값: 스냅샷에 들어간 종목 수
+    """
+    started = time.monotonic()
+    codes = universe()
+    total, failed = price_store.sync_many(codes)
+    snapshot = build_snapshot(codes, kst_today())
+    snapshot_store.save(snapshot)
+    print(
+        f"[MarketSnapshot] {snapshot.as_of}: {len(snapshot)}종목 (일봉 수집 실패 {failed}/{total}) "
+        f"({time.monotonic() - started:.1f}s)"
+    )
+    return len(snapshot)
+
+
+if __name__ == "__main__":
+    run_market_snapshot()
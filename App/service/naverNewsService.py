@@ -1,4 +1,7 @@
-from App.repository.naverNewsRepo import get_today_news
+from App.repository.naverNewsRepo import ALL_KEYWORDS, get_today_news
+from App.service.popularity_service import record_keywords
 
-def get_today_economy_news():
-    return get_today_news()
\ No newline at end of file
+async def get_today_economy_news():
+    # 오늘의 뉴스가 조회되는 동안은 기본 키워드들이 수집 대상(인기 키워드)에 유지되도록 기록
+    record_keywords(ALL_KEYWORDS)
+    return await get_today_news()
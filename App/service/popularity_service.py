@@ -0,0 +1,77 @@
+# App/service/popularity_service.py
+"""
+키워드 인기도 추적 + 프리페치 대상 선정.
+
+- 뉴스/TTS 요청 경로에서 실제로 조회된 키워드를 record_keywords 로 기록
+  (프로세스 로컬 SlidingTopK: count-min sketch + top-k, 최근 1시간 윈도우)
+- API 프로세스는 POPULARITY_FLUSH_SEC 마다 상위 키워드 스냅샷을 keyword_popularity 테이블에 덮어씀
+- 수집 루프(별도 프로세스여도 됨)는 prefetch_keywords 로 최근 스냅샷을 합산한
+  상위 PREFETCH_TOP_N 개를 수집 대상으로 쓴다. 조회가 끊긴 키워드는 윈도우가 지나면 자연히 빠진다.
+"""
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Iterable, List
+
+from App.core.database import SessionLocal
+from App.core.popularity import SlidingTopK
+from App.repository.popularityRepo import PopularityRepository
+
+POPULARITY_WINDOW_SEC = int(os.getenv("POPULARITY_WINDOW_SEC", "3600"))
+POPULARITY_FLUSH_SEC = int(os.getenv("POPULARITY_FLUSH_SEC", "60"))
+POPULARITY_TRACK_TOP = 200    # 프로세스당 스냅샷에 올리는 키워드 수
+PREFETCH_TOP_N = int(os.getenv("PREFETCH_TOP_N", "60"))
+
+_SOURCE = f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+popularity_tracker = SlidingTopK(window_sec=POPULARITY_WINDOW_SEC)
+
+
+def record_keywords(keywords: Iterable[str]) -> None:
+    """
+    요청 경로에서 호출. 키워드당 해시 몇 번 + 카운터 증가 정도라 요청 지연에 영향 없음
+    """
+    for kw in keywords:
+        kw = (kw or "").strip()
+        if kw:
+            popularity_tracker.add(kw)
+
+
+def flush_popularity() -> int:
+    top = popularity_tracker.top(POPULARITY_TRACK_TOP)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        repo = PopularityRepository(db)
+        repo.replace_snapshot(_SOURCE, top, now)
+        # 죽은 프로세스가 남긴 스냅샷 정리
+        repo.purge_older_than(now - timedelta(seconds=POPULARITY_WINDOW_SEC))
+    finally:
+        db.close()
+    return len(top)
+
+
+async def run_popularity_flush_loop(interval_sec: int = POPULARITY_FLUSH_SEC) -> None:
+    while True:
+        await asyncio.sleep(interval_sec)
+        try:
+            await asyncio.to_thread(flush_popularity)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Popularity] 스냅샷 저장 실패: {e}")
+
+
+def prefetch_keywords(limit: int = PREFETCH_TOP_N) -> List[str]:
+    """
+    최근 스냅샷(플러시 주기 몇 번 안에 갱신된 것)을 합산한 상위 키워드.
+    아직 트래픽 기록이 없으면 빈 목록.
+    """
+    since = datetime.utcnow() - timedelta(seconds=max(POPULARITY_FLUSH_SEC * 3, 300))
+    db = SessionLocal()
+    try:
+        rows = PopularityRepository(db).hot_keywords(since, limit)
+    finally:
+        db.close()
+    return [kw for kw, _ in rows]
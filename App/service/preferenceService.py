@@ -9,6 +9,9 @@ from App.schemas.preference import (
     Q3AnswerResponse,
     OnboardingStatus
 )
+from App.ai_news.feed_cache import feed_cache
+from App.core.rate_limiter import kst_today
+from App.repository.dailyKeywordRepo import DailyKeywordRepository
 from App.repository.preferenceRepo import PreferenceRepository
 
 # 고정된 Q1 카테고리 목록
@@ -67,6 +70,15 @@ class PreferenceService:
     def __init__(self, repo: PreferenceRepository):
         self.repo = repo
 
+    def _before_profile_change(self, user_id: int) -> None:
+        # 미리 생성해 둔 오늘의 키워드는 이전 취향 기준이므로 삭제 (다음 조회 때 새로 생성)
+        # commit 은 이어지는 repo.save_q* 에서 같이 됨
+        DailyKeywordRepository(self.repo.db).delete_for_user(user_id, kst_today())
+
+    def _after_profile_change(self, user_id: int) -> None:
+        # 취향이 바뀌었으니 캐시된 맞춤 피드 폐기
+        feed_cache.invalidate_user(user_id)
+
     #Q1 카테고리 전체 반환
     def get_q1_categories(self) -> List[Category]:
         # 지금은 하드코딩된 리스트를 바로 반환
@@ -84,7 +96,9 @@ class PreferenceService:
         selected = [c for c in Q1_CATEGORIES if c.id in filtered_ids]
 
         # 나중에 DB 저장하는 부분
+        self._before_profile_change(user_id)
         self.repo.save_q1_selection(user_id, selected_ids=filtered_ids)
+        self._after_profile_change(user_id)
 
         return Q1AnswerResponse(selected_categories=selected)
 
@@ -100,7 +114,9 @@ class PreferenceService:
         # 개수 제한 (예: 최대 10개)
         limited = unique[:10]
 
+        self._before_profile_change(user_id)
         self.repo.save_q2_keywords(user_id=user_id, keywords=limited)
+        self._after_profile_change(user_id)
         return Q2AnswerResponse(keywords=limited)
 
     # ---------- Q3: 제외 키워드 ----------
@@ -112,7 +128,9 @@ class PreferenceService:
                 unique.append(kw)
         limited = unique[:10]
 
+        self._before_profile_change(user_id)
         self.repo.save_q3_exclude_keywords(user_id=user_id, exclude_keywords=limited)
+        self._after_profile_change(user_id)
         return Q3AnswerResponse(exclude_keywords=limited)
 
     # ---------- 온보딩 상태 ----------
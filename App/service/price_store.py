@@ -0,0 +1,260 @@
+# App/service/price_store.py
+"""
+종목별 일봉(OHLCV) 디스크 캐시.
+
+- 종목마다 PRICE_STORE_DIR/{code}.npy 하나 (날짜순 정렬된 structured array: date, open, high, low, close, volume)
+  읽을 때는 np.load(mmap_mode="r") 로 메모리 매핑, 기간 조회는 날짜 열 searchsorted 두 번
+- sync(code): 저장된 마지막 날짜부터 오늘까지만 fdr.DataReader 로 받아서 이어 붙임
+  (마지막 날은 장중에 받은 미완성 봉일 수 있어서 다시 받아 덮어씀). {code}.synced 에 받은 시각(KST)을 기록하고,
+  장 마감(MARKET_CLOSE_KST) 뒤에 받은 날만 그날 완료로 보고 건너뜀 (장중에 받았으면 다음 sync 때 다시 받음)
+- 요청 경로(window)는 디스크만 본다. 없는 종목이면 빈 결과를 주고 백그라운드 스레드에 sync 를 예약
+- 워밍업: 주제별 대표 종목 + 시가총액 상위 PRICE_WARM_TOP_N 개를 미리 sync
+    python -m App.service.price_store        (cron, 장 마감 후 하루 한 번)
+    앱 안에서도 PRICE_SYNC_INTERVAL_SEC 마다 실행 (기본 켜짐, 별도 cron 만 쓸 때는 PRICE_SYNC_IN_APP=0)
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
+import FinanceDataReader as fdr
+import numpy as np
+
+from App.core.rate_limiter import KST, kst_today
+from App.service.symbol_master import TOPIC_TICKERS, symbol_master
+
+PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR", "/tmp/price_store")
+PRICE_HISTORY_DAYS = int(os.getenv("PRICE_HISTORY_DAYS", "400"))   # 처음 받을 때 가져오는 기간
+PRICE_WARM_TOP_N = int(os.getenv("PRICE_WARM_TOP_N", "200"))
+PRICE_SYNC_INTERVAL_SEC = int(os.getenv("PRICE_SYNC_INTERVAL_SEC", "3600"))
+PRICE_SYNC_WORKERS = 4
+PRICE_OPEN_FILES = 512   # 메모리 매핑해 두는 종목 수 (LRU)
+PRICE_RETRY_AFTER_SEC = 600   # 백그라운드 수집에 실패한 종목을 다시 시도하기까지 대기
+MARKET_CLOSE_KST = "15:40"    # 이 시각 이후에 받은 일봉이면 그날 봉이 확정된 것으로 봄 (장 마감 15:30 + 여유)
+
+OHLCV_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+
+def _to_records(df) -> np.ndarray:
+    """
+    fdr.DataReader 결과(DataFrame, DatetimeIndex) -> OHLCV_DTYPE 배열
+    """
+    if df is None or df.empty:
+        return np.empty(0, dtype=OHLCV_DTYPE)
+    out = np.empty(len(df), dtype=OHLCV_DTYPE)
+    out["date"] = df.index.values.astype("datetime64[D]")
+    for col in ("Open", "High", "Low", "Close", "Volume"):
+        out[col.lower()] = df[col].to_numpy(dtype="f8") if col in df else np.nan
+    return out
+
+
+def _merge(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """
+    날짜 기준 합치기. 같은 날짜는 새로 받은 값이 이김
+    """
+    if not len(old):
+        merged = new
+    elif not len(new):
+        return old
+    else:
+        merged = np.concatenate([old[old["date"] < new["date"].min()], new])
+    merged = np.sort(merged, order="date", kind="stable")
+    # 새로 받은 구간 안 중복 날짜 제거 (마지막 값 유지)
+    keep = np.ones(len(merged), dtype=bool)
+    keep[:-1] = merged["date"][1:] != merged["date"][:-1]
+    return merged[keep]
+
+
+class PriceStore:
+    def __init__(self, root: str = PRICE_STORE_DIR, max_open: int = PRICE_OPEN_FILES):
+        self.root = root
+        self.max_open = max_open
+        # code -> (파일 mtime, 메모리 매핑 배열)
+        self._open: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sync_locks: dict = {}
+        self._pending: Set[str] = set()
+        self._failed_at: dict = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _path(self, code: str) -> str:
+        return os.path.join(self.root, f"{code}.npy")
+
+    def _marker(self, code: str) -> str:
+        return os.path.join(self.root, f"{code}.synced")
+
+    # ---------- 읽기 (요청 경로: 네트워크 X) ----------
+    def load(self, code: str) -> np.ndarray:
+        """
+        종목 전체 일봉 (없으면 빈 배열). 파일이 바뀌었으면(mtime) 다시 매핑
+        """
+        path = self._path(code)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return np.empty(0, dtype=OHLCV_DTYPE)
+        with self._lock:
+            entry = self._open.get(code)
+            if entry is not None and entry[0] == mtime:
+                self._open.move_to_end(code)
+                return entry[1]
+        arr = np.load(path, mmap_mode="r")
+        with self._lock:
+            self._open[code] = (mtime, arr)
+            self._open.move_to_end(code)
+            while len(self._open) > self.max_open:
+                self._open.popitem(last=False)
+        return arr
+
+    def window(self, code: str, start: date, end: date) -> np.ndarray:
+        """
+        [start, end] 구간 일봉. 저장된 게 없으면 빈 배열을 주고 백그라운드 sync 예약
+        """
+        arr = self.load(code)
+        if not len(arr):
+            self.request_sync(code)
+            return arr
+        dates = arr["date"]
+        lo = np.searchsorted(dates, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(dates, np.datetime64(end, "D"), side="right")
+        return arr[lo:hi]
+
+    # ---------- 쓰기 (배치 / 백그라운드) ----------
+    def synced_at(self, code: str) -> Optional[str]:
+        """
+        마지막으로 받은 시각 "YYYY-MM-DDTHH:MM" (KST, 없으면 None)
+        """
+        try:
+            with open(self._marker(code), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def is_complete(self, code: str, today: str) -> bool:
+        """
+        today 장 마감 뒤에 받았는지 (그날 봉까지 확정)
+        """
+        synced = self.synced_at(code)
+        return synced is not None and synced >= f"{today}T{MARKET_CLOSE_KST}"
+
+    def sync(self, code: str, today: Optional[str] = None) -> int:
+        """
+        오늘 장 마감 뒤에 이미 받았으면 건너뜀. 반환값: 이번에 받은 봉 수
+        """
+        today = today or kst_today()
+        with self._lock:
+            lock = self._sync_locks.setdefault(code, threading.Lock())
+        with lock:
+            if self.is_complete(code, today):
+                return 0
+            fetched_at = datetime.now(KST).strftime("%Y-%m-%dT%H:%M")
+            os.makedirs(self.root, exist_ok=True)
+            old = self.load(code)
+            end = date.fromisoformat(today)
+            if len(old):
+                start = old["date"][-1].item()
+            else:
+                start = end - timedelta(days=PRICE_HISTORY_DAYS)
+
+            new = _to_records(fdr.DataReader(code, start.isoformat(), end.isoformat()))
+            merged = _merge(np.asarray(old), new)
+
+            tmp = f"{self._path(code)}.{os.getpid()}.tmp.npy"
+            np.save(tmp, merged)
+            os.replace(tmp, self._path(code))
+            marker_tmp = f"{self._marker(code)}.{os.getpid()}.tmp"
+            with open(marker_tmp, "w", encoding="utf-8") as f:
+                f.write(fetched_at)
+            os.replace(marker_tmp, self._marker(code))
+            return len(new)
+
+    def request_sync(self, code: str) -> None:
+        """
+        요청 경로에서 없는 종목을 만났을 때: 백그라운드 스레드에서 한 번만 받아 둠
+        """
+        with self._lock:
+            if code in self._pending or time.monotonic() - self._failed_at.get(code, -PRICE_RETRY_AFTER_SEC) < PRICE_RETRY_AFTER_SEC:
+                return
+            self._pending.add(code)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="price-sync")
+
+        def _run():
+            try:
+                self.sync(code)
+            except Exception as e:
+                print(f"[PriceStore] {code} 백그라운드 수집 실패: {e}")
+                with self._lock:
+                    self._failed_at[code] = time.monotonic()
+            finally:
+                with self._lock:
+                    self._pending.discard(code)
+
+        self._executor.submit(_run)
+
+    def sync_many(self, codes: Iterable[str], workers: int = PRICE_SYNC_WORKERS) -> Tuple[int, int]:
+        """
+        반환값: (처리한 종목 수, 실패한 종목 수)
+        """
+        codes = list(dict.fromkeys(codes))
+        today = kst_today()
+        failed = 0
+
+        def _one(code: str) -> bool:
+            try:
+                self.sync(code, today)
+                return True
+            except Exception as e:
+                print(f"[PriceStore] {code} 수집 실패: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for ok in pool.map(_one, codes):
+                failed += 0 if ok else 1
+        return len(codes), failed
+
+
+price_store = PriceStore()
+
+
+def warm_codes(top_n: int = PRICE_WARM_TOP_N) -> List[str]:
+    symbol_master.ensure_fresh()
+    curated = [c for codes in TOPIC_TICKERS.values() for c in codes]
+    return list(dict.fromkeys(curated + [s.code for s in symbol_master.top_by_marcap(top_n)]))
+
+
+def sync_top_tickers(top_n: int = PRICE_WARM_TOP_N) -> Tuple[int, int]:
+    started = time.monotonic()
+    total, failed = price_store.sync_many(warm_codes(top_n))
+    print(f"[PriceStore] 일봉 동기화 {total}종목 (실패 {failed}) ({time.monotonic() - started:.1f}s)")
+    return total, failed
+
+
+async def run_price_sync_loop(interval_sec: int = PRICE_SYNC_INTERVAL_SEC) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(sync_top_tickers)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[PriceStore] 동기화 루프 에러: {e}")
+        await asyncio.sleep(interval_sec)
+
+
+def price_sync_enabled_in_app() -> bool:
+    return os.getenv("PRICE_SYNC_IN_APP", "1") == "1"
+
+
+if __name__ == "__main__":
+    sync_top_tickers()
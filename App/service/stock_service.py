@@ -1,11 +1,37 @@
+import asyncio
 import os
 import json
 import random
 import traceback
 from datetime import datetime, timedelta
 
-from openai import OpenAI
-import FinanceDataReader as fdr
+from App.core.llm_gateway import llm_gateway
+from App.service.market_snapshot import snapshot_store
+from App.service.price_store import price_store
+from App.service.symbol_master import symbol_master
+
+# 종목 마스터에서 후보를 못 찾은 주제를 OpenAI 에 물어볼지 여부
+STOCK_LLM_CANDIDATES = os.getenv("STOCK_LLM_CANDIDATES", "1") == "1"
+# 종목 마스터에서 넉넉히 뽑은 뒤 야간 스냅샷 지표(14일 수익률)로 줄 세워 상위 STOCK_ANALYZE_TOP 개만 분석
+STOCK_CANDIDATE_POOL = 6
+STOCK_ANALYZE_TOP = 3
+
+
+def _pct(value) -> str:
+    return "-" if value is None else f"{value * 100:.2f}%"
+
+
+def _snapshot_line(name: str, code: str, row: dict) -> str:
+    flags = [label for key, label in (
+        ("golden_cross", "골든크로스"), ("dead_cross", "데드크로스"), ("above_ma60", "60일선 위"),
+    ) if row[key]]
+    spike = row["volume_spike"]
+    return (
+        f"- {name}({code}): 5일 {_pct(row['return_5d'])}, 14일 {_pct(row['return_14d'])}, "
+        f"60일 {_pct(row['return_60d'])}, 20일 변동성 {_pct(row['volatility_20d'])}, "
+        f"거래량 {'-' if spike is None else f'{spike:.1f}배'}"
+        f"{' (' + ', '.join(flags) + ')' if flags else ''}\n"
+    )
 
 
 class StockService:
@@ -18,9 +44,65 @@ class StockService:
         else:
             print("❌ OPENAI_API_KEY 환경변수가 설정되지 않았습니다!")
 
-        self.client = OpenAI(api_key=self.api_key)
         self.model_name = "gpt-4o-mini"
 
+    async def _llm_candidates(self, target_topic: str, excluded_list: list) -> list:
+        """
+        종목 마스터에서 못 찾은 주제일 때만 쓰는 OpenAI 후보 선정 (상장 목록에 없는 코드는 버림)
+        """
+        search_prompt = f"""
+        한국 주식 시장에서 '{target_topic}' 관련 대장주 3개만 JSON으로 알려줘.
+
+        [제외 조건]
+        {excluded_list} 이 키워드들과 관련된 종목은 절대 추천하지 마.
+
+        [중요]
+        1. 무조건 리스트([]) 형태로만 대답해. 딕셔너리 key 쓰지 마.
+        2. 종목명은 'name', 종목코드는 'code'라는 영어 key를 사용해.
+        3. 코드는 6자리 숫자여야 해.
+
+        예시: [{{"name": "삼성전자", "code": "005930"}}, {{"name": "SK하이닉스", "code": "000660"}}]
+        """
+
+        ai_text = await llm_gateway.chat_text(
+            self.model_name,
+            [
+                {"role": "system", "content": "JSON 형식으로만 대답해."},
+                {"role": "user", "content": search_prompt}
+            ],
+            temperature=0.3
+        )
+        cleaned_search = ai_text.replace("```json", "").replace("```", "").strip()
+
+        try:
+            candidates = json.loads(cleaned_search)
+            print(f"📋 AI 원본 응답 파싱: {candidates}")
+
+            # 딕셔너리로 온 경우 방어
+            if isinstance(candidates, dict):
+                print("⚠️ 딕셔너리가 감지됨! 내부 리스트 탐색 중...")
+                for key, value in candidates.items():
+                    if isinstance(value, list):
+                        candidates = value
+                        print(f"   -> 리스트 발견! ({key})")
+                        break
+                else:
+                    candidates = [candidates]
+
+        except Exception:
+            print(f"⚠️ JSON 파싱 실패, 기본값 사용")
+            candidates = [{"name": "KODEX 200", "code": "069500"}]
+
+        # 종목 마스터가 적재돼 있으면 상장 목록에 없는 코드(지어낸 코드)는 버림
+        if len(symbol_master) and isinstance(candidates, list):
+            listed = [
+                c for c in candidates
+                if not isinstance(c, dict)
+                or symbol_master.get(str(c.get("code") or c.get("코드") or "")) is not None
+            ]
+            candidates = listed or [{"name": "KODEX 200", "code": "069500"}]
+        return candidates
+
     async def get_recommendation(self, user_data: dict):
         print("\n" + "=" * 50)
         print("🚀 [디버깅] 주식 추천 로직 시작")
@@ -45,50 +127,15 @@ class StockService:
             print(f"🎯 주제: {target_topic} (출처: {source})")
             print(f"🚫 제외할 키워드: {excluded_list}")
 
-            # 2. OpenAI 1차 질문
-            search_prompt = f"""
-            한국 주식 시장에서 '{target_topic}' 관련 대장주 3개만 JSON으로 알려줘.
-
-            [제외 조건]
-            {excluded_list} 이 키워드들과 관련된 종목은 절대 추천하지 마.
-
-            [중요]
-            1. 무조건 리스트([]) 형태로만 대답해. 딕셔너리 key 쓰지 마.
-            2. 종목명은 'name', 종목코드는 'code'라는 영어 key를 사용해.
-            3. 코드는 6자리 숫자여야 해.
-
-            예시: [{{"name": "삼성전자", "code": "005930"}}, {{"name": "SK하이닉스", "code": "000660"}}]
-            """
-
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "JSON 형식으로만 대답해."},
-                    {"role": "user", "content": search_prompt}
-                ],
-                temperature=0.3
+            # 2. 종목 마스터(인메모리 색인)에서 후보 선정, 못 찾은 주제만 OpenAI 1차 질문
+            candidates = await asyncio.to_thread(
+                symbol_master.candidates, target_topic, excluded_list, STOCK_CANDIDATE_POOL
             )
-
-            ai_text = response.choices[0].message.content
-            cleaned_search = ai_text.replace("```json", "").replace("```", "").strip()
-
-            try:
-                candidates = json.loads(cleaned_search)
-                print(f"📋 AI 원본 응답 파싱: {candidates}")
-
-                # 딕셔너리로 온 경우 방어
-                if isinstance(candidates, dict):
-                    print("⚠️ 딕셔너리가 감지됨! 내부 리스트 탐색 중...")
-                    for key, value in candidates.items():
-                        if isinstance(value, list):
-                            candidates = value
-                            print(f"   -> 리스트 발견! ({key})")
-                            break
-                    else:
-                        candidates = [candidates]
-
-            except Exception:
-                print(f"⚠️ JSON 파싱 실패, 기본값 사용")
+            if candidates:
+                print(f"📋 종목 마스터 후보: {candidates}")
+            elif STOCK_LLM_CANDIDATES:
+                candidates = await self._llm_candidates(target_topic, excluded_list)
+            else:
                 candidates = [{"name": "KODEX 200", "code": "069500"}]
 
             # 3. 데이터 수집 + 제외 키워드 강제 필터링
@@ -97,48 +144,59 @@ class StockService:
             start_date = end_date - timedelta(days=14)
             valid_candidates = []
 
+            targets = []
             for stock in candidates:
-                name = "Unknown"
-                code = "000000"
-
-                try:
-                    if isinstance(stock, dict):
-                        code = str(stock.get("code") or stock.get("코드") or "").zfill(6)
-                        name = stock.get("name") or stock.get("이름") or "Unknown"
-
-                        if code == "000000" or not code:
-                            print(f"   ⚠️ 종목 코드 없음: {stock}")
-                            continue
-                    else:
-                        continue
-
-                    # 제외 키워드 Python 레벨에서도 필터링
-                    is_excluded = False
-                    for ex_word in excluded_list:
-                        if ex_word.replace(" ", "") in name.replace(" ", ""):
-                            print(f"   🚫 [필터링 작동] 제외 키워드 '{ex_word}' 감지됨: {name} -> 탈락!")
-                            is_excluded = True
-                            break
-
-                    if is_excluded:
-                        continue
-
-                    print(f"   Running FDR... {name}({code})")
-                    df = fdr.DataReader(code, start_date, end_date)
-
-                    if not df.empty:
-                        start_p = int(df.iloc[0]['Close'])
-                        end_p = int(df.iloc[-1]['Close'])
-                        change = ((end_p - start_p) / start_p) * 100
-                        candidates_data_str += f"- {name}({code}): {change:.2f}% 변동\n"
-                        valid_candidates.append(name)
-                    else:
-                        print(f"   ⚠️ 데이터 없음: {name}")
-
-                except Exception as e:
-                    print(f"   ⚠️ FDR 에러 ({name}): {e}")
+                if not isinstance(stock, dict):
+                    continue
+
+                code = str(stock.get("code") or stock.get("코드") or "").zfill(6)
+                name = stock.get("name") or stock.get("이름") or "Unknown"
+
+                if code == "000000" or not code:
+                    print(f"   ⚠️ 종목 코드 없음: {stock}")
                     continue
 
+                # 제외 키워드 Python 레벨에서도 필터링
+                is_excluded = False
+                for ex_word in excluded_list:
+                    if ex_word.replace(" ", "") in name.replace(" ", ""):
+                        print(f"   🚫 [필터링 작동] 제외 키워드 '{ex_word}' 감지됨: {name} -> 탈락!")
+                        is_excluded = True
+                        break
+
+                if not is_excluded:
+                    targets.append((name, code))
+
+            # 야간 스냅샷(market_snapshot)에 미리 계산된 지표로 후보 정렬 (스냅샷에 없는 종목은 뒤로)
+            snapshot = snapshot_store.current()
+            rows = {code: snapshot.row(code) if snapshot else None for _, code in targets}
+
+            def _rank_key(target):
+                row = rows[target[1]]
+                ret = row["return_14d"] if row else None
+                return (ret is None, -(ret or 0.0))
+
+            targets = sorted(targets, key=_rank_key)[:STOCK_ANALYZE_TOP]
+
+            # 스냅샷에 없는 종목만 로컬 디스크 캐시(price_store)에서 읽음 (요청 경로에서 네트워크 호출 X)
+            for name, code in targets:
+                row = rows[code]
+                if row is not None and row["return_14d"] is not None:
+                    candidates_data_str += _snapshot_line(name, code, row)
+                    valid_candidates.append(name)
+                    continue
+
+                bars = price_store.window(code, start_date.date(), end_date.date())
+
+                if len(bars):
+                    start_p = int(bars["close"][0])
+                    end_p = int(bars["close"][-1])
+                    change = ((end_p - start_p) / start_p) * 100
+                    candidates_data_str += f"- {name}({code}): {change:.2f}% 변동\n"
+                    valid_candidates.append(name)
+                else:
+                    print(f"   ⚠️ 데이터 없음(백그라운드 수집 예약): {name}")
+
             if not valid_candidates:
                 print("🚨 유효한 종목 없음 -> 분석 중단")
                 return {
@@ -167,15 +225,13 @@ class StockService:
             }}
             """
 
-            final_response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
+            final_text = await llm_gateway.chat_text(
+                self.model_name,
+                [
                     {"role": "system", "content": "JSON으로만 대답해."},
                     {"role": "user", "content": analyze_prompt}
                 ]
             )
-
-            final_text = final_response.choices[0].message.content
             cleaned_final = final_text.replace("```json", "").replace("```", "").strip()
             final_json = json.loads(cleaned_final)
 
@@ -0,0 +1,293 @@
+# App/service/symbol_master.py
+"""
+KRX 상장 종목 마스터 (로컬 캐시 + 인메모리 색인).
+
+- fdr.StockListing("KRX")(시가총액) + ("KRX-DESC")(업종/주요제품) 를 합쳐 SYMBOL_MASTER_PATH(csv)에 저장,
+  KST 날짜가 바뀐 뒤 첫 조회 때 한 번 다시 받는다 (실패하면 어제 파일로 계속 씀)
+- 색인: 코드 -> 종목, 정규화 이름 -> 코드, 이름 글자 bigram -> 코드 (오타/띄어쓰기 다른 이름 fuzzy 매칭),
+  업종/주요제품 문자열 (주제어 부분 일치)
+- 주제 -> 대표 종목은 TOPIC_TICKERS (직접 관리하는 표)를 먼저 보고, 없으면 업종/주요제품, 종목명 순으로 찾는다
+  후보는 시가총액 순, 우선주 제외. 제외 키워드는 종목명/업종/주요제품에 걸리면 뺀다.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set
+
+import FinanceDataReader as fdr
+import pandas as pd
+
+from App.core.rate_limiter import KST, kst_today
+
+SYMBOL_MASTER_PATH = os.getenv("SYMBOL_MASTER_PATH", "/tmp/krx_symbol_master.csv")
+FUZZY_MIN_SCORE = 0.5
+RETRY_AFTER_SEC = 600   # 목록을 못 받았고 파일도 없을 때 다시 시도하기까지 대기
+
+# 주제어 -> 대표 종목 코드 (시가총액 순서와 무관하게 이 순서를 우선)
+TOPIC_TICKERS: Dict[str, List[str]] = {
+    "반도체": ["005930", "000660", "042700"],
+    "2차전지": ["373220", "006400", "247540", "003670"],
+    "자동차": ["005380", "000270", "012330"],
+    "바이오": ["207940", "068270", "326030", "000100"],
+    "플랫폼": ["035420", "035720"],
+    "IT": ["005930", "035420", "035720"],
+    "AI": ["000660", "005930", "035420"],
+    "게임": ["259960", "036570", "251270"],
+    "은행": ["105560", "055550", "086790", "316140"],
+    "증권": ["006800", "005940", "016360", "039490"],
+    "조선": ["329180", "009540", "042660", "010140"],
+    "방산": ["012450", "047810", "079550", "064350"],
+    "원전": ["034020", "052690", "015760"],
+    "철강": ["005490", "004020"],
+    "화학": ["051910", "011170"],
+    "통신": ["017670", "030200", "032640"],
+    "건설": ["000720", "028050", "006360"],
+    "정유": ["096770", "010950", "078930"],
+    "원자재": ["010130", "096770", "036460"],
+    "엔터": ["352820", "041510", "035900"],
+    "항공": ["003490", "020560"],
+    "수출": ["005930", "005380", "000660"],
+}
+
+# 사용자 표현 / Q1 카테고리 이름 -> TOPIC_TICKERS 키
+TOPIC_ALIASES: Dict[str, str] = {
+    "배터리": "2차전지", "이차전지": "2차전지", "전기차": "2차전지",
+    "제약": "바이오", "헬스케어": "바이오",
+    "인터넷": "플랫폼", "네이버": "플랫폼", "카카오": "플랫폼",
+    "인공지능": "AI", "기술·IT경제": "IT",
+    "금융": "은행", "금리": "은행", "환율": "은행", "채권": "은행", "금융(금리·환율·채권)": "은행",
+    "주식·증권": "증권", "주식": "증권",
+    "국방": "방산", "방위산업": "방산",
+    "원자력": "원전",
+    "부동산": "건설",
+    "유가": "정유", "원유": "정유", "에너지": "정유",
+    "원자재(유가·금·천연가스)": "원자재", "금": "원자재", "천연가스": "원자재",
+    "엔터테인먼트": "엔터", "K팝": "엔터",
+    "국제·글로벌이슈": "수출", "미국증시": "수출", "무역": "수출",
+}
+
+# 주제가 넓어서 시가총액 상위 종목으로 답하는 주제어
+BROAD_TOPICS = {"경제", "전체경제", "산업·기업", "코스피", "증시", "대형주"}
+
+
+class Symbol(NamedTuple):
+    code: str
+    name: str
+    market: str
+    sector: str
+    industry: str
+    marcap: float
+
+
+def normalize_name(text: str) -> str:
+    text = (text or "").lower()
+    for token in ("(주)", "주식회사", " "):
+        text = text.replace(token, "")
+    return text
+
+
+# 정규화한 주제어 -> TOPIC_TICKERS 키
+_TOPIC_INDEX: Dict[str, str] = {
+    **{normalize_name(t): t for t in TOPIC_TICKERS},
+    **{normalize_name(a): t for a, t in TOPIC_ALIASES.items()},
+}
+
+
+def _bigrams(text: str) -> Set[str]:
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def is_preferred(name: str) -> bool:
+    # 삼성전자우 / 현대차2우B / 대신증권우(전환) 등
+    base = name.split("(")[0]
+    return base.endswith("우") or base.endswith("우B") or base.endswith("우C")
+
+
+def fetch_listing() -> pd.DataFrame:
+    """
+    KRX 전 종목: Code, Name, Market, Sector, Industry, Marcap
+    """
+    marcap = fdr.StockListing("KRX")[["Code", "Name", "Market", "Marcap"]]
+    try:
+        desc = fdr.StockListing("KRX-DESC")[["Code", "Sector", "Industry"]]
+        listing = marcap.merge(desc, on="Code", how="left")
+    except Exception as e:
+        # 업종 정보가 없어도 이름/코드 색인은 쓸 수 있음
+        print(f"[SymbolMaster] KRX-DESC 조회 실패, 업종 없이 진행: {e}")
+        listing = marcap.assign(Sector="", Industry="")
+    listing["Code"] = listing["Code"].astype(str).str.zfill(6)
+    return listing
+
+
+class SymbolMaster:
+    def __init__(self, path: str = SYMBOL_MASTER_PATH):
+        self.path = path
+        self.loaded_date: Optional[str] = None
+        self.by_code: Dict[str, Symbol] = {}
+        self._by_name: Dict[str, str] = {}
+        self._name_grams: Dict[str, Set[str]] = {}
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.by_code)
+
+    # ---------- 적재 ----------
+    def _file_date(self) -> Optional[str]:
+        try:
+            return datetime.fromtimestamp(os.path.getmtime(self.path), KST).strftime("%Y-%m-%d")
+        except OSError:
+            return None
+
+    def _build(self, listing: pd.DataFrame) -> None:
+        by_code: Dict[str, Symbol] = {}
+        for row in listing.fillna({"Sector": "", "Industry": "", "Marcap": 0, "Market": ""}).itertuples(index=False):
+            by_code[row.Code] = Symbol(
+                row.Code, str(row.Name), str(row.Market), str(row.Sector), str(row.Industry), float(row.Marcap)
+            )
+
+        by_name: Dict[str, str] = {}
+        name_grams: Dict[str, Set[str]] = {}
+        # 같은 정규화 이름이면 시가총액 큰 쪽을 남김
+        for sym in sorted(by_code.values(), key=lambda s: s.marcap):
+            key = normalize_name(sym.name)
+            by_name[key] = sym.code
+            for gram in _bigrams(key):
+                name_grams.setdefault(gram, set()).add(sym.code)
+
+        self.by_code, self._by_name, self._name_grams = by_code, by_name, name_grams
+
+    def ensure_fresh(self) -> None:
+        """
+        오늘(KST) 이미 적재했으면 아무것도 안 함. 파일이 오늘 것이면 파일에서, 아니면 새로 받아서 파일 갱신.
+        """
+        today = kst_today()
+        if self.loaded_date == today or time.monotonic() - self._failed_at < RETRY_AFTER_SEC:
+            return
+        with self._lock:
+            if self.loaded_date == today or time.monotonic() - self._failed_at < RETRY_AFTER_SEC:
+                return
+            listing = None
+            if self._file_date() != today:
+                try:
+                    listing = fetch_listing()
+                    tmp = f"{self.path}.tmp"
+                    listing.to_csv(tmp, index=False)
+                    os.replace(tmp, self.path)
+                except Exception as e:
+                    print(f"[SymbolMaster] KRX 종목 목록 갱신 실패, 기존 파일 사용: {e}")
+                    listing = None
+            if listing is None:
+                try:
+                    listing = pd.read_csv(self.path, dtype={"Code": str})
+                except (OSError, pd.errors.ParserError) as e:
+                    if not self.by_code:
+                        print(f"[SymbolMaster] 종목 목록 파일 없음: {e}")
+                    # RETRY_AFTER_SEC 뒤에 다시 시도 (이전 색인이 있으면 그대로 사용)
+                    self._failed_at = time.monotonic()
+                    return
+            self._build(listing)
+            self.loaded_date = today
+            print(f"[SymbolMaster] {len(self.by_code)}개 종목 적재 ({today})")
+
+    # ---------- 조회 ----------
+    def get(self, code: str) -> Optional[Symbol]:
+        return self.by_code.get(str(code).zfill(6))
+
+    def search(self, query: str, limit: int = 5) -> List[Symbol]:
+        """
+        종목명 fuzzy 검색. 정확히 같은 이름 > 앞부분 일치 > 유사도 순 (bigram 이 하나라도 겹치는 종목만 비교)
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+        exact = self._by_name.get(key)
+        if exact is not None:
+            return [self.by_code[exact]]
+
+        grams = _bigrams(key)
+        overlap: Dict[str, int] = {}
+        for gram in grams:
+            for code in self._name_grams.get(gram, ()):
+                overlap[code] = overlap.get(code, 0) + 1
+
+        scored = []
+        for code, hits in overlap.items():
+            sym = self.by_code[code]
+            name = normalize_name(sym.name)
+            # bigram Dice 와 편집 유사도 중 큰 값 ("현대자동차" -> "현대차" 처럼 줄인 이름도 잡도록)
+            score = max(
+                2 * hits / (len(grams) + len(_bigrams(name))),
+                SequenceMatcher(None, key, name).ratio(),
+            )
+            if name.startswith(key) or key.startswith(name):
+                score += 0.5
+            if score >= FUZZY_MIN_SCORE:
+                scored.append((score, sym.marcap, sym))
+        scored.sort(key=lambda t: (t[0], t[1]), reverse=True)
+        return [sym for _, _, sym in scored[:limit]]
+
+    def by_sector(self, topic: str) -> List[Symbol]:
+        """
+        업종/주요제품에 주제어가 들어간 종목 (시가총액 순)
+        """
+        key = normalize_name(topic)
+        if len(key) < 2:
+            return []
+        hits = [
+            sym for sym in self.by_code.values()
+            if key in normalize_name(sym.sector) or key in normalize_name(sym.industry)
+        ]
+        return sorted(hits, key=lambda s: s.marcap, reverse=True)
+
+    def top_by_marcap(self, limit: int) -> List[Symbol]:
+        return sorted(
+            (s for s in self.by_code.values() if not is_preferred(s.name)),
+            key=lambda s: s.marcap,
+            reverse=True,
+        )[:limit]
+
+    @staticmethod
+    def is_excluded(sym: Symbol, excluded: Sequence[str]) -> bool:
+        fields = (normalize_name(sym.name), normalize_name(sym.sector), normalize_name(sym.industry))
+        return any(ex and any(ex in f for f in fields) for ex in (normalize_name(e) for e in excluded))
+
+    def _topic_symbols(self, topic: str) -> Iterable[Symbol]:
+        key = normalize_name(topic)
+        curated = _TOPIC_INDEX.get(key)
+        if curated is None:
+            # "반도체 수출" 처럼 주제어를 포함한 경우
+            curated = next((t for k, t in _TOPIC_INDEX.items() if len(k) >= 2 and k in key), None)
+        if curated is not None:
+            yield from (self.by_code[c] for c in TOPIC_TICKERS[curated] if c in self.by_code)
+        if key in BROAD_TOPICS:
+            yield from self.top_by_marcap(10)
+        yield from self.by_sector(topic)
+        for sym in self.search(topic, limit=1):
+            # 주제가 종목명이면 그 종목 + 같은 업종 대형주
+            yield sym
+            if sym.sector:
+                yield from self.by_sector(sym.sector)
+
+    def candidates(self, topic: str, excluded: Sequence[str] = (), limit: int = 3) -> List[Dict[str, str]]:
+        """
+        주제 -> 대표 종목 후보 [{"name", "code"}] (제외 키워드/우선주 제외, 최대 limit 개)
+        """
+        self.ensure_fresh()
+        result: List[Dict[str, str]] = []
+        seen: Set[str] = set()
+        for sym in self._topic_symbols(topic):
+            if sym.code in seen or is_preferred(sym.name) or self.is_excluded(sym, excluded):
+                continue
+            seen.add(sym.code)
+            result.append({"name": sym.name, "code": sym.code})
+            if len(result) >= limit:
+                break
+        return result
+
+
+symbol_master = SymbolMaster()
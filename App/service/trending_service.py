@@ -0,0 +1,234 @@
+# App/service/trending_service.py
+"""
+수집된 기사 제목 스트림에서 뽑는 트렌드 키워드 (burst detection).
+
+1) 최근 BASELINE_DAYS 일 기사 제목을 정제(HTML/[속보] 같은 머리말/기호 제거)하고
+   어절 단위로 자른 뒤 끝의 조사를 떼어 후보어를 만든다.
+2) 후보어별로 최근 RECENT_HOURS 시간 동안 등장한 제목 수(recent)와
+   그 이전 기간(baseline)의 제목 수를 센다.
+3) baseline 의 시간당 빈도로 최근 구간의 기대값(expected)을 구하고
+       점수 = (recent - expected) / sqrt(expected + 1)
+   로 "평소보다 갑자기 많이 나온" 정도를 매긴다. (항상 많이 나오는 '증시', '상승' 같은 말은 점수가 낮다)
+
+수집 대상 키워드는 인기도에 따라 바뀌고 키워드당 한 번에 받는 기사 수도 제한되어 있어서,
+최근에 수집 대상이 된 키워드는 기사가 거의 다 최근 구간에 몰려 baseline 이 비어 보인다.
+그래서 baseline 기간 전체(COVERAGE_SLACK_HOURS 여유)를 수집해 온 키워드로 들어온 기사만 센다.
+
+결과는 TRENDING_REFRESH_SEC 동안 프로세스 안에 캐시한다.
+"""
+import html
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from App.core.database import SessionLocal
+from App.repository.articleRepo import ArticleRepository
+
+RECENT_HOURS = int(os.getenv("TRENDING_RECENT_HOURS", "24"))
+BASELINE_DAYS = 7                 # 수집 저장소 보관 기간과 맞춤
+TRENDING_REFRESH_SEC = int(os.getenv("TRENDING_REFRESH_SEC", "300"))
+MIN_RECENT_COUNT = 3              # 최근 구간에 이보다 적게 나온 후보는 제외
+MIN_BURST_RATIO = 1.5             # recent 가 expected 의 이 배수 이상일 때만 트렌드로 인정
+TITLES_PER_TERM = 20              # 후보어별로 들고 있는 최근 제목 수 (사용자 관련도 판단용)
+COVERAGE_SLACK_HOURS = 24         # 수집 키워드의 가장 오래된 기사가 baseline 시작 후 이 시간 안이면 전체 기간을 수집한 것으로 봄
+
+_TAG = re.compile(r"<[^>]+>")
+_BRACKETED = re.compile(r"\[[^\]]*\]|【[^】]*】|〈[^〉]*〉")
+_NON_WORD = re.compile(r"[^0-9A-Za-z가-힣&]+")
+_NUMERIC = re.compile(r"[\d.,~]+(%|년|월|일|원|달러|억|조|만|배|명|개|곳|차|분기)?")
+
+# 명사 끝과 헷갈릴 일이 거의 없는 조사: 항상 뗌 (긴 것부터)
+_PARTICLES = sorted(
+    [
+        "으로부터", "에서는", "에게서", "까지는", "이라며", "라며", "으로는", "에서도",
+        "에서", "에게", "으로", "까지", "부터", "보다", "처럼", "마저", "조차", "이며",
+    ],
+    key=len,
+    reverse=True,
+)
+# 명사의 마지막 글자일 수도 있는 짧은 조사 ("우크라이나", "코로나", "상한가"):
+# 떼고 남은 말이 제목들에 단독 어절로도 나올 때만 뗌 ("삼성전자가" -> "삼성전자")
+_SHORT_PARTICLES = sorted(
+    ["이나", "은", "는", "이", "가", "을", "를", "의", "에", "로", "와", "과", "도", "만", "나"],
+    key=len,
+    reverse=True,
+)
+
+_STOPWORDS = {
+    "속보", "종합", "단독", "사진", "영상", "포토", "기자", "오늘", "내일", "어제", "올해", "지난해",
+    "내년", "이번", "대한", "관련", "위해", "통해", "대해", "따른", "지난", "이후", "최근", "가장",
+    "한다", "했다", "된다", "있다", "없다", "것", "등", "및", "또", "더", "전망", "우려", "기대",
+    "상승", "하락", "증가", "감소", "확대", "축소", "발표", "개최", "진행", "추진", "확인", "가능성",
+    "뉴스", "인터뷰", "칼럼", "사설", "the", "and", "for",
+}
+
+
+def clean_title(title: str) -> str:
+    text = html.unescape(_TAG.sub(" ", title or ""))
+    text = _BRACKETED.sub(" ", text)
+    return _NON_WORD.sub(" ", text)
+
+
+def _strip_particle(token: str, known: Set[str] = frozenset()) -> str:
+    """
+    known: 단독 어절로 나온 적 있는 말 (짧은 조사를 뗄지 판단용)
+    """
+    for p in _PARTICLES:
+        if token.endswith(p) and len(token) - len(p) >= 2:
+            return token[: -len(p)]
+    for p in _SHORT_PARTICLES:
+        if token.endswith(p) and len(token) - len(p) >= 2 and token[: -len(p)] in known:
+            return token[: -len(p)]
+    return token
+
+
+def extract_terms(title: str, known: Set[str] = frozenset()) -> Set[str]:
+    """
+    제목 하나 -> 후보어 집합 (제목당 한 번만 센다)
+    """
+    terms = set()
+    for token in clean_title(title).split():
+        token = _strip_particle(token, known)
+        if len(token) < 2 or _NUMERIC.fullmatch(token):
+            continue
+        lowered = token.lower()
+        if lowered in _STOPWORDS:
+            continue
+        terms.add(token)
+    return terms
+
+
+class TrendingTerm:
+    __slots__ = ("term", "score", "recent", "expected", "titles")
+
+    def __init__(self, term: str, score: float, recent: int, expected: float, titles: List[str]):
+        self.term = term
+        self.score = score
+        self.recent = recent
+        self.expected = expected
+        self.titles = titles
+
+
+def compute_trending(
+    titles: Sequence[Tuple[str, datetime]],
+    now: datetime,
+    recent_hours: int = RECENT_HOURS,
+    baseline_days: int = BASELINE_DAYS,
+) -> List[TrendingTerm]:
+    """
+    (제목, 발행 시각 UTC) 목록 -> 점수순 트렌드 후보
+    """
+    recent_start = now - timedelta(hours=recent_hours)
+    baseline_start = now - timedelta(days=baseline_days)
+    baseline_hours = max(1.0, (recent_start - baseline_start).total_seconds() / 3600)
+
+    recent: Counter = Counter()
+    baseline: Counter = Counter()
+    samples: Dict[str, List[str]] = {}
+    unique: Dict[str, datetime] = {}
+
+    for title, published_at in titles:
+        if not title or published_at is None or published_at < baseline_start:
+            continue
+        key = clean_title(title).strip()
+        if key not in unique:  # 같은 제목 재전송은 한 번만
+            unique[key] = published_at
+
+    # 단독 어절로 나온 말 (짧은 조사를 떼도 되는지 판단용)
+    known = {token for key in unique for token in key.split()}
+
+    for key, published_at in unique.items():
+        terms = extract_terms(key, known)
+        if published_at >= recent_start:
+            recent.update(terms)
+            for t in terms:
+                bucket = samples.setdefault(t, [])
+                if len(bucket) < TITLES_PER_TERM:
+                    bucket.append(key.lower())
+        else:
+            baseline.update(terms)
+
+    result: List[TrendingTerm] = []
+    for term, count in recent.items():
+        if count < MIN_RECENT_COUNT:
+            continue
+        expected = baseline.get(term, 0) / baseline_hours * recent_hours
+        if count < expected * MIN_BURST_RATIO:
+            continue
+        score = (count - expected) / math.sqrt(expected + 1)
+        result.append(TrendingTerm(term, score, count, expected, samples.get(term, [])))
+
+    result.sort(key=lambda t: (t.score, t.recent), reverse=True)
+    return result
+
+
+class TrendingEngine:
+    def __init__(self, refresh_sec: int = TRENDING_REFRESH_SEC):
+        self.refresh_sec = refresh_sec
+        self._terms: List[TrendingTerm] = []
+        self._computed_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load_titles(self, since: datetime) -> List[Tuple[str, datetime]]:
+        """
+        since 부터 계속 수집해 온 키워드로 들어온 기사 제목만
+        """
+        db = SessionLocal()
+        try:
+            repo = ArticleRepository(db)
+            covered_until = since + timedelta(hours=COVERAGE_SLACK_HOURS)
+            covered = [kw for kw, started in repo.keyword_coverage_start().items() if started <= covered_until]
+            if not covered:
+                return []
+            return repo.get_titles_since(since, covered)
+        finally:
+            db.close()
+
+    def refresh(self) -> None:
+        now = datetime.utcnow()
+        titles = self._load_titles(now - timedelta(days=BASELINE_DAYS))
+        self._terms = compute_trending(titles, now)
+        self._computed_at = time.monotonic()
+
+    def terms(self) -> List[TrendingTerm]:
+        if time.monotonic() - self._computed_at >= self.refresh_sec:
+            with self._lock:
+                if time.monotonic() - self._computed_at >= self.refresh_sec:
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        # 실패하면 이전 결과 유지, 다음 refresh_sec 뒤에 재시도
+                        self._computed_at = time.monotonic()
+                        print(f"[Trending] 트렌드 계산 실패: {e}")
+        return self._terms
+
+    def top(
+        self,
+        limit: int = 20,
+        exclude: Optional[Sequence[str]] = None,
+        related_to: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        """
+        점수순 트렌드 키워드. exclude 에 걸리는 후보는 빼고,
+        related_to 가 있으면 그 키워드가 들어간 제목에서 튄 후보를 앞으로 보낸다.
+        """
+        excluded = [e.lower() for e in exclude or [] if e]
+        related = [r.lower() for r in related_to or [] if r]
+
+        candidates = [
+            t for t in self.terms()
+            if not any(e in t.term.lower() for e in excluded)
+        ]
+        if related:
+            hits = [t for t in candidates if any(r in title for title in t.titles for r in related)]
+            hit_terms = {t.term for t in hits}
+            candidates = hits + [t for t in candidates if t.term not in hit_terms]
+        return [t.term for t in candidates[:limit]]
+
+
+trending_engine = TrendingEngine()
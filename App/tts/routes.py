@@ -2,10 +2,11 @@
 import base64
 
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from App.core.database import get_db
+from App.core.streaming import ClosingStreamingResponse
 
 from .schemas import (
     ShortformTTSRequest,
@@ -25,12 +26,12 @@ router = APIRouter(
 
 # 1) 일반 숏폼 TTS (주요 뉴스 / AI 요약 등 아무 텍스트)
 @router.post("/shortform")
-def shortform_tts(req: ShortformTTSRequest):
+async def shortform_tts(req: ShortformTTSRequest):
     if not req.text.strip():
         raise HTTPException(400, "text가 비어 있습니다.")
 
     # 실제로 읽을 스크립트 생성
-    script = generate_shortform_script(
+    script = await generate_shortform_script(
         original_text=req.text,
         max_chars=req.max_chars
     )
@@ -46,7 +47,7 @@ def shortform_tts(req: ShortformTTSRequest):
 
     # 2) image_url은 없고 origin_url만 온 경우 → OG 이미지 추출
     elif req.origin_url:
-        image_url = extract_og_image(req.origin_url)
+        image_url = await run_in_threadpool(extract_og_image, req.origin_url)
 
     # 헤더 구성
     headers = {
@@ -56,7 +57,7 @@ def shortform_tts(req: ShortformTTSRequest):
     if image_url:
         headers["X-Image-Url"] = image_url
 
-    return StreamingResponse(
+    return ClosingStreamingResponse(
         tts_stream(script),
         media_type="audio/mpeg",
         headers=headers,
@@ -65,19 +66,19 @@ def shortform_tts(req: ShortformTTSRequest):
 
 # 2) 사용자 맞춤형 숏폼 TTS (온보딩 + 네이버 API)
 @router.post("/shortform/personalized")
-def personalized_shortform_tts(
+async def personalized_shortform_tts(
     req: PersonalizedShortformTTSRequest,
     db: Session = Depends(get_db),
 ):
     try:
         # (1) 온보딩 + 네이버 API 기반으로 유저 맞춤형 뉴스 텍스트 만들기
-        news = build_personalized_news_text(db, req.user_id)
+        news = await run_in_threadpool(build_personalized_news_text, db, req.user_id)
 
         base_text = news["base_text"]
         image_url = news.get("image_url") or ""
 
         # (2) 그 텍스트를 10~30초용 숏폼 스크립트로 요약
-        script = generate_shortform_script(
+        script = await generate_shortform_script(
             original_text=base_text,
             max_chars=req.max_chars
         )
@@ -97,7 +98,7 @@ def personalized_shortform_tts(
         headers["X-Image-Url"] = image_url
 
     # (3) TTS로 스트리밍 응답
-    return StreamingResponse(
+    return ClosingStreamingResponse(
         tts_stream(script),
         media_type="audio/mpeg",
         headers=headers,
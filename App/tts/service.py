@@ -3,20 +3,25 @@
 import os
 import random
 import json
-from typing import Generator, List, Tuple
+from contextlib import aclosing
+from typing import AsyncIterator, List, Tuple
 
 from bs4 import BeautifulSoup
 from sqlalchemy.orm import Session
-from openai import OpenAI
-import requests
-
+from App.core.http_client import get_naver_client, get_origin_client
+from App.core.llm_gateway import llm_gateway
+from App.core.rate_limiter import PRIORITY_INTERACTIVE, get_naver_rate_limiter
+from App.ai_news.keyword_index import article_index
 from App.repository.preferenceRepo import PreferenceRepository
+from App.repository.seenRepo import SeenFilterRepository, article_key
+from App.service.popularity_service import record_keywords
 from App.service.preferenceService import Q1_CATEGORIES  # ✅ 여기 중요
 
 from App.user.models import UserOnBoarding  # 타입 힌트용 (선택)
 
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+SCRIPT_MODEL = "gpt-4o-mini"
+TTS_MODEL = "gpt-4o-mini-tts"
 
 NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID")
 NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET")
@@ -24,7 +29,7 @@ NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET")
 
 # ---------------- 공통: 숏폼 스크립트 생성 + TTS 스트림 ---------------- #
 
-def generate_shortform_script(original_text: str, max_chars: int = 180) -> str:
+async def generate_shortform_script(original_text: str, max_chars: int = 180) -> str:
     if not original_text.strip():
         raise ValueError("뉴스 텍스트가 비어 있습니다.")
 
@@ -50,34 +55,34 @@ def generate_shortform_script(original_text: str, max_chars: int = 180) -> str:
 {original_text}
 """
 
-    completion = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
+    script = await llm_gateway.chat_text(
+        SCRIPT_MODEL,
+        [
             {"role": "system", "content": system_prompt},
             {"role": "user",  "content": user_prompt},
         ],
         temperature=0.4,
     )
-
-    script = completion.choices[0].message.content.strip()
+    script = script.strip()
     if len(script) > max_chars:
         script = script[:max_chars]
     return script
 
 
-def tts_stream(script: str) -> Generator[bytes, None, None]:
+async def tts_stream(script: str) -> AsyncIterator[bytes]:
     # TTS에는 진짜 읽을 텍스트만 들어가야 한다
     full_input = script
 
-    with client.audio.speech.with_streaming_response.create(
-        model="gpt-4o-mini-tts",
+    chunks = llm_gateway.speech_stream(
+        TTS_MODEL,
+        input=full_input,
         voice="alloy",
         response_format="mp3",
-        input=full_input,
-    ) as response:
-        for chunk in response.iter_bytes(chunk_size=1024):
-            if chunk:
-                yield chunk
+        chunk_size=1024,
+    )
+    async with aclosing(chunks):
+        async for chunk in chunks:
+            yield chunk
 
 
 # ---------------- 온보딩 기반 사용자 선호 분석 로직 ---------------- #
@@ -170,7 +175,10 @@ def _search_naver_news(query: str, display: int = 10, sort: str = "sim") -> List
         "sort": sort,
     }
 
-    resp = requests.get(url, headers=headers, params=params, timeout=5)
+    if not get_naver_rate_limiter().acquire(PRIORITY_INTERACTIVE):
+        raise RuntimeError("네이버 API 호출 한도를 초과했습니다. 잠시 후 다시 시도해주세요.")
+
+    resp = get_naver_client().get(url, headers=headers, params=params, timeout=5)
     resp.raise_for_status()
     data = resp.json()
 
@@ -178,6 +186,25 @@ def _search_naver_news(query: str, display: int = 10, sort: str = "sim") -> List
     return items
 
 
+# ---------------- 수집 저장소 조회 로직 ---------------- #
+
+def _pick_from_store(
+    include_keywords: List[str],
+    exclude_keywords: List[str],
+    days: int = 3,
+) -> List[dict]:
+    """
+    수집된 최근 기사 중 포함 키워드가 (수집 쿼리 또는 제목/요약에) 걸리고
+    제목/요약에 제외 키워드가 없는 기사 목록 (인메모리 색인 비트맵 연산)
+    """
+    try:
+        article_index.sync_from_store()
+        return article_index.select_rows(include_keywords, exclude_keywords, days=days)
+    except Exception as e:
+        print(f"[ERR] article store read failed: {e}")
+        return []
+
+
 # ---------------- 최종: user_id → 맞춤형 뉴스 텍스트 ---------------- #
 
 def build_personalized_news_text(db: Session, user_id: int) -> str:
@@ -189,27 +216,54 @@ def build_personalized_news_text(db: Session, user_id: int) -> str:
 
     if not include_keywords:
         include_keywords = ["경제", "증시"]
+    record_keywords(include_keywords)
+
+    # 이미 들은 기사는 건너뜀 (사용자별 회전 Bloom filter)
+    seen_repo = SeenFilterRepository(db)
+    seen = seen_repo.load(user_id)
+
+    # 1) 수집 저장소(articles)에서 포함 키워드 기사 중 제외 키워드가 없고 아직 안 들은 것 선택
+    stored = [
+        row
+        for row in _pick_from_store(include_keywords, exclude_keywords)
+        if article_key(row) not in seen
+    ]
+    if stored:
+        selected = random.choice(stored)
+        title = selected.get("title", "")
+        desc = selected.get("summary", "")
+        origin_link = selected.get("origin_url") or selected.get("url")
+    else:
+        # 2) 저장소에 없으면 네이버 API 라이브 호출
+        query_parts = []
+        query_parts.extend(include_keywords)
+        query_parts.extend([f"-{kw}" for kw in exclude_keywords])
+        query = " ".join(query_parts)
+
+        articles = _search_naver_news(query=query, display=10, sort="sim")
+
+        if not articles:
+            raise ValueError("사용자 선호에 맞는 뉴스를 찾지 못했습니다.")
+
+        # 기사 하나 선택 (모두 들은 기사면 그중에서라도 선택)
+        unseen = [a for a in articles if article_key(a) not in seen]
+        selected = random.choice(unseen or articles)
+
+        title = selected.get("title", "")
+        desc = selected.get("description", "")
+        origin_link = selected.get("originallink") or selected.get("link")
+
+        for ch in ["<b>", "</b>", "&quot;", "&apos;"]:
+            title = title.replace(ch, "")
+            desc = desc.replace(ch, "")
 
-    query_parts = []
-    query_parts.extend(include_keywords)
-    query_parts.extend([f"-{kw}" for kw in exclude_keywords])
-    query = " ".join(query_parts)
-
-    articles = _search_naver_news(query=query, display=10, sort="sim")
-
-    if not articles:
-        raise ValueError("사용자 선호에 맞는 뉴스를 찾지 못했습니다.")
-
-    # 기사 하나 선택
-    selected = random.choice(articles)
-
-    title = selected.get("title", "")
-    desc = selected.get("description", "")
-    origin_link = selected.get("originallink") or selected.get("link")
-
-    for ch in ["<b>", "</b>", "&quot;", "&apos;"]:
-        title = title.replace(ch, "")
-        desc = desc.replace(ch, "")
+    if origin_link:
+        seen.add(origin_link)
+        try:
+            seen_repo.save(user_id, seen)
+        except Exception as e:
+            db.rollback()
+            print(f"[ERR] seen filter update failed: {e}")
 
     # OG 이미지 URL 추출
     image_url = None
@@ -234,7 +288,7 @@ def build_personalized_news_text(db: Session, user_id: int) -> str:
 # OG 이미지 추출 함수 만들기
 def extract_og_image(url: str) -> str | None:
     try:
-        resp = requests.get(url, timeout=2)
+        resp = get_origin_client().get(url)
         if resp.status_code != 200:
             return None
 
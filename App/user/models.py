@@ -1,5 +1,5 @@
 # App/user/models.py
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, func, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, func, ForeignKey, Index, JSON
 from sqlalchemy.orm import relationship
 
 from App.core.database import Base
@@ -37,4 +37,35 @@ class UserOnBoarding(Base):
         onupdate=func.now()
     )
 
-    user = relationship("User", back_populates="onboarding")
\ No newline at end of file
+    user = relationship("User", back_populates="onboarding")
+
+
+# 온보딩 JSON 컬럼(q1/q2/q3)을 정규화한 구독 테이블.
+# "반도체를 팔로우하는 사용자" 같은 역방향 조회를 인덱스로 하기 위해 양방향 인덱스를 둔다.
+KEYWORD_KIND_INCLUDE = "include"  # Q2: 관심 키워드
+KEYWORD_KIND_EXCLUDE = "exclude"  # Q3: 제외 키워드
+
+
+class UserKeyword(Base):
+    __tablename__ = "user_keyword"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String(10), primary_key=True)     # include / exclude
+    keyword = Column(String(100), primary_key=True)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_user_keyword_keyword", "keyword", "kind", "user_id"),
+    )
+
+
+class UserCategory(Base):
+    __tablename__ = "user_category"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category_id = Column(Integer, primary_key=True)  # Q1 카테고리 id
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_user_category_category", "category_id", "user_id"),
+    )
@@ -1,9 +1,18 @@
 import time
+import asyncio
 
 import sqlalchemy.exc
 from fastapi import FastAPI, APIRouter
-from App.core.database import Base, engine
+from App.core.database import Base, SessionLocal, engine
+from App.core.http_client import close_http_clients
+from App.core.llm_gateway import close_llm_gateway
 from App.user import models as user_models
+from App.db import models as db_models  # articles 등 테이블 등록용
+from App.service.ingestion_service import ingestion_enabled_in_app, run_ingestion_loop
+from App.service.popularity_service import run_popularity_flush_loop
+from App.service.price_store import price_sync_enabled_in_app, run_price_sync_loop
+from App.service.symbol_master import symbol_master
+from App.repository.preferenceRepo import PreferenceRepository
 from App.router import routes_naverNews, routes_preferences, routes_fortune, routes_password_reset, routes_keyword
 from App.user.routes import router as auth_router
 from App.ai_news.router import router as news_router
@@ -43,8 +52,44 @@ def on_startup():
         # 그래도 안 되면 명확한 에러로 죽이기
         raise RuntimeError("DB에 연결할 수 없습니다. main-db 상태를 확인하세요.")
 
+    # 정규화 구독 테이블이 비어 있으면 온보딩 JSON 컬럼에서 한 번 채움 (기존 사용자 백필)
+    # 실패해도 앱은 뜨도록 로그만 남김 (다음 기동 때 다시 시도)
+    db = SessionLocal()
+    try:
+        repo = PreferenceRepository(db)
+        if repo.subscriptions_empty():
+            print(f"구독 테이블 백필 완료: {repo.backfill_subscriptions()}명")
+    except Exception as e:
+        db.rollback()
+        print(f"구독 테이블 백필 실패: {e}")
+    finally:
+        db.close()
+
 app.include_router(stock_router)
 
+@app.on_event("startup")
+async def start_news_ingestion():
+    # NEWS_INGEST_IN_APP=1 일 때만 앱 내부에서 뉴스 수집 루프 실행
+    if ingestion_enabled_in_app():
+        app.state.ingest_task = asyncio.create_task(run_ingestion_loop())
+    # 요청 경로에서 모은 키워드 인기도를 주기적으로 DB 에 올림 (수집 대상 선정용)
+    app.state.popularity_task = asyncio.create_task(run_popularity_flush_loop())
+    # KRX 종목 마스터를 미리 적재 (첫 주식 추천 요청이 목록 다운로드를 기다리지 않게)
+    app.state.symbol_task = asyncio.create_task(asyncio.to_thread(symbol_master.ensure_fresh))
+    # 앱 내부 일봉 캐시 동기화 루프 (주제별 대표 + 시총 상위 워밍업). cron 배치만 쓸 때는 PRICE_SYNC_IN_APP=0
+    if price_sync_enabled_in_app():
+        app.state.price_task = asyncio.create_task(run_price_sync_loop())
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    for name in ("ingest_task", "popularity_task", "price_task"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+    # 외부 HTTP / OpenAI 커넥션 풀 정리
+    await close_http_clients()
+    await close_llm_gateway()
+
 @app.get("/")
 async def root():
     return {"message": "백엔드 서버 정상 작동 중! (리팩토링 완료)"}
\ No newline at end of file